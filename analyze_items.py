@@ -0,0 +1,29 @@
+import time
+from database import DatabaseManager
+from utils.item_analysis import ItemAnalyzer
+
+def analyze_items():
+    """Recalcule les statistiques des questions (p-value, point-bisériale, fréquences des options)"""
+    db = DatabaseManager()
+    analyzer = ItemAnalyzer(db)
+    
+    start = time.perf_counter()
+    statistics = analyzer.run()
+    if not statistics:
+        print("⚠️ Aucune question analysée (réponses insuffisantes ou erreur)")
+        return
+    
+    print(f"✅ {len(statistics)} questions analysées en {time.perf_counter() - start:.1f}s")
+    
+    # Questions suspectes : trop faciles, trop difficiles ou discrimination négative
+    suspicious = [
+        (question_id, s) for question_id, s in statistics.items()
+        if s['p_value'] > 0.95 or s['p_value'] < 0.10
+        or (s['point_biserial'] is not None and s['point_biserial'] < 0)
+    ]
+    for question_id, s in sorted(suspicious, key=lambda item: item[1]['point_biserial'] or 0)[:20]:
+        discrimination = f"{s['point_biserial']:+.2f}" if s['point_biserial'] is not None else "n/a"
+        print(f"   ⚠️ {question_id}: p={s['p_value']:.2f}, r_pb={discrimination}, n={s['n_responses']}")
+
+if __name__ == "__main__":
+    analyze_items()
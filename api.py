@@ -0,0 +1,395 @@
+"""API JSON sans état : tirage de questions, correction, enregistrement des scores et classements.
+
+Chaque requête porte tout son contexte (identifiants de questions, réponses, utilisateur) :
+aucun état de session côté serveur, les workers sont interchangeables derrière nginx.
+Les tirages sont renvoyés avec un jeton signé (HMAC, clé ECN_API_SECRET commune aux
+workers) : les scores (quiz et compétition) et les simulations ECN ne sont enregistrés que
+pour des questions tirées par le serveur. Une requête ne répond qu'une fois à chaque
+question, et chaque tirage ne peut être enregistré qu'une fois : son identifiant est consommé
+dans la transaction d'enregistrement (utils/draw_ledger.py), un second envoi reçoit 409.
+Le tirage est exigé en mode quiz aussi : /api/answers/score renvoie le corrigé de n'importe
+quelle question, un score libre pourrait donc être rempli de réponses exactes.
+Les appels à la base passent par AsyncDatabaseManager (async_database.py) : lectures non
+bloquantes sur la boucle d'événements, pool de DB_POOL_SIZE connexions par processus.
+
+Exemples (depuis la racine du dépôt) :
+    uvicorn api:app --host 0.0.0.0 --port 8000 --workers 4
+    curl 'localhost:8000/api/questions?count=5&specialty=cardiologie'
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import time
+from contextlib import asynccontextmanager
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from async_database import AsyncDatabaseManager
+from config import ApiConfig
+from utils.answer_timing import AnswerClock
+from utils.competition_room import answer_points
+from utils.draw_ledger import DrawAlreadyUsed
+from utils.ecn_simulator import ECNSimulator
+from utils.quiz_manager import QuizManager
+
+config = ApiConfig()
+quiz_mgr = QuizManager()
+simulator = ECNSimulator(quiz_mgr)
+db = AsyncDatabaseManager()
+
+MODES = ("quiz", "competition")
+
+if not config.draw_secret:
+    print("⚠️ ECN_API_SECRET non défini : clé de tirage propre au processus (un seul worker)")
+DRAW_KEY = (config.draw_secret or secrets.token_hex(32)).encode()
+
+
+class ApiError(Exception):
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def public_question(question: Dict) -> Dict:
+    """Question sans les réponses attendues ni l'explication"""
+    return {
+        'id': question['id'],
+        'question': question['question'],
+        'type': question['type'],
+        'options': [opt['text'] for opt in question['options']]
+    }
+
+
+def int_param(request: Request, name: str, default: int, maximum: int) -> int:
+    try:
+        value = int(request.query_params.get(name, default))
+    except ValueError:
+        raise ApiError(f"Paramètre {name} invalide")
+    return max(1, min(value, maximum))
+
+
+async def json_body(request: Request) -> Dict:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise ApiError("Corps JSON invalide")
+    if not isinstance(body, dict):
+        raise ApiError("Corps JSON invalide")
+    return body
+
+
+def resolve_answers(body: Dict):
+    """[{question_id, selected}] → (questions, user_answers) au format de QuizManager.
+    Chaque question ne peut être répondue qu'une fois."""
+    answers = body.get('answers')
+    if not isinstance(answers, list) or not answers:
+        raise ApiError("Champ answers manquant")
+    if len(answers) > config.max_questions:
+        raise ApiError(f"Au plus {config.max_questions} réponses")
+
+    questions, user_answers, seen = [], [], set()
+    for answer in answers:
+        if not isinstance(answer, dict):
+            raise ApiError("Réponse invalide : objet {question_id, selected} attendu")
+        question_id = str(answer.get('question_id'))
+        if question_id in seen:
+            raise ApiError(f"Question répondue plusieurs fois: {question_id}")
+        seen.add(question_id)
+        question = quiz_mgr.get_question(question_id)
+        if question is None:
+            raise ApiError(f"Question inconnue: {question_id}", 404)
+        selected = answer.get('selected')
+        if selected and not (isinstance(selected, str)
+                             or (isinstance(selected, list) and all(isinstance(s, str) for s in selected))):
+            raise ApiError(f"Sélection invalide pour {question_id}")
+        questions.append(question)
+        user_answers.append({'selected': selected} if selected else {})
+    return questions, user_answers
+
+
+def time_taken(body: Dict) -> int:
+    try:
+        return max(0, int(body.get('time_taken') or 0))
+    except (TypeError, ValueError, OverflowError):
+        raise ApiError("Champ time_taken invalide")
+
+
+def _draw_signature(payload: str) -> str:
+    return hmac.new(DRAW_KEY, payload.encode(), hashlib.sha256).hexdigest()
+
+
+def sign_draw(questions: List[Dict]) -> str:
+    """Jeton du tirage : identifiant unique, date et identifiants des questions, signés par le serveur"""
+    data = json.dumps([secrets.token_hex(8), int(time.time()), [q['id'] for q in questions]], separators=(',', ':'))
+    payload = base64.urlsafe_b64encode(data.encode()).decode()
+    return f"{payload}.{_draw_signature(payload)}"
+
+
+def require_drawn(body: Dict, questions: List[Dict]) -> str:
+    """Vérifie que les questions répondues proviennent du tirage signé body['draw'] (non expiré)
+    et renvoie l'identifiant du tirage, à consommer par l'enregistrement"""
+    token = body.get('draw')
+    if not isinstance(token, str) or '.' not in token:
+        raise ApiError("Champ draw manquant : jeton renvoyé avec le tirage des questions")
+    payload, signature = token.rsplit('.', 1)
+    if not hmac.compare_digest(signature, _draw_signature(payload)):
+        raise ApiError("Tirage invalide", 403)
+    try:
+        draw_id, issued_at, drawn = json.loads(base64.urlsafe_b64decode(payload))
+    except ValueError:
+        raise ApiError("Tirage invalide", 403)  # Jeton signé d'un format antérieur
+    if time.time() - issued_at > config.draw_ttl:
+        raise ApiError("Tirage expiré", 403)
+    drawn = set(drawn)
+    outside = [q['id'] for q in questions if q['id'] not in drawn]
+    if outside:
+        raise ApiError(f"Question hors du tirage: {outside[0]}", 403)
+    return draw_id
+
+
+def competition_score(questions: List[Dict], user_answers: List[Dict]) -> float:
+    """Score de compétition cumulé dans l'ordre des réponses, jamais négatif"""
+    score = 0
+    for question, answer in zip(questions, user_answers):
+        if answer.get('selected'):
+            score = max(0, score + answer_points(question, answer['selected']))
+    return score
+
+
+def jsonable(value):
+    """Valeurs lues en base (Decimal, dates, tuples) → types JSON"""
+    if isinstance(value, dict):
+        return {key: jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonable(item) for item in value]
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def answer_clock(latencies: Optional[List]) -> Optional[AnswerClock]:
+    """Chronologie reconstruite à partir des temps de réponse (ms) envoyés par le client"""
+    if not isinstance(latencies, list) or not latencies:
+        return None
+    clock = AnswerClock(0.0)
+    elapsed = 0
+    for index, latency in enumerate(latencies):
+        if isinstance(latency, (int, float)) and latency >= 0:
+            elapsed += latency
+            clock.lap(index, elapsed / 1000)
+    return clock
+
+
+# -- Routes ---------------------------------------------------------------
+
+async def health(request: Request):
+    return JSONResponse({'status': 'ok', 'questions': len(quiz_mgr.questions_by_id)})
+
+
+async def specialties(request: Request):
+    return JSONResponse({'specialties': [
+        {'name': name, 'questions': len(questions)} for name, questions in quiz_mgr.quizzes.items() if questions
+    ]})
+
+
+async def draw_questions(request: Request):
+    """GET /api/questions?count=10&specialty=a,b&exclude=id1,id2"""
+    count = int_param(request, 'count', 10, config.max_questions)
+    names = [s for s in request.query_params.get('specialty', '').split(',') if s]
+    unknown = [s for s in names if s not in quiz_mgr.quizzes]
+    if unknown:
+        raise ApiError(f"Spécialité inconnue: {', '.join(unknown)}", 404)
+    exclude = set(s for s in request.query_params.get('exclude', '').split(',') if s)
+
+    weights = dict.fromkeys(names or quiz_mgr.get_specialties(), 1)
+    question_ids = quiz_mgr.sample_question_ids(count, weights=weights, exclude=exclude)
+    questions = [quiz_mgr.get_question(qid) for qid in question_ids]
+    return JSONResponse({'questions': [public_question(q) for q in questions], 'draw': sign_draw(questions)})
+
+
+async def score_answers(request: Request):
+    """POST /api/answers/score : correction question par question, sans enregistrement"""
+    body = await json_body(request)
+    questions, user_answers = resolve_answers(body)
+    results = []
+    for question, answer in zip(questions, user_answers):
+        selected = answer.get('selected')
+        points = answer_points(question, selected) if selected else 0
+        results.append({
+            'question_id': question['id'],
+            'correct': points == 2,
+            'points': points,
+            'correct_answers': [opt['text'] for opt in question['options'] if opt.get('correct', False)],
+            'explanation': question.get('explanation', '')
+        })
+    return JSONResponse({
+        'results': results,
+        'quiz_score': quiz_mgr.calculate_score(user_answers, questions),
+        'competition_score': competition_score(questions, user_answers)
+    })
+
+
+async def submit_score(request: Request):
+    """POST /api/scores : score recalculé côté serveur puis enregistré avec les réponses"""
+    body = await json_body(request)
+    username = str(body.get('username') or '').strip()
+    mode = body.get('mode', 'quiz')
+    if not username:
+        raise ApiError("Champ username manquant")
+    if mode not in MODES:
+        raise ApiError(f"Mode inconnu: {mode}")
+    questions, user_answers = resolve_answers(body)
+    draw_id = require_drawn(body, questions)
+
+    if mode == "competition":
+        specialty = "competition"
+        score = competition_score(questions, user_answers)
+    else:
+        specialty = body.get('specialty') or questions[0]['id'].split(':', 1)[0]
+        score = quiz_mgr.calculate_score(user_answers, questions)
+
+    badges = []
+    try:
+        saved = await db.save_score(
+            username, specialty, score, len(questions), time_taken(body),
+            awarded_badges=badges, questions=questions, user_answers=user_answers,
+            answer_clock=answer_clock(body.get('latencies_ms')), draw_id=draw_id
+        )
+    except DrawAlreadyUsed:
+        raise ApiError("Tirage déjà enregistré", 409)
+    if not saved:
+        raise ApiError("Enregistrement impossible", 503)
+    return JSONResponse({'score': score, 'total_questions': len(questions), 'badges': badges}, status_code=201)
+
+
+async def leaderboard(request: Request):
+    """GET /api/leaderboard?specialty=cardiologie&limit=10"""
+    limit = int_param(request, 'limit', 10, config.leaderboard_limit)
+    specialty = request.query_params.get('specialty') or None
+    rows = await db.get_leaderboard(specialty, limit)
+    return JSONResponse({'leaderboard': [
+        {'username': row['username'], 'total_score': float(row['total_score']), 'quizzes_taken': int(row['quizzes_taken'])}
+        for row in rows
+    ]})
+
+
+async def ecn_session(request: Request):
+    """POST /api/ecn/session : tirage d'une simulation ECN (questions sans corrigé)"""
+    session = simulator.generate_simulation_session()
+    return JSONResponse({
+        'duration': session['duration'],
+        'questions': [public_question(q) for q in session['questions']],
+        'draw': sign_draw(session['questions'])
+    })
+
+
+async def ecn_submit(request: Request):
+    """POST /api/ecn/simulations : correction au barème ECN et enregistrement"""
+    body = await json_body(request)
+    username = str(body.get('username') or '').strip()
+    if not username:
+        raise ApiError("Champ username manquant")
+    questions, user_answers = resolve_answers(body)
+    draw_id = require_drawn(body, questions)
+
+    results = simulator.calculate_ecn_score(user_answers, questions)
+    session = {
+        'id': f"ecn_api_{int(time.time() * 1000)}",
+        'title': "Simulation ECN (API)",
+        'total_questions': len(questions),
+        'questions': questions
+    }
+    badges = []
+    try:
+        saved = await db.save_ecn_simulation(username, {
+            'session': session, 'results': results, 'time_taken': time_taken(body), 'user_answers': user_answers
+        }, badges, draw_id)
+    except DrawAlreadyUsed:
+        raise ApiError("Tirage déjà enregistré", 409)
+    if not saved:
+        raise ApiError("Enregistrement impossible", 503)
+    return JSONResponse({
+        'raw_score': float(results['raw_score']),
+        'max_score': float(results['max_score']),
+        'percentage': float(results['percentage']),
+        'passed': bool(results['passed']),
+        'grade': results['grade'],
+        'badges': badges
+    }, status_code=201)
+
+
+async def ecn_leaderboard(request: Request):
+    limit = int_param(request, 'limit', 10, config.leaderboard_limit)
+    rows = await db.get_ecn_leaderboard(limit)
+    return JSONResponse({'leaderboard': jsonable(rows)})
+
+
+async def user_profile(request: Request):
+    """GET /api/users/{username}/profile : statistiques, badges, progression et ECN lus en parallèle"""
+    username = request.path_params['username']
+    profile = await db.get_profile_data(username)
+    stats = profile['global_stats']
+    return JSONResponse(jsonable({
+        'username': username,
+        'quiz_count': stats[0] if stats else 0,
+        'total_score': stats[1] if stats else None,
+        'average_score': stats[2] if stats else None,
+        'first_day': stats[3] if stats else None,
+        'last_day': stats[4] if stats else None,
+        'badges': profile['badges'],
+        'by_specialty': [
+            {'specialty': row[0], 'avg_score': row[1], 'quiz_count': row[2], 'total_score': row[3], 'avg_time': row[4]}
+            for row in (profile['progress'] or {}).get('by_specialty', [])
+        ],
+        'timeline': [
+            {'date': row[0], 'daily_avg': row[1], 'daily_quizzes': row[2]}
+            for row in (profile['progress'] or {}).get('timeline', [])
+        ],
+        'ecn': profile['ecn_stats'] or {}
+    }))
+
+
+async def api_error(request: Request, exc: ApiError):
+    return JSONResponse({'error': str(exc)}, status_code=exc.status)
+
+
+async def purge_draws():
+    """Purge périodique des tirages consommés dont le jeton a expiré"""
+    while True:
+        await db.purge_consumed_draws(config.draw_ttl)
+        await asyncio.sleep(config.draw_ttl)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    purge = asyncio.ensure_future(purge_draws())
+    yield
+    purge.cancel()
+    await db.close()
+
+
+app = Starlette(
+    routes=[
+        Route("/api/health", health),
+        Route("/api/specialties", specialties),
+        Route("/api/questions", draw_questions),
+        Route("/api/answers/score", score_answers, methods=["POST"]),
+        Route("/api/scores", submit_score, methods=["POST"]),
+        Route("/api/leaderboard", leaderboard),
+        Route("/api/ecn/session", ecn_session, methods=["POST"]),
+        Route("/api/ecn/simulations", ecn_submit, methods=["POST"]),
+        Route("/api/ecn/leaderboard", ecn_leaderboard),
+        Route("/api/users/{username}/profile", user_profile),
+    ],
+    exception_handlers={ApiError: api_error},
+    lifespan=lifespan
+)
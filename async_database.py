@@ -0,0 +1,293 @@
+"""Accès asynchrone à PostgreSQL pour les frontaux asyncio (api.py) et les tâches de fond.
+
+Les lectures passent par des connexions psycopg2 non bloquantes (async_=True) attendues
+sur la boucle d'événements (loop.add_reader / add_writer) : une requête en vol n'occupe
+aucun thread. Les requêtes sont celles du catalogue utils/statements.py, préparées sur
+chaque connexion du pool à son ouverture ; la mise en forme des résultats et les caches
+par processus sont ceux de DatabaseManager.
+
+Limite : les écritures (save_score, save_ecn_simulation) ne sont pas asynchrones. Elles
+enchaînent dans une transaction des requêtes et du code Python (révisions espacées,
+règles de badges, notifications) écrits pour un curseur synchrone ; elles réutilisent la
+transaction de DatabaseManager telle quelle, exécutée dans un pool de threads. En
+conséquence :
+  - chaque écriture en cours occupe un thread et une connexion synchrone pendant toute
+    la transaction (au plus pool_size à la fois, les suivantes attendent dans l'exécuteur) ;
+  - ces connexions forment un second pool (DatabaseManager(pooled=True)) : un worker
+    ouvre jusqu'à 2 × pool_size connexions ;
+  - annuler la coroutine n'annule pas la transaction, qui va jusqu'au commit.
+
+Exemple :
+    db = AsyncDatabaseManager()
+    profile = await db.get_profile_data("alice")   # statistiques, badges, progression en parallèle
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+import psycopg2
+from psycopg2.extensions import POLL_OK, POLL_READ, POLL_WRITE
+from psycopg2.extras import RealDictCursor
+from config import DatabaseConfig
+from database import DatabaseManager, PooledConnection, connection_params, ecn_leaderboard_rows, ecn_stats_row
+from utils.badge_system import badge_names
+from utils.leaderboard_cache import ECN_LEADERBOARD, SCORES_LEADERBOARD, leaderboard_cache
+from utils.statements import PREPARE_SQL, query
+from utils.user_cache import user_cache
+
+
+async def wait_ready(conn):
+    """Attend, sans bloquer la boucle, que la connexion ait fini sa tâche en cours (connexion ou requête)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        state = conn.poll()
+        if state == POLL_OK:
+            return
+        if state not in (POLL_READ, POLL_WRITE):
+            raise psycopg2.OperationalError(f"État de connexion inattendu: {state}")
+
+        fd = conn.fileno()
+        ready = loop.create_future()
+
+        def wake():
+            if not ready.done():
+                ready.set_result(None)
+
+        watch, unwatch = (loop.add_reader, loop.remove_reader) if state == POLL_READ else (loop.add_writer, loop.remove_writer)
+        watch(fd, wake)
+        try:
+            await ready
+        finally:
+            unwatch(fd)
+
+
+class AsyncConnectionPool:
+    """Connexions non bloquantes réutilisées (au plus size, les demandes suivantes attendent).
+
+    Le pool est lié à la boucle d'événements qui l'utilise en premier (un worker uvicorn
+    = une boucle). Une connexion rendue pendant une requête (tâche annulée) ou rompue est
+    fermée au lieu d'être réutilisée."""
+
+    def __init__(self, params: Dict, size: int, prepare: bool = True):
+        self.params = dict(params)
+        self.prepare = prepare
+        self.connect_timeout = self.params.pop('connect_timeout', 10)
+        self.size = size
+        self._idle = []
+        self._slots = None
+
+    async def _connect(self):
+        conn = psycopg2.connect(async_=True, connection_factory=PooledConnection, **self.params)
+        try:
+            # Le délai de connexion de libpq ne s'applique pas en mode non bloquant
+            await asyncio.wait_for(wait_ready(conn), self.connect_timeout)
+            conn.statements_prepared = self.prepare and await self._prepare(conn)
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    @staticmethod
+    async def _prepare(conn) -> bool:
+        """PREPARE du catalogue (connexion en autocommit) ; en cas d'échec, le texte SQL est utilisé"""
+        try:
+            with conn.cursor() as cur:
+                cur.execute(PREPARE_SQL)
+                await wait_ready(conn)
+            return True
+        except psycopg2.Error as e:
+            print(f"⚠️ Requêtes préparées indisponibles, texte SQL utilisé: {e}")
+            return False
+
+    @asynccontextmanager
+    async def connection(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)  # Créé dans la boucle qui l'utilise
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else await self._connect()
+            try:
+                yield conn
+            finally:
+                if conn.closed or conn.isexecuting():
+                    conn.close()
+                else:
+                    self._idle.append(conn)
+
+    def close(self):
+        while self._idle:
+            self._idle.pop().close()
+
+
+class AsyncDatabaseManager:
+    """Équivalent asynchrone des lectures et écritures de DatabaseManager utilisées par les frontaux"""
+
+    def __init__(self, pool_size: Optional[int] = None):
+        self.config = DatabaseConfig()
+        size = pool_size or self.config.pool_size
+        self.pool = AsyncConnectionPool(connection_params(self.config), size, self.config.prepared_statements)
+        self.sync = DatabaseManager(pooled=True)
+        self._writers = ThreadPoolExecutor(max_workers=size, thread_name_prefix="db-write")
+        self._inflight = {}
+
+    async def fetchall(self, name: str, params=(), dict_rows: bool = False) -> List:
+        """Lignes de la requête `name` du catalogue (utils/statements.py)"""
+        async with self.pool.connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor if dict_rows else None) as cur:
+                cur.execute(query(conn, name), params)
+                await wait_ready(conn)
+                return cur.fetchall()
+
+    async def fetchone(self, name: str, params=(), dict_rows: bool = False):
+        rows = await self.fetchall(name, params, dict_rows)
+        return rows[0] if rows else None
+
+    async def close(self):
+        self.pool.close()
+        self._writers.shutdown(wait=True)
+
+    # -- Caches partagés avec DatabaseManager ----------------------------------
+
+    async def _user_cached(self, username: str, dataset: str, loader):
+        version, value = user_cache.lookup(username, dataset)
+        if value is None:
+            value = await loader()
+            user_cache.store(username, dataset, version, value)
+        return value
+
+    async def _leaderboard_cached(self, board: str, key, loader):
+        """Comme leaderboard_cache.get : les chargements simultanés d'un même classement sont fusionnés"""
+        version, rows = leaderboard_cache.lookup(board, key)
+        if rows is not None:
+            return rows
+
+        flight_key = (board, key, version)
+        flight = self._inflight.get(flight_key)
+        if flight is None:
+            flight = self._inflight[flight_key] = asyncio.ensure_future(loader())
+            flight.add_done_callback(lambda _: self._inflight.pop(flight_key, None))
+        rows = await asyncio.shield(flight)
+        leaderboard_cache.store(board, key, version, rows)
+        return rows
+
+    # -- Lectures --------------------------------------------------------------
+
+    async def get_leaderboard(self, specialty=None, limit=10):
+        """Classement général ou par spécialité, servi depuis le cache partagé du processus"""
+        size = leaderboard_cache.config.leaderboard_size
+        if limit > size:
+            return await self._load_leaderboard(specialty, limit) or []
+        rows = await self._leaderboard_cached(SCORES_LEADERBOARD, specialty,
+                                              lambda: self._load_leaderboard(specialty, size))
+        return (rows or [])[:limit]
+
+    async def _load_leaderboard(self, specialty, limit):
+        try:
+            if specialty:
+                return await self.fetchall('specialty_leaderboard', (specialty, limit), dict_rows=True)
+            return await self.fetchall('leaderboard', (limit,), dict_rows=True)
+        except Exception as e:
+            print(f"❌ Erreur lors de la récupération du classement: {e}")
+            return None
+
+    async def get_user_progress_data(self, username: str):
+        """Données de progression d'un utilisateur (mises en cache jusqu'à sa prochaine écriture)"""
+        return await self._user_cached(username, 'progress', lambda: self._load_user_progress_data(username))
+
+    async def _load_user_progress_data(self, username: str):
+        try:
+            specialty_data, timeline_data = await asyncio.gather(
+                self.fetchall('progress_by_specialty', (username,)),
+                self.fetchall('progress_timeline', (username,))
+            )
+            return {'by_specialty': specialty_data, 'timeline': timeline_data}
+        except Exception as e:
+            print(f"Erreur analytics: {e}")
+            return None
+
+    async def get_user_global_stats(self, username: str):
+        return await self._user_cached(username, 'global_stats', lambda: self._load_user_global_stats(username))
+
+    async def _load_user_global_stats(self, username: str):
+        try:
+            return await self.fetchone('global_stats', (username,))
+        except Exception as e:
+            print(f"Erreur statistiques globales: {e}")
+            return None
+
+    async def get_user_badges(self, username: str):
+        return await self._user_cached(username, 'badges', lambda: self._load_user_badges(username))
+
+    async def _load_user_badges(self, username: str):
+        try:
+            return badge_names(row[0] for row in await self.fetchall('user_badges', (username,)))
+        except Exception as e:
+            print(f"Erreur lors de la récupération des badges: {e}")
+            return None
+
+    async def get_ecn_leaderboard(self, limit: int = 20):
+        """Classement des simulations ECN, servi depuis le cache partagé du processus"""
+        size = leaderboard_cache.config.leaderboard_size
+        if limit > size:
+            return await self._load_ecn_leaderboard(limit) or []
+        rows = await self._leaderboard_cached(ECN_LEADERBOARD, None, lambda: self._load_ecn_leaderboard(size))
+        return (rows or [])[:limit]
+
+    async def _load_ecn_leaderboard(self, limit: int):
+        try:
+            top = await self.fetchall('ecn_top', (limit,))
+            if not top:
+                return []
+            stats = await self.fetchall('ecn_leaderboard_stats', ([row[0] for row in top],), dict_rows=True)
+            return ecn_leaderboard_rows(top, {row['user_id']: row for row in stats})
+        except Exception as e:
+            print(f"❌ Erreur classement ECN: {e}")
+            return None
+
+    async def get_user_ecn_stats(self, username: str):
+        """Statistiques ECN d'un utilisateur (mises en cache jusqu'à sa prochaine simulation)"""
+        return await self._user_cached(username, 'ecn_stats', lambda: self._load_user_ecn_stats(username))
+
+    async def _load_user_ecn_stats(self, username: str):
+        # Lecture seule : un utilisateur inconnu n'a pas de statistiques (pas de création de compte)
+        try:
+            row = await self.fetchone('user_id', (username,))
+            if not row:
+                return {}
+            return ecn_stats_row(await self.fetchone('ecn_user_stats', (row[0],), dict_rows=True))
+        except Exception as e:
+            print(f"❌ Erreur stats ECN: {e}")
+            return {}
+
+    async def get_profile_data(self, username: str) -> Dict:
+        """Données de la page Profil, lues en parallèle (une connexion par lecture non mise en cache)"""
+        global_stats, badges, progress, ecn_stats = await asyncio.gather(
+            self.get_user_global_stats(username),
+            self.get_user_badges(username),
+            self.get_user_progress_data(username),
+            self.get_user_ecn_stats(username)
+        )
+        return {
+            'global_stats': global_stats,
+            'badges': badges or [],
+            'progress': progress,
+            'ecn_stats': ecn_stats
+        }
+
+    # -- Écritures -------------------------------------------------------------
+
+    async def _write(self, method, *args, **kwargs):
+        """Transaction synchrone de DatabaseManager dans le pool de threads d'écriture (voir la limite en tête de module)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writers, functools.partial(method, *args, **kwargs))
+
+    async def save_score(self, username, specialty, score, total_questions, time_taken, **kwargs):
+        """DatabaseManager.save_score (mêmes paramètres nommés : awarded_badges, questions, user_answers, answer_clock, draw_id)"""
+        return await self._write(self.sync.save_score, username, specialty, score, total_questions, time_taken, **kwargs)
+
+    async def save_ecn_simulation(self, username: str, simulation_data: Dict, awarded_badges: Optional[List[str]] = None,
+                                  draw_id: Optional[str] = None):
+        return await self._write(self.sync.save_ecn_simulation, username, simulation_data, awarded_badges, draw_id)
+
+    async def purge_consumed_draws(self, ttl: int) -> int:
+        return await self._write(self.sync.purge_consumed_draws, ttl)
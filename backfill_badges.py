@@ -0,0 +1,56 @@
+import argparse
+import time
+from config import BadgeSystem
+from database import DatabaseManager
+from utils.badge_rules import backfill_badges as backfill_chunk
+
+def backfill_badges(chunk_size=5000, rebuild_counters=False):
+    """Attribue rétroactivement tous les badges (seuils modifiés, nouveaux badges) par tranches d'utilisateurs"""
+    db = DatabaseManager()
+    conn = db.get_connection()
+    if conn is None:
+        print("❌ Connexion impossible")
+        return False
+    
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT MIN(id), MAX(id), COUNT(*) FROM users")
+            first_id, last_id, total_users = cur.fetchone()
+            if not total_users:
+                print("ℹ️ Aucun utilisateur")
+                return True
+            
+            print(f"🏅 {len(BadgeSystem.BADGES)} règles, {total_users} utilisateurs, tranches de {chunk_size}")
+            start = time.perf_counter()
+            added = {}
+            
+            for lower in range(first_id, last_id + 1, chunk_size):
+                upper = min(lower + chunk_size - 1, last_id)
+                if rebuild_counters:
+                    db.rebuild_user_counters(cur, lower, upper)
+                for badge_type, count in backfill_chunk(cur, lower, upper).items():
+                    added[badge_type] = added.get(badge_type, 0) + count
+                conn.commit()
+                
+                done = (upper - first_id + 1) / (last_id - first_id + 1)
+                print(f"  {done:6.1%}  utilisateurs {lower}-{upper}  "
+                      f"{sum(added.values())} badges ajoutés  {time.perf_counter() - start:.1f}s")
+        
+        print(f"✅ Terminé en {time.perf_counter() - start:.1f}s")
+        for badge_type, count in sorted(added.items()):
+            print(f"   {BadgeSystem.BADGES[badge_type]['name']}: +{count}")
+        return True
+        
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Erreur backfill des badges: {e}")
+        return False
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Attribution rétroactive des badges")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Utilisateurs par transaction")
+    parser.add_argument("--rebuild-counters", action="store_true", help="Recalculer d'abord les compteurs depuis l'historique")
+    args = parser.parse_args()
+    backfill_badges(args.chunk_size, args.rebuild_counters)
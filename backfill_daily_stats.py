@@ -0,0 +1,46 @@
+import argparse
+import time
+from database import DatabaseManager
+from utils.rollups import rebuild_daily_stats
+
+def backfill_daily_stats(chunk_size=5000):
+    """Reconstruit les agrégats journaliers (user_daily_stats) depuis l'historique des scores, par tranches"""
+    db = DatabaseManager()
+    conn = db.get_connection()
+    if conn is None:
+        print("❌ Connexion impossible")
+        return False
+    
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT MIN(id), MAX(id) FROM users")
+            first_id, last_id = cur.fetchone()
+            if first_id is None:
+                print("ℹ️ Aucun utilisateur")
+                return True
+            
+            start = time.perf_counter()
+            rows = 0
+            for lower in range(first_id, last_id + 1, chunk_size):
+                upper = min(lower + chunk_size - 1, last_id)
+                rows += rebuild_daily_stats(cur, lower, upper)
+                conn.commit()
+                
+                done = (upper - first_id + 1) / (last_id - first_id + 1)
+                print(f"  {done:6.1%}  utilisateurs {lower}-{upper}  {rows} agrégats  {time.perf_counter() - start:.1f}s")
+        
+        print(f"✅ {rows} agrégats journaliers reconstruits en {time.perf_counter() - start:.1f}s")
+        return True
+        
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Erreur backfill des agrégats: {e}")
+        return False
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconstruction des agrégats journaliers de progression")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Utilisateurs par transaction")
+    args = parser.parse_args()
+    backfill_daily_stats(args.chunk_size)
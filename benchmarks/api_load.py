@@ -0,0 +1,206 @@
+"""Test de charge HTTP de l'API JSON (api.py), sans navigateur.
+
+Des clients virtuels (un thread et une connexion keep-alive chacun) enchaînent quiz,
+compétitions, simulations ECN et consultations de classements contre une API déjà
+démarrée, directement ou derrière nginx. Chaque client rejoue le cycle complet :
+tirage des questions, correction, enregistrement du score.
+
+Exemples (depuis la racine du dépôt, API démarrée avec uvicorn api:app --workers 4) :
+    python -m benchmarks.api_load --url http://localhost:8000 --clients 50 --duration 60
+    python -m benchmarks.api_load --url http://localhost --rates quiz=30,leaderboard=30 --output benchmarks/results/api.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.load_generator import PERCENTILES, Recorder, git_commit, parse_rates  # noqa: E402
+
+DEFAULT_RATES = "quiz=6,competition=2,simulation=0.5,leaderboard=6"
+
+
+class ApiClient(threading.Thread):
+    """Client virtuel : scénarios tirés selon un processus de Poisson, comme load_generator"""
+
+    def __init__(self, index, url, specialties, rates, deadline, recorder, seed):
+        super().__init__(daemon=True)
+        self.username = f"api_student_{index:05d}"
+        self.url = urlsplit(url)
+        self.specialties = specialties
+        self.rates = rates
+        self.deadline = deadline
+        self.recorder = recorder
+        self.rng = random.Random(seed)
+        self.total_rate = sum(rates.values()) / 60.0
+        self.conn = None
+
+    def request(self, method, path, body=None):
+        """Requête JSON sur la connexion du client (rouverte si le serveur l'a fermée)"""
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.url.hostname, self.url.port or 80, timeout=30)
+                self.conn.connect()
+                self.conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Pas d'attente d'ACK différé
+            try:
+                payload = json.dumps(body).encode() if body is not None else None
+                self.conn.request(method, path, payload, {'Content-Type': 'application/json'})
+                response = self.conn.getresponse()
+                data = json.loads(response.read() or b"null")
+            except (http.client.HTTPException, ConnectionError):
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+                continue
+            if response.status >= 400:
+                raise RuntimeError(f"{method} {path} → {response.status} {data}")
+            return data
+
+    def timed(self, name, method, path, body=None):
+        return self.recorder.timed(f"{method} {name}", self.request, method, path, body)
+
+    def run(self):
+        scenarios = list(self.rates)
+        weights = [self.rates[name] for name in scenarios]
+        while True:
+            wait = self.rng.expovariate(self.total_rate)
+            if time.time() + wait >= self.deadline:
+                break
+            time.sleep(wait)
+            scenario = self.rng.choices(scenarios, weights)[0]
+            try:
+                self.recorder.timed(f"scenario.{scenario}", getattr(self, f"run_{scenario}"))
+            except Exception:
+                pass
+        if self.conn is not None:
+            self.conn.close()
+
+    def answers_for(self, questions):
+        # Le client ne connaît pas le corrigé : réponses au hasard
+        answers = []
+        for question in questions:
+            options = question['options']
+            if question['type'] == 'single':
+                selected = self.rng.choice(options)
+            else:
+                selected = self.rng.sample(options, self.rng.randint(1, min(3, len(options))))
+            answers.append({'question_id': question['id'], 'selected': selected})
+        return answers
+
+    def run_quiz(self):
+        specialty = self.rng.choice(self.specialties)
+        draw = self.timed("/api/questions", "GET", f"/api/questions?count=10&specialty={specialty}")
+        answers = self.answers_for(draw['questions'])
+        self.timed("/api/answers/score", "POST", "/api/answers/score", {'answers': answers})
+        self.timed("/api/scores", "POST", "/api/scores", {
+            'username': self.username, 'mode': 'quiz', 'specialty': specialty, 'answers': answers,
+            'time_taken': self.rng.randint(60, 600),
+            'latencies_ms': [self.rng.randint(2000, 60000) for _ in answers], 'draw': draw['draw']
+        })
+
+    def run_competition(self):
+        draw = self.timed("/api/questions", "GET", "/api/questions?count=50")
+        questions = draw['questions']
+        answers = self.answers_for(questions[:self.rng.randint(10, len(questions))])
+        self.timed("/api/scores", "POST", "/api/scores", {
+            'username': self.username, 'mode': 'competition', 'answers': answers, 'time_taken': 600,
+            'draw': draw['draw']
+        })
+
+    def run_simulation(self):
+        session = self.timed("/api/ecn/session", "POST", "/api/ecn/session", {})
+        self.timed("/api/ecn/simulations", "POST", "/api/ecn/simulations", {
+            'username': self.username, 'answers': self.answers_for(session['questions']),
+            'time_taken': self.rng.randint(1800, 3600), 'draw': session['draw']
+        })
+
+    def run_leaderboard(self):
+        specialty = self.rng.choice([""] + self.specialties)
+        self.timed("/api/leaderboard", "GET", f"/api/leaderboard?limit=10&specialty={specialty}")
+        self.timed("/api/ecn/leaderboard", "GET", "/api/ecn/leaderboard?limit=10")
+
+
+def run_load(args):
+    probe = ApiClient(0, args.url, [], {'quiz': 1}, 0, Recorder(), args.seed)
+    specialties = [s['name'] for s in probe.request("GET", "/api/specialties")['specialties']]
+
+    rates = parse_rates(args.rates)
+    recorder = Recorder()
+    started = time.time()
+    deadline = started + args.duration
+    clients = []
+    for index in range(args.clients):
+        client = ApiClient(index, args.url, specialties, rates, deadline, recorder, args.seed + index)
+        clients.append(client)
+        client.start()
+        time.sleep(args.ramp_up / max(1, args.clients))
+    for client in clients:
+        client.join()
+    elapsed = time.time() - started
+
+    operations = recorder.summary(elapsed)
+    requests = {name: stats for name, stats in operations.items() if not name.startswith("scenario.")}
+    return {
+        'metadata': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'url': args.url,
+            'clients': args.clients,
+            'duration_s': args.duration,
+            'rates_per_min': rates,
+            'seed': args.seed
+        },
+        'summary': {
+            'elapsed_s': elapsed,
+            'requests': sum(s['count'] for s in requests.values()),
+            'requests_per_s': sum(s['count'] for s in requests.values()) / elapsed if elapsed else 0.0,
+            'errors': sum(s['errors'] for s in requests.values())
+        },
+        'operations': operations
+    }
+
+
+def print_report(report):
+    summary = report['summary']
+    print(f"\n📊 {summary['requests']} requêtes en {summary['elapsed_s']:.1f}s "
+          f"({summary['requests_per_s']:.1f}/s), {summary['errors']} erreur(s)")
+    columns = [f"p{p}" for p in PERCENTILES]
+    print(f"{'requête':40s} {'n':>7s} " + " ".join(f"{c:>9s}" for c in columns))
+    for name, stats in report['operations'].items():
+        if stats['count']:
+            print(f"{name:40s} {stats['count']:7d} " + " ".join(f"{stats[f'{c}_ms']:7.1f}ms" for c in columns))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test de charge de l'API JSON ECN Prep")
+    parser.add_argument("--url", default="http://localhost:8000", help="Adresse de l'API ou de nginx")
+    parser.add_argument("--clients", type=int, default=20, help="Nombre de clients virtuels")
+    parser.add_argument("--duration", type=float, default=60, help="Durée du test en secondes")
+    parser.add_argument("--ramp-up", type=float, default=5, help="Durée de montée en charge en secondes")
+    parser.add_argument("--rates", default=DEFAULT_RATES, help="Scénarios par minute et par client")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args(argv)
+
+    report = run_load(args)
+    print_report(report)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Résultats enregistrés dans {args.output}")
+    return 1 if report['summary']['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
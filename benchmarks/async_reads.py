@@ -0,0 +1,97 @@
+"""Lectures de la page Profil : DatabaseManager (séquentiel) contre AsyncDatabaseManager (asyncio.gather).
+
+Caches contournés : chaque itération relit statistiques globales, badges, progression
+et statistiques ECN en base. Le second volet lance --concurrency pages en même temps,
+en threads (synchrone, pool de connexions) puis en coroutines (une seule boucle, aucun
+thread par requête en vol).
+
+Exemple (depuis la racine du dépôt, base locale sans SSL) :
+    DB_SSLMODE=disable python -m benchmarks.async_reads --username alice --iterations 50 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from async_database import AsyncDatabaseManager  # noqa: E402
+from database import DatabaseManager  # noqa: E402
+from utils.badge_system import BadgeManager  # noqa: E402
+
+
+def sync_profile(db, badges, username):
+    return (db._load_user_global_stats(username), badges._load_user_badges(username),
+            db._load_user_progress_data(username), db._load_user_ecn_stats(username))
+
+
+async def async_profile(db, username):
+    return await asyncio.gather(db._load_user_global_stats(username), db._load_user_badges(username),
+                                db._load_user_progress_data(username), db._load_user_ecn_stats(username))
+
+
+def report(name, durations):
+    durations = sorted(durations)
+    print(f"{name:40s} médiane {statistics.median(durations) * 1000:7.2f} ms   "
+          f"p95 {durations[int(len(durations) * 0.95) - 1] * 1000:7.2f} ms")
+
+
+def timed(fn, iterations):
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+async def run_async(args):
+    db = AsyncDatabaseManager(args.pool_size)
+    await async_profile(db, args.username)  # Ouverture des connexions
+
+    durations = []
+    for _ in range(args.iterations):
+        start = time.perf_counter()
+        await async_profile(db, args.username)
+        durations.append(time.perf_counter() - start)
+    report("async : une page (gather)", durations)
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        await asyncio.gather(*[async_profile(db, args.username) for _ in range(args.concurrency)])
+    elapsed = time.perf_counter() - start
+    print(f"{'async : pages concurrentes':40s} {args.iterations * args.concurrency / elapsed:7.1f} pages/s")
+    await db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lectures de profil synchrones contre asynchrones")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=20, help="Pages lues simultanément")
+    parser.add_argument("--pool-size", type=int, default=10)
+    args = parser.parse_args()
+
+    db = DatabaseManager(pooled=True)
+    db.config.pool_size = args.pool_size
+    badges = BadgeManager()
+    badges.db = db
+    sync_profile(db, badges, args.username)  # Ouverture des connexions
+
+    report("sync : une page (séquentiel)", timed(lambda: sync_profile(db, badges, args.username), args.iterations))
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            list(executor.map(lambda _: sync_profile(db, badges, args.username), range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+    print(f"{'sync : pages concurrentes (threads)':40s} {args.iterations * args.concurrency / elapsed:7.1f} pages/s")
+
+    asyncio.run(run_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""Micro-benchmarks reproductibles des moteurs de quiz, dossiers cliniques et simulation ECN.
+
+Chaque benchmark reçoit une fixture ``benchmark`` (même convention que
+pytest-benchmark) et s'exécute sur la banque livrée dans ``data/`` puis sur
+des banques générées 10×/100×/1000× plus grandes.
+
+Exemples (depuis la racine du dépôt) :
+    python -m benchmarks.bench_engines                                  # banque livrée, 10× et 100×
+    python -m benchmarks.bench_engines --scales 1,1000 --output benchmarks/results/base.json
+    python -m benchmarks.bench_engines --compare benchmarks/results/base.json --threshold 10
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(REPO_ROOT, "data")
+BANKS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results", "banks")
+
+
+def build_scaled_bank(scale):
+    """Génère (une seule fois) une banque scale× plus grande en dupliquant chaque spécialité"""
+    if scale == 1:
+        return DATA_DIR
+
+    target = os.path.join(BANKS_DIR, f"x{scale}")
+    marker = os.path.join(target, ".complete")
+    if os.path.exists(marker):
+        return target
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.makedirs(target)
+    for file in sorted(os.listdir(DATA_DIR)):
+        if not file.endswith(".json"):
+            continue
+        with open(os.path.join(DATA_DIR, file), encoding="utf-8") as f:
+            data = json.load(f)
+        scaled = {}
+        for key in ("quizzes", "clinical_cases"):
+            items = data.get(key, [])
+            scaled[key] = [
+                dict(item, **({'question': f"{item['question']} [{copy}]"} if 'question' in item
+                              else {'title': f"{item.get('title', '')} [{copy}]"}))
+                for copy in range(scale) for item in items
+            ]
+        with open(os.path.join(target, file), "w", encoding="utf-8") as f:
+            json.dump(scaled, f, ensure_ascii=False)
+    open(marker, "w").close()
+    return target
+
+
+class Benchmark:
+    """Fixture de mesure : calibre le nombre d'itérations puis répète les mesures"""
+
+    def __init__(self, min_time=0.05, rounds=7, max_time=5.0):
+        self.min_time = min_time
+        self.rounds = rounds
+        self.max_time = max_time
+        self.stats = None
+
+    def __call__(self, func, *args, **kwargs):
+        # Calibration : assez d'itérations pour qu'un tour dure au moins min_time
+        iterations = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                result = func(*args, **kwargs)
+            duration = time.perf_counter() - start
+            if duration >= self.min_time or iterations >= 1_000_000:
+                break
+            iterations *= 10 if duration < self.min_time / 10 else 2
+
+        timings = [duration / iterations]
+        deadline = time.perf_counter() + self.max_time
+        while len(timings) < self.rounds and time.perf_counter() < deadline:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                func(*args, **kwargs)
+            timings.append((time.perf_counter() - start) / iterations)
+
+        self.stats = {
+            'min': min(timings),
+            'median': statistics.median(timings),
+            'mean': statistics.mean(timings),
+            'stddev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            'rounds': len(timings),
+            'iterations': iterations
+        }
+        return result
+
+
+def answers_for(questions, rng):
+    """Réponses aléatoires mais reproductibles à une liste de questions"""
+    answers = []
+    for question in questions:
+        texts = [opt['text'] for opt in question['options']]
+        if question['type'] == 'single':
+            answers.append({'selected': rng.choice(texts)})
+        else:
+            answers.append({'selected': rng.sample(texts, rng.randint(1, len(texts)))})
+    return answers
+
+
+# -- Benchmarks ---------------------------------------------------------------
+
+def bench_load_all_data(benchmark, ctx):
+    from utils.quiz_manager import QuizManager
+    benchmark(QuizManager, ctx['data_dir'])
+
+
+def bench_get_quiz_questions(benchmark, ctx):
+    benchmark(ctx['quiz_mgr'].get_quiz_questions, ctx['largest_specialty'], 10)
+
+
+def _competition_draw_per_specialty(quiz_mgr):
+    """Ancien tirage de compétition : 10 questions par spécialité, mélange, 50 gardées"""
+    all_questions = []
+    for specialty in quiz_mgr.get_specialties():
+        all_questions.extend(quiz_mgr.get_quiz_questions(specialty, 10))
+    random.shuffle(all_questions)
+    return all_questions[:50]
+
+
+def bench_competition_draw_per_specialty(benchmark, ctx):
+    benchmark(_competition_draw_per_specialty, ctx['quiz_mgr'])
+
+
+def bench_sample_question_ids(benchmark, ctx):
+    quiz_mgr = ctx['quiz_mgr']
+    benchmark(quiz_mgr.sample_question_ids, 50, dict.fromkeys(quiz_mgr.get_specialties(), 1))
+
+
+def bench_calculate_score(benchmark, ctx):
+    questions = ctx['quiz_mgr'].quizzes[ctx['largest_specialty']][:20]
+    benchmark(ctx['quiz_mgr'].calculate_score, answers_for(questions, ctx['rng']), questions)
+
+
+def bench_validate_clinical_case_step(benchmark, ctx):
+    case = ctx['case']
+    step_index = next(i for i, step in enumerate(case['steps']) if 'question' in step)
+    step = case['steps'][step_index]
+    answer = step.get('correct_options') or step.get('correct_answer', "")
+    benchmark(ctx['quiz_mgr'].validate_clinical_case_step, case, step_index, answer)
+
+
+def bench_calculate_clinical_case_score(benchmark, ctx):
+    case = ctx['case']
+    answers = [
+        {'step': i, 'answer': step.get('correct_options') or step.get('correct_answer', "")}
+        for i, step in enumerate(case['steps']) if 'question' in step
+    ]
+    benchmark(ctx['quiz_mgr'].calculate_clinical_case_score, case, answers)
+
+
+def bench_generate_simulation_session(benchmark, ctx):
+    benchmark(ctx['simulator'].generate_simulation_session)
+
+
+def bench_calculate_ecn_score(benchmark, ctx):
+    questions = ctx['simulator'].generate_simulation_session()['questions']
+    benchmark(ctx['simulator'].calculate_ecn_score, answers_for(questions, ctx['rng']), questions)
+
+
+BENCHMARKS = [
+    bench_load_all_data,
+    bench_get_quiz_questions,
+    bench_competition_draw_per_specialty,
+    bench_sample_question_ids,
+    bench_calculate_score,
+    bench_validate_clinical_case_step,
+    bench_calculate_clinical_case_score,
+    bench_generate_simulation_session,
+    bench_calculate_ecn_score,
+]
+
+
+def build_context(data_dir):
+    from utils.ecn_simulator import ECNSimulator
+    from utils.quiz_manager import QuizManager
+
+    quiz_mgr = QuizManager(data_dir)
+    cases = [case for cases in quiz_mgr.clinical_cases.values() for case in cases
+             if any('question' in step for step in case.get('steps', []))]
+    return {
+        'data_dir': data_dir,
+        'quiz_mgr': quiz_mgr,
+        'simulator': ECNSimulator(quiz_mgr),
+        'largest_specialty': max(quiz_mgr.quizzes, key=lambda s: len(quiz_mgr.quizzes[s])),
+        'case': max(cases, key=lambda case: len(case['steps'])),
+        'rng': random.Random(0)
+    }
+
+
+def run_benchmarks(scales, selected, options):
+    results = []
+    for scale in scales:
+        data_dir = build_scaled_bank(scale)
+        ctx = build_context(data_dir)
+        total_questions = sum(len(q) for q in ctx['quiz_mgr'].quizzes.values())
+        print(f"\n📦 Banque x{scale} ({total_questions} questions)")
+
+        for bench in BENCHMARKS:
+            name = bench.__name__[len("bench_"):]
+            if selected and name not in selected:
+                continue
+            random.seed(0)
+            ctx['rng'] = random.Random(0)
+            benchmark = Benchmark(**options)
+            bench(benchmark, ctx)
+            stats = benchmark.stats
+            results.append({'name': name, 'scale': scale, 'stats': stats})
+            print(f"  {name:36s} médiane {stats['median'] * 1e6:12.2f} µs  (min {stats['min'] * 1e6:.2f} µs, "
+                  f"{stats['rounds']}×{stats['iterations']})")
+    return results
+
+
+def compare(results, baseline_path, threshold, stat="min"):
+    """Signale les benchmarks dont la statistique choisie régresse de plus de threshold %"""
+    with open(baseline_path) as f:
+        baseline = {(b['name'], b['scale']): b['stats'] for b in json.load(f)['benchmarks']}
+
+    regressions = []
+    print(f"\n🔍 Comparaison avec {baseline_path} ({stat}, seuil {threshold:.0f}%)")
+    for result in results:
+        old = baseline.get((result['name'], result['scale']))
+        if not old:
+            continue
+        change = (result['stats'][stat] - old[stat]) / old[stat] * 100
+        flag = "❌" if change > threshold else "✅"
+        print(f"  {flag} {result['name']:36s} x{result['scale']:<5d} {change:+8.1f}%")
+        if change > threshold:
+            regressions.append((result['name'], result['scale'], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks des moteurs ECN Prep")
+    parser.add_argument("--scales", default="1,10,100", help="Facteurs de taille de banque, ex: 1,10,100,1000")
+    parser.add_argument("--only", help="Benchmarks à exécuter, séparés par des virgules")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Durée minimale d'un tour (s)")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--max-time", type=float, default=5.0, help="Durée maximale par benchmark (s)")
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    parser.add_argument("--compare", metavar="BASELINE", help="Fichier JSON de référence")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Régression tolérée en %%")
+    parser.add_argument("--stat", choices=["min", "median", "mean"], default="min", help="Statistique comparée")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, REPO_ROOT)
+    scales = [int(s) for s in args.scales.split(",")]
+    selected = set(args.only.split(",")) if args.only else None
+    results = run_benchmarks(scales, selected, {'min_time': args.min_time, 'rounds': args.rounds, 'max_time': args.max_time})
+
+    if args.output:
+        try:
+            commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, cwd=REPO_ROOT).strip()
+        except Exception:
+            commit = None
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({
+                'commit': commit,
+                'timestamp': datetime.now().isoformat(),
+                'machine': {'python': platform.python_version(), 'processor': platform.processor(), 'system': platform.platform()},
+                'benchmarks': results
+            }, f, indent=2)
+        print(f"\n✅ Résultats enregistrés dans {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold, args.stat)
+        if regressions:
+            print(f"\n❌ {len(regressions)} régression(s) au-delà de {args.threshold:.0f}%")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Vérification du classement en direct (LISTEN/NOTIFY) contre un PostgreSQL local.
+
+Le processus courant démarre l'écoute ; des processus « écrivains » enregistrent des
+scores de compétition via DatabaseManager.save_score. Le script mesure le délai
+entre le commit et l'application en mémoire, puis compare le top en mémoire au
+classement calculé en SQL. Code de sortie 1 en cas d'écart.
+
+Exemple (depuis la racine du dépôt, base locale sans SSL) :
+    DB_SSLMODE=disable python -m benchmarks.live_ranking_check --writers 4 --scores 50
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from database import DatabaseManager  # noqa: E402
+from utils.live_ranking import LiveRanking  # noqa: E402
+
+
+def writer(index: int, scores: int, commits):
+    db = DatabaseManager()
+    rng = random.Random(index)
+    for k in range(scores):
+        username = f"live_check_{index:02d}_{rng.randrange(5)}"
+        if db.save_score(username, "competition", rng.randrange(0, 100), 50, 600):
+            commits.put(time.time())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classement en direct par LISTEN/NOTIFY")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--scores", type=int, default=50, help="Scores écrits par processus écrivain")
+    args = parser.parse_args()
+
+    db = DatabaseManager()
+    ranking = LiveRanking().start(db)
+    if not ranking.wait_ready(30):
+        sys.exit("❌ Instantané initial non chargé (base inaccessible ?)")
+
+    expected = args.writers * args.scores
+    commits = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=writer, args=(i, args.scores, commits)) for i in range(args.writers)]
+    start = time.time()
+    for process in processes:
+        process.start()
+
+    # Délai commit → application, échantillonné en suivant le compteur d'événements
+    lags, seen = [], 0
+    deadline = time.time() + 120
+    while seen < expected and time.time() < deadline:
+        committed_at = commits.get(timeout=120)
+        seen += 1
+        while ranking.events_applied < seen and time.time() < deadline:
+            time.sleep(0.0005)
+        lags.append((time.time() - committed_at) * 1000)
+    for process in processes:
+        process.join()
+    elapsed = time.time() - start
+
+    print(f"Scores écrits : {expected} en {elapsed:.1f}s, appliqués : {ranking.events_applied}")
+    if lags:
+        lags.sort()
+        print(f"Délai commit → mémoire : médiane {statistics.median(lags):.1f} ms, "
+              f"p95 {lags[int(len(lags) * 0.95) - 1]:.1f} ms, max {lags[-1]:.1f} ms")
+
+    time.sleep(ranking.config.refresh_interval)
+    in_memory = [(row['username'], round(row['total_score'])) for row in ranking.top("competition", 20)]
+    in_sql = [(row['username'], int(row['total_score'])) for row in db._load_leaderboard("competition", 20)]
+    if ranking.events_applied < expected or sorted(in_memory) != sorted(in_sql):
+        print("❌ Le classement en mémoire diffère du classement SQL")
+        print("  mémoire :", in_memory[:5])
+        print("  SQL     :", in_sql[:5])
+        sys.exit(1)
+    print("✅ Top 20 en mémoire identique au classement SQL (0 requête par rafraîchissement de page)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+"""Générateur de charge synthétique sans interface Streamlit.
+
+Des étudiants virtuels enchaînent quiz, dossiers cliniques, compétitions,
+simulations ECN et consultations (profil, classements) en appelant le vrai
+code de QuizManager, ECNSimulator, DatabaseManager et BadgeManager.
+
+Exemples (depuis la racine du dépôt, Postgres local) :
+    python -m benchmarks.load_generator --students 50 --duration 120 --db-host localhost --db-sslmode disable
+    python -m benchmarks.load_generator --rates quiz=4,simulation=0.5 --output benchmarks/results/load.json
+    python -m benchmarks.load_generator --compare benchmarks/results/avant.json benchmarks/results/apres.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+DEFAULT_RATES = "quiz=3,clinical=1,competition=0.5,simulation=0.2,profile=2,leaderboard=2"
+PERCENTILES = (50, 90, 95, 99)
+
+
+def parse_rates(text):
+    """Convertit 'quiz=3,clinical=1' en {'quiz': 3.0, 'clinical': 1.0} (opérations par minute et par étudiant)"""
+    rates = {}
+    for item in text.split(","):
+        name, value = item.split("=")
+        rates[name.strip()] = float(value)
+    return rates
+
+
+def read_rss_mb():
+    """Mémoire résidente du processus courant en Mo"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+class Recorder:
+    """Collecte les latences par opération (thread-safe)"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def timed(self, name, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.errors[name] += 1
+            raise
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.latencies[name].append(elapsed)
+        return result
+
+    def summary(self, duration):
+        import numpy as np
+        operations = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            values = np.asarray(self.latencies.get(name, []), dtype=float)
+            stats = {
+                'count': int(len(values)),
+                'errors': int(self.errors.get(name, 0)),
+                'throughput_per_s': len(values) / duration if duration else 0.0
+            }
+            if len(values):
+                stats.update({f"p{p}_ms": float(np.percentile(values, p)) for p in PERCENTILES})
+                stats.update({'mean_ms': float(values.mean()), 'max_ms': float(values.max())})
+            operations[name] = stats
+        return operations
+
+
+class ResourceSampler(threading.Thread):
+    """Échantillonne périodiquement les connexions Postgres et la mémoire du processus"""
+
+    def __init__(self, db, interval=1.0):
+        super().__init__(daemon=True)
+        self.db = db
+        self.interval = interval
+        self.connections = []
+        self.rss = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        conn = self.db.get_connection()
+        try:
+            while not self._stop_event.is_set():
+                self.rss.append(read_rss_mb())
+                if conn is not None:
+                    try:
+                        with conn.cursor() as cur:
+                            cur.execute("SELECT COUNT(*) FROM pg_stat_activity WHERE datname = current_database()")
+                            self.connections.append(cur.fetchone()[0])
+                        conn.commit()
+                    except Exception:
+                        conn.rollback()
+                self._stop_event.wait(self.interval)
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class VirtualStudent(threading.Thread):
+    """Étudiant virtuel : choisit ses scénarios selon un processus de Poisson par type d'activité"""
+
+    def __init__(self, index, env, rates, deadline, recorder, accuracy, seed):
+        super().__init__(daemon=True)
+        self.username = f"load_student_{index:05d}"
+        self.env = env
+        self.rates = rates
+        self.deadline = deadline
+        self.recorder = recorder
+        self.accuracy = accuracy
+        self.rng = random.Random(seed)
+        self.total_rate = sum(rates.values()) / 60.0
+
+    def run(self):
+        scenarios = list(self.rates)
+        weights = [self.rates[name] for name in scenarios]
+        while True:
+            wait = self.rng.expovariate(self.total_rate)
+            if time.time() + wait >= self.deadline:
+                break
+            time.sleep(wait)
+            scenario = self.rng.choices(scenarios, weights)[0]
+            try:
+                self.recorder.timed(f"scenario.{scenario}", getattr(self, f"run_{scenario}"))
+            except Exception:
+                pass
+
+    # -- Réponses simulées -------------------------------------------------
+    def answer_question(self, question):
+        correct = [opt['text'] for opt in question['options'] if opt.get('correct', False)]
+        wrong = [opt['text'] for opt in question['options'] if not opt.get('correct', False)]
+        good = self.rng.random() < self.accuracy
+        if question['type'] == 'single':
+            return {'selected': correct[0] if good and correct else self.rng.choice(wrong or correct)}
+        return {'selected': correct if good else self.rng.sample(wrong, min(len(wrong), 2))}
+
+    # -- Scénarios ---------------------------------------------------------
+    def run_quiz(self):
+        quiz_mgr, db, timed = self.env['quiz_mgr'], self.env['db'], self.recorder.timed
+        specialty = self.rng.choice(self.env['quiz_specialties'])
+        questions = timed("quiz.get_quiz_questions", quiz_mgr.get_quiz_questions, specialty, 10)
+        answers = [self.answer_question(q) for q in questions]
+        score = timed("quiz.calculate_score", quiz_mgr.calculate_score, answers, questions)
+        timed("db.save_score", db.save_score, self.username, specialty, score, len(questions), self.rng.randint(60, 600),
+              awarded_badges=[])
+
+    def run_clinical(self):
+        quiz_mgr, db, timed = self.env['quiz_mgr'], self.env['db'], self.recorder.timed
+        specialty = self.rng.choice(self.env['case_specialties'])
+        case = timed("clinical.get_progressive_clinical_case", quiz_mgr.get_progressive_clinical_case, specialty)
+        answers = []
+        for index, step in enumerate(case.get('steps', [])):
+            if 'question' not in step:
+                continue
+            if 'correct_options' in step:
+                answer = list(step['correct_options']) if self.rng.random() < self.accuracy else []
+            elif 'correct_answer' in step and self.rng.random() < self.accuracy:
+                answer = step['correct_answer']
+            else:
+                answer = self.rng.choice(step.get('options') or ["je ne sais pas"])
+            timed("clinical.validate_clinical_case_step", quiz_mgr.validate_clinical_case_step, case, index, answer)
+            answers.append({'step': index, 'answer': answer})
+        results = timed("clinical.calculate_clinical_case_score", quiz_mgr.calculate_clinical_case_score, case, answers)
+        timed("db.save_clinical_case_score", db.save_clinical_case_score, self.username, specialty, case['title'],
+              results['score_percentage'], results['total_steps'], results['correct_steps'], awarded_badges=[])
+
+    def run_competition(self):
+        quiz_mgr, db, timed = self.env['quiz_mgr'], self.env['db'], self.recorder.timed
+
+        def draw_questions():
+            all_questions = []
+            for specialty in quiz_mgr.get_specialties():
+                all_questions.extend(quiz_mgr.get_quiz_questions(specialty, 10))
+            random.shuffle(all_questions)
+            return all_questions[:50]
+
+        questions = timed("competition.draw_questions", draw_questions)
+        answered = self.rng.randint(10, len(questions)) if questions else 0
+        score = sum(2 if self.rng.random() < self.accuracy else -1 for _ in range(answered))
+        timed("db.save_score", db.save_score, self.username, "competition", max(0, score), answered, 600)
+
+    def run_simulation(self):
+        simulator, db, timed = self.env['simulator'], self.env['db'], self.recorder.timed
+        session = timed("ecn.generate_simulation_session", simulator.generate_simulation_session)
+        answers = [self.answer_question(q) for q in session['questions']]
+        results = timed("ecn.calculate_ecn_score", simulator.calculate_ecn_score, answers, session['questions'])
+        results_data = {'session': session, 'results': results, 'time_taken': self.rng.randint(1800, 3600), 'user_answers': answers}
+        timed("db.save_ecn_simulation", db.save_ecn_simulation, self.username, results_data, awarded_badges=[])
+
+    def run_profile(self):
+        db, badge_mgr, analytics, timed = self.env['db'], self.env['badge_mgr'], self.env['analytics'], self.recorder.timed
+        timed("badges.get_user_badges", badge_mgr.get_user_badges, self.username)
+        timed("analytics.get_user_progress_data", analytics.get_user_progress_data, self.username)
+        timed("db.get_user_ecn_stats", db.get_user_ecn_stats, self.username)
+
+    def run_leaderboard(self):
+        db, timed = self.env['db'], self.recorder.timed
+        specialty = self.rng.choice([None] + self.env['quiz_specialties'])
+        timed("db.get_leaderboard", db.get_leaderboard, specialty, 10)
+        timed("db.get_ecn_leaderboard", db.get_ecn_leaderboard, 10)
+
+
+def build_environment():
+    """Instancie les vrais gestionnaires, avec un compteur de connexions ouvertes"""
+    from database import DatabaseManager
+    from utils.analytics import Analytics
+    from utils.badge_system import BadgeManager
+    from utils.ecn_simulator import ECNSimulator
+    from utils.quiz_manager import QuizManager
+
+    class CountingDatabaseManager(DatabaseManager):
+        def __init__(self):
+            super().__init__()
+            self.connections_opened = 0
+            self._count_lock = threading.Lock()
+
+        def get_connection(self):
+            with self._count_lock:
+                self.connections_opened += 1
+            return super().get_connection()
+
+    db = CountingDatabaseManager()
+    quiz_mgr = QuizManager()
+    badge_mgr = BadgeManager()
+    badge_mgr.db = db
+    analytics = Analytics()
+    analytics.db = db
+    return {
+        'db': db,
+        'quiz_mgr': quiz_mgr,
+        'badge_mgr': badge_mgr,
+        'analytics': analytics,
+        'simulator': ECNSimulator(quiz_mgr),
+        'quiz_specialties': [s for s in quiz_mgr.get_specialties() if quiz_mgr.quizzes[s]],
+        'case_specialties': [s for s in quiz_mgr.get_specialties() if quiz_mgr.clinical_cases[s]]
+    }
+
+
+def run_load(args):
+    env = build_environment()
+    if not args.skip_init and not env['db'].init_database():
+        print("❌ Initialisation de la base impossible")
+        return None
+
+    rates = parse_rates(args.rates)
+    recorder = Recorder()
+    sampler = ResourceSampler(env['db'], args.sample_interval)
+    rss_start = read_rss_mb()
+    sampler.start()
+
+    started = time.time()
+    deadline = started + args.duration
+    students = []
+    for index in range(args.students):
+        student = VirtualStudent(index, env, rates, deadline, recorder, args.accuracy, args.seed + index)
+        students.append(student)
+        student.start()
+        time.sleep(args.ramp_up / max(1, args.students))
+    for student in students:
+        student.join()
+    elapsed = time.time() - started
+    sampler.stop()
+
+    operations = recorder.summary(elapsed)
+    scenarios = {name: stats for name, stats in operations.items() if name.startswith("scenario.")}
+    connections = sampler.connections or [0]
+    return {
+        'metadata': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'students': args.students,
+            'duration_s': args.duration,
+            'rates_per_min': rates,
+            'accuracy': args.accuracy,
+            'seed': args.seed
+        },
+        'summary': {
+            'elapsed_s': elapsed,
+            'scenarios_completed': sum(s['count'] for s in scenarios.values()),
+            'scenario_throughput_per_s': sum(s['count'] for s in scenarios.values()) / elapsed if elapsed else 0.0,
+            'errors': sum(s['errors'] for s in operations.values())
+        },
+        'operations': operations,
+        'database': {
+            'connections_opened': env['db'].connections_opened,
+            'connections_opened_per_s': env['db'].connections_opened / elapsed if elapsed else 0.0,
+            'pg_stat_activity_max': max(connections),
+            'pg_stat_activity_mean': sum(connections) / len(connections)
+        },
+        'memory': {
+            'rss_start_mb': rss_start,
+            'rss_peak_mb': max(sampler.rss or [rss_start]),
+            'rss_end_mb': read_rss_mb()
+        }
+    }
+
+
+def print_report(report):
+    summary = report['summary']
+    print(f"\n📊 {summary['scenarios_completed']} scénarios en {summary['elapsed_s']:.1f}s "
+          f"({summary['scenario_throughput_per_s']:.2f}/s), {summary['errors']} erreur(s)")
+    print(f"{'opération':45s} {'n':>7s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'max':>9s}")
+    for name, stats in report['operations'].items():
+        if stats['count']:
+            print(f"{name:45s} {stats['count']:7d} {stats['p50_ms']:8.1f}ms {stats['p95_ms']:8.1f}ms "
+                  f"{stats['p99_ms']:8.1f}ms {stats['max_ms']:8.1f}ms")
+    database, memory = report['database'], report['memory']
+    print(f"🔌 Connexions ouvertes: {database['connections_opened']} ({database['connections_opened_per_s']:.1f}/s), "
+          f"pg_stat_activity max {database['pg_stat_activity_max']}")
+    print(f"💾 RSS: {memory['rss_start_mb']:.0f} → pic {memory['rss_peak_mb']:.0f} Mo")
+
+
+def compare_reports(before_path, after_path):
+    """Compare les p95 et débits de deux exécutions"""
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+
+    print(f"Comparaison {before['metadata'].get('commit')} → {after['metadata'].get('commit')}")
+    print(f"{'opération':45s} {'p95 avant':>11s} {'p95 après':>11s} {'écart':>8s}")
+    for name in sorted(set(before['operations']) | set(after['operations'])):
+        old = before['operations'].get(name, {}).get('p95_ms')
+        new = after['operations'].get(name, {}).get('p95_ms')
+        if old and new:
+            print(f"{name:45s} {old:9.1f}ms {new:9.1f}ms {(new - old) / old * 100:+7.1f}%")
+    print(f"Débit: {before['summary']['scenario_throughput_per_s']:.2f}/s → {after['summary']['scenario_throughput_per_s']:.2f}/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Générateur de charge ECN Prep (sans Streamlit)")
+    parser.add_argument("--students", type=int, default=20, help="Nombre d'étudiants virtuels")
+    parser.add_argument("--duration", type=float, default=60, help="Durée du test en secondes")
+    parser.add_argument("--ramp-up", type=float, default=5, help="Durée de montée en charge en secondes")
+    parser.add_argument("--rates", default=DEFAULT_RATES, help="Scénarios par minute et par étudiant")
+    parser.add_argument("--accuracy", type=float, default=0.6, help="Taux de bonnes réponses simulé")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--skip-init", action="store_true", help="Ne pas appeler init_database()")
+    parser.add_argument("--db-host")
+    parser.add_argument("--db-port")
+    parser.add_argument("--db-name")
+    parser.add_argument("--db-user")
+    parser.add_argument("--db-password")
+    parser.add_argument("--db-sslmode")
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    parser.add_argument("--compare", nargs=2, metavar=("AVANT", "APRES"), help="Compare deux fichiers de résultats")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare_reports(*args.compare)
+        return 0
+
+    # DatabaseConfig lit l'environnement à l'import : le configurer avant d'importer database
+    for option, variable in [("db_host", "DB_HOST"), ("db_port", "DB_PORT"), ("db_name", "DB_NAME"),
+                             ("db_user", "DB_USER"), ("db_password", "DB_PASSWORD"), ("db_sslmode", "DB_SSLMODE")]:
+        if getattr(args, option):
+            os.environ[variable] = getattr(args, option)
+
+    report = run_load(args)
+    if report is None:
+        return 1
+
+    print_report(report)
+    output = args.output or f"benchmarks/results/load_{report['metadata']['commit'] or 'local'}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"✅ Résultats enregistrés dans {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
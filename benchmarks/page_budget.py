@@ -0,0 +1,126 @@
+"""Budget d'import et de rerun par page de l'application Streamlit.
+
+Pour chaque page, dans un processus neuf :
+  - import : coût cumulé de ``import views.<page>`` mesuré par ``python -X importtime``,
+    streamlit et les ressources partagées étant déjà importés ;
+  - first_visit : premier rerun d'app.py sur la page après l'accueil (AppTest, sans navigateur),
+    imports différés compris (plotly, simulateur...) ;
+  - rerun : durée médiane des reruns suivants, page importée et ressources en cache.
+
+Le script échoue (code 1) si une page dépasse son budget, ce qui permet de l'utiliser en CI.
+
+Exemples (depuis la racine du dépôt) :
+    python -m benchmarks.page_budget
+    python -m benchmarks.page_budget --reruns 10 --user alice --output benchmarks/results/pages.json
+    python -m benchmarks.page_budget --budgets benchmarks/page_budgets.json --pages Accueil,Classement
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGETS = os.path.join(REPO_ROOT, "benchmarks", "page_budgets.json")
+BENCH_USER = "bench_page_user"
+
+sys.path.insert(0, REPO_ROOT)
+from views import PAGES  # noqa: E402
+
+
+def measure_import(module: str) -> float:
+    """Temps cumulé (ms) de l'import du module de page, hors modules partagés"""
+    code = f"import streamlit, views.common; import views.{module}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    for line in result.stderr.splitlines():
+        # « import time: self [us] | cumulative | imported package »
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == f"views.{module}":
+            return int(parts[1]) / 1000
+    raise RuntimeError(f"views.{module} absent de la sortie -X importtime")
+
+
+def measure_page(label: str, reruns: int, username: str) -> dict:
+    """Premier affichage et reruns d'une page, l'accueil ayant déjà été affiché (appelé dans un processus neuf)"""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(REPO_ROOT, "app.py"), default_timeout=120)
+    app.run()
+    app.text_input[0].input(username).run()  # Connexion depuis l'accueil
+
+    modules_before = len(sys.modules)
+    start = time.perf_counter()
+    app.sidebar.selectbox[0].set_value(label).run()
+    first_visit = (time.perf_counter() - start) * 1000
+    if app.exception:
+        raise RuntimeError(f"{label}: {app.exception[0].message}")
+    new_modules = len(sys.modules) - modules_before
+
+    samples = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"first_visit_ms": first_visit, "rerun_ms": statistics.median(samples), "new_modules": new_modules}
+
+
+def measure_page_isolated(label: str, reruns: int, username: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.page_budget", "--child", label, "--reruns", str(reruns), "--user", username],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Budget d'import et de rerun par page")
+    parser.add_argument("--budgets", default=DEFAULT_BUDGETS, help="Fichier JSON {page: {import_ms, first_visit_ms, rerun_ms}}")
+    parser.add_argument("--pages", help="Pages à mesurer, séparées par des virgules (défaut : toutes)")
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--user", default=BENCH_USER, help="Utilisateur connecté (un compte avec historique charge les graphiques)")
+    parser.add_argument("--output", help="Enregistre les mesures dans ce fichier JSON")
+    parser.add_argument("--child", help=argparse.SUPPRESS)  # Mesure d'une page dans un processus neuf
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_page(args.child, args.reruns, args.user)))
+        return
+
+    labels = args.pages.split(",") if args.pages else list(PAGES)
+    with open(args.budgets, encoding="utf-8") as f:
+        budgets = json.load(f)
+
+    results, failures = {}, []
+    print(f"{'Page':<34}{'import (ms)':>13}{'1re visite (ms)':>17}{'rerun (ms)':>12}{'modules':>9}")
+    for label in labels:
+        page = measure_page_isolated(label, args.reruns, args.user)
+        measured = {
+            "import_ms": round(measure_import(PAGES[label]), 1),
+            "first_visit_ms": round(page["first_visit_ms"], 1),
+            "rerun_ms": round(page["rerun_ms"], 1),
+        }
+        results[label] = dict(measured, new_modules=page["new_modules"])
+        budget = budgets.get(label, budgets.get("default", {}))
+        over = [metric for metric, value in measured.items() if metric in budget and value > budget[metric]]
+        failures.extend(f"{label}: {metric} {measured[metric]} > {budget[metric]}" for metric in over)
+        flag = "  ❌" if over else ""
+        print(f"{label:<34}{measured['import_ms']:>13.1f}{measured['first_visit_ms']:>17.1f}"
+              f"{measured['rerun_ms']:>12.1f}{page['new_modules']:>9}{flag}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if failures:
+        print("\nBudget dépassé :\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\n✅ Toutes les pages respectent leur budget")
+
+
+if __name__ == "__main__":
+    main()
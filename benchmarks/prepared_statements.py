@@ -0,0 +1,163 @@
+"""Latence par requête du catalogue (utils/statements.py) : texte SQL contre EXECUTE d'une requête préparée.
+
+Une seule connexion, catalogue préparé comme au premier emprunt d'une connexion de pool.
+Chaque itération exécute chaque requête deux fois, en texte puis en EXECUTE (ordre alterné
+d'une itération à l'autre), et mesure l'aller-retour complet (envoi, analyse, planification,
+exécution, lecture des lignes). Les écritures (scores, compteurs, simulations…) sont faites
+dans une transaction annulée à la fin : la base n'est pas modifiée.
+
+Exemples (depuis la racine du dépôt, base locale sans SSL) :
+    DB_SSLMODE=disable python -m benchmarks.prepared_statements --username alice
+    DB_SSLMODE=disable python -m benchmarks.prepared_statements --username alice --iterations 500 \\
+        --only user_id,score_insert,counters_upsert --output benchmarks/results/prepared_statements.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import psycopg2  # noqa: E402
+from benchmarks.load_generator import git_commit  # noqa: E402
+from config import BadgeSystem, DatabaseConfig  # noqa: E402
+from database import connection_params  # noqa: E402
+from utils.leaderboard_cache import ECN_LEADERBOARD  # noqa: E402
+from utils.statements import EXECUTE_STATEMENTS, STATEMENTS, prepare_statements  # noqa: E402
+
+
+def sample_params(username: str, user_id: int, specialty: str) -> dict:
+    """Paramètres représentatifs de chaque requête du catalogue pour l'utilisateur donné"""
+    badge_id = next(iter(BadgeSystem.BADGES))
+    return {
+        'user_id': (username,),
+        'user_insert': (username, f"{username}@ecn-prep.fr", "general"),
+        'user_upsert': (username, f"{username}@ecn.fr", specialty),
+        'score_insert': (user_id, specialty, 7, 10, 120, None, None),
+        'case_score_insert': (user_id, specialty, 4, 5, 0, "benchmark"),
+        'notify_score': ("ecn_prepared_benchmark", "[0]"),
+        'daily_score': (user_id, specialty, 7, 49, 120),
+        'counters_upsert': (user_id, 7, 1, 0, None, 0, 3),
+        'user_counters': (username,),
+        'badge_insert': (user_id, badge_id),
+        'ecn_simulation_insert': (user_id, "benchmark", 10.0, 20.0, 50.0, 60, False, "C", "{}"),
+        'ecn_best': (user_id, 0.0),
+        'leaderboard_version_bump': ("benchmark",),
+        'leaderboard_version': (ECN_LEADERBOARD,),
+        'leaderboard': (10,),
+        'specialty_leaderboard': (specialty, 10),
+        'ecn_top': (10,),
+        'ecn_leaderboard_stats': ([user_id],),
+        'progress_by_specialty': (username,),
+        'progress_timeline': (username,),
+        'global_stats': (username,),
+        'response_times': (username, 5000),
+        'user_badges': (username,),
+        'ecn_user_stats': (user_id,),
+        'user_recommendations': (username,),
+        'due_question_ids': (user_id, datetime.now(), f"{specialty}:", f"{specialty}:%", 20),
+        'reviewed_question_ids': (user_id, f"{specialty}:", f"{specialty}:%"),
+        'draw_consume': ("benchmark-draw",),
+        'draw_purge': (3 * 3600,),
+        'debug_user': (username,),
+        'debug_scores': (user_id,),
+        'debug_simulations': (user_id,),
+    }
+
+
+def timed(cur, sql: str, params) -> float:
+    start = time.perf_counter()
+    cur.execute(sql, params)
+    if cur.description is not None:
+        cur.fetchall()
+    return time.perf_counter() - start
+
+
+def p95(values):
+    values = sorted(values)
+    return values[max(0, int(len(values) * 0.95) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Requêtes du catalogue : texte SQL contre requêtes préparées")
+    parser.add_argument("--username", required=True, help="Utilisateur existant (scores, simulations)")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--only", help="Requêtes mesurées, séparées par des virgules (défaut : tout le catalogue)")
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**connection_params(DatabaseConfig()))
+    if not prepare_statements(conn):
+        sys.exit(1)
+
+    with conn.cursor() as cur:
+        cur.execute(STATEMENTS['user_id'], (args.username,))
+        row = cur.fetchone()
+        if not row:
+            sys.exit(f"❌ Utilisateur {args.username} inconnu")
+        user_id = row[0]
+        cur.execute("SELECT specialty FROM scores WHERE user_id = %s LIMIT 1", (user_id,))
+        row = cur.fetchone()
+        specialty = row[0] if row else "cardiologie"
+
+    params = sample_params(args.username, user_id, specialty)
+    names = args.only.split(",") if args.only else list(STATEMENTS)
+    missing = set(STATEMENTS) - set(params)
+    if missing:
+        sys.exit(f"❌ Paramètres d'exemple manquants: {sorted(missing)}")
+
+    timings = {name: {'text': [], 'prepared': []} for name in names}
+    try:
+        with conn.cursor() as cur:
+            for name in names:  # Chauffe : cache du catalogue système, pages en mémoire, plans génériques
+                for _ in range(6):
+                    timed(cur, STATEMENTS[name], params[name])
+                    timed(cur, EXECUTE_STATEMENTS[name], params[name])
+            for iteration in range(args.iterations):
+                for name in names:
+                    modes = [('text', STATEMENTS[name]), ('prepared', EXECUTE_STATEMENTS[name])]
+                    for mode, sql in (modes if iteration % 2 else modes[::-1]):
+                        timings[name][mode].append(timed(cur, sql, params[name]))
+    finally:
+        conn.rollback()  # Écritures du benchmark annulées
+        conn.close()
+
+    results = []
+    for name in names:
+        text, prepared = timings[name]['text'], timings[name]['prepared']
+        results.append({
+            'statement': name,
+            'text_median_ms': statistics.median(text) * 1000,
+            'text_p95_ms': p95(text) * 1000,
+            'prepared_median_ms': statistics.median(prepared) * 1000,
+            'prepared_p95_ms': p95(prepared) * 1000,
+        })
+    for r in results:
+        r['saving_pct'] = 100 * (1 - r['prepared_median_ms'] / r['text_median_ms'])
+
+    print(f"\n{'requête':24s} {'texte méd.':>11s} {'p95':>8s} {'préparée méd.':>14s} {'p95':>8s} {'gain':>7s}")
+    for r in results:
+        print(f"{r['statement']:24s} {r['text_median_ms']:8.3f} ms {r['text_p95_ms']:5.3f} ms "
+              f"{r['prepared_median_ms']:11.3f} ms {r['prepared_p95_ms']:5.3f} ms {r['saving_pct']:6.1f}%")
+    text_total = sum(r['text_median_ms'] for r in results)
+    prepared_total = sum(r['prepared_median_ms'] for r in results)
+    print(f"{'total (médianes)':24s} {text_total:8.3f} ms {'':8s} {prepared_total:11.3f} ms {'':8s} "
+          f"{100 * (1 - prepared_total / text_total):6.1f}%")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({
+                'metadata': {'commit': git_commit(), 'timestamp': datetime.now().isoformat(),
+                             'iterations': args.iterations, 'host': DatabaseConfig().host},
+                'results': results
+            }, f, indent=2)
+        print(f"✅ Résultats enregistrés dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Coût CPU du compte à rebours par compétiteur actif.
+
+Un chronomètre rafraîchi à 1 Hz coûte, par seconde et par compétiteur :
+  - avant : un rerun complet d'app.py sur la page Mode Compétition ;
+  - après : un rerun du seul fragment ``_competition_timer``.
+
+Les deux sont exécutés via streamlit AppTest (sans navigateur) dans le même processus,
+le CPU est mesuré avec time.process_time.
+
+Exemple (depuis la racine du dépôt) :
+    python -m benchmarks.timer_cpu --ticks 200
+"""
+import argparse
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def _timer_only():
+    import streamlit as st
+    from views.competition import _competition_timer
+    _competition_timer(st.session_state.comp_run)
+
+
+def cpu_per_tick(app, ticks: int) -> float:
+    app.run()  # Échauffement
+    start = time.process_time()
+    for _ in range(ticks):
+        app.run()
+    return (time.process_time() - start) / ticks * 1000
+
+
+def main():
+    from streamlit.testing.v1 import AppTest
+
+    parser = argparse.ArgumentParser(description="CPU par compétiteur pour un chronomètre à 1 Hz")
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--user", default="bench_timer_user")
+    args = parser.parse_args()
+
+    # Page complète avec une compétition en cours
+    full = AppTest.from_file(os.path.join(REPO_ROOT, "app.py"), default_timeout=120)
+    full.run()
+    full.text_input[0].input(args.user).run()
+    full.sidebar.selectbox[0].set_value("Mode Compétition").run()
+    next(b for b in full.button if b.label == "🎯 Démarrer la compétition").click().run()
+    if full.exception:
+        raise RuntimeError(full.exception[0].message)
+
+    # Fragment seul, sur la même épreuve
+    fragment = AppTest.from_function(_timer_only, default_timeout=120)
+    for key in ("comp_run", "comp_questions", "comp_current_q"):
+        fragment.session_state[key] = full.session_state[key]
+
+    before = cpu_per_tick(full, args.ticks)
+    after = cpu_per_tick(fragment, args.ticks)
+    full.session_state["comp_run"].cancel()
+
+    print(f"{'':<28}{'CPU / tick (ms)':>16}{'% cœur / compétiteur':>24}")
+    print(f"{'Rerun complet (avant)':<28}{before:>16.2f}{before / 10:>23.2f}%")
+    print(f"{'Fragment 1 Hz (après)':<28}{after:>16.2f}{after / 10:>23.2f}%")
+    print(f"\nCompétiteurs par cœur à 1 Hz : {1000 / before:.0f} → {1000 / after:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Mémoire résidente par worker : banque relue par chaque worker contre image partagée (mmap).
+
+Lance N processus qui importent l'application (Streamlit, vues) et chargent la banque
+comme un worker de run_workers.py, puis lit /proc/<pid>/smaps_rollup une fois la banque
+chargée et 200 quiz tirés. RSS compte les pages partagées dans chaque processus ; PSS
+les répartit entre les processus qui les partagent (somme des PSS = mémoire réelle).
+
+Exemples (depuis la racine du dépôt, Linux) :
+    python -m benchmarks.worker_memory --workers 1,8
+    python -m benchmarks.worker_memory --workers 1,8 --scale 100 --output benchmarks/results/worker_memory.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.load_generator import git_commit  # noqa: E402
+
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def child(data_dir: str):
+    """Worker simulé : mêmes imports que l'application, banque chargée puis utilisée"""
+    import random
+    import views.common  # noqa: F401  (Streamlit, base de données, gestionnaires)
+    from utils.quiz_manager import QuizManager
+
+    start = time.time()
+    quiz_mgr = QuizManager(data_dir)
+    load_time = time.time() - start
+    specialties = [s for s in quiz_mgr.get_specialties() if quiz_mgr.quizzes[s]]
+    rng = random.Random(os.getpid())
+    for _ in range(200):
+        quiz_mgr.get_quiz_questions(rng.choice(specialties), 10)
+    print(json.dumps({'load_s': load_time, 'shared': quiz_mgr.shared_bank is not None}), flush=True)
+    sys.stdin.read()  # Reste en vie jusqu'à la fermeture de stdin
+
+
+def memory_kb(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in FIELDS:
+                values[name] = int(rest.split()[0])
+    return values
+
+
+def measure(workers: int, data_dir: str, image: str) -> dict:
+    env = dict(os.environ, ECN_BANK_IMAGE=image)
+    processes = [
+        subprocess.Popen([sys.executable, "-m", "benchmarks.worker_memory", "--child", data_dir],
+                         cwd=REPO_ROOT, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    try:
+        loads = [json.loads(process.stdout.readline()) for process in processes]
+        samples = [memory_kb(process.pid) for process in processes]
+    finally:
+        for process in processes:
+            process.stdin.close()
+            process.wait()
+
+    mean = {name: sum(sample[name] for sample in samples) / len(samples) / 1024 for name in FIELDS}
+    return {
+        'workers': workers,
+        'shared_bank': all(load['shared'] for load in loads),
+        'load_s': max(load['load_s'] for load in loads),
+        'per_worker_mb': {
+            'rss': mean['Rss'],
+            'pss': mean['Pss'],
+            'private': mean['Private_Clean'] + mean['Private_Dirty'],
+            'shared': mean['Shared_Clean'] + mean['Shared_Dirty']
+        },
+        'total_pss_mb': sum(sample['Pss'] for sample in samples) / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mémoire par worker, banque privée contre partagée")
+    parser.add_argument("--workers", default="1,8", help="Nombres de workers à mesurer")
+    parser.add_argument("--scale", type=int, default=1, help="Taille de la banque (1 = data/, sinon banque générée)")
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args.child)
+
+    from benchmarks.bench_engines import build_scaled_bank
+    from utils.quiz_manager import QuizManager
+    from utils.shared_bank import build_bank_image
+
+    data_dir = build_scaled_bank(args.scale)
+    image = os.path.join(tempfile.gettempdir(), f"ecn_bank_bench_{os.getpid()}.bin")
+    build_bank_image(QuizManager(data_dir, bank_image=""), image)
+
+    results = []
+    try:
+        for workers in [int(n) for n in args.workers.split(",")]:
+            for mode, path in (("privée", ""), ("partagée", image)):
+                result = measure(workers, data_dir, path)
+                result['mode'] = mode
+                results.append(result)
+    finally:
+        os.remove(image)
+
+    print(f"\nBanque ×{args.scale} : {data_dir}")
+    print(f"{'banque':10s} {'workers':>7s} {'chargement':>11s} {'RSS/worker':>11s} {'PSS/worker':>11s} "
+          f"{'privée':>9s} {'PSS total':>10s}")
+    for r in results:
+        m = r['per_worker_mb']
+        print(f"{r['mode']:10s} {r['workers']:7d} {r['load_s'] * 1000:9.0f}ms {m['rss']:8.1f} Mo {m['pss']:8.1f} Mo "
+              f"{m['private']:6.1f} Mo {r['total_pss_mb']:7.1f} Mo")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({
+                'metadata': {'commit': git_commit(), 'timestamp': datetime.now().isoformat(), 'scale': args.scale},
+                'results': results
+            }, f, indent=2)
+        print(f"✅ Résultats enregistrés dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+from database import DatabaseManager
+from utils.adaptive_simulator import ItemCalibrator
+
+def calibrate_items():
+    """Recalibre les paramètres IRT des questions à partir des simulations enregistrées"""
+    db = DatabaseManager()
+    calibrator = ItemCalibrator(db)
+    
+    calibrated = calibrator.run()
+    if calibrated:
+        print(f"✅ {calibrated} questions calibrées (modèle {calibrator.config.model})")
+    else:
+        print("⚠️ Aucune question calibrée (réponses insuffisantes ou erreur)")
+
+if __name__ == "__main__":
+    calibrate_items()
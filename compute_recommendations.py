@@ -0,0 +1,21 @@
+import argparse
+import time
+from database import DatabaseManager
+from utils.quiz_manager import QuizManager
+from utils.recommendations import RecommendationEngine
+
+def compute_recommendations(full=False, chunk_size=1000):
+    """Met à jour les recommandations des utilisateurs actifs depuis le dernier passage (à planifier, ex. cron)"""
+    db = DatabaseManager()
+    engine = RecommendationEngine(db, QuizManager())
+    
+    start = time.perf_counter()
+    updated = engine.run(full=full, chunk_size=chunk_size)
+    print(f"✅ Recommandations mises à jour pour {updated} utilisateurs en {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calcul des recommandations personnalisées")
+    parser.add_argument("--full", action="store_true", help="Recalculer pour tous les utilisateurs")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Utilisateurs par transaction")
+    args = parser.parse_args()
+    compute_recommendations(args.full, args.chunk_size)
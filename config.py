@@ -1,6 +1,6 @@
 import os
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,13 +13,21 @@ class DatabaseConfig:
     user: str = os.getenv("DB_USER", "postgres")
     password: str = os.getenv("DB_PASSWORD", "password")
     # Configuration spécifique pour Neon
-    sslmode: str = "require"
+    sslmode: str = os.getenv("DB_SSLMODE", "require")  # "disable" pour un Postgres local
+    pool_size: int = int(os.getenv("DB_POOL_SIZE", "10"))  # Connexions par processus en mode pool (service API)
+    # Requêtes du catalogue (utils/statements.py) préparées sur chaque connexion de pool ; "0" derrière
+    # un pooler en mode transaction (PgBouncer, point d'accès -pooler de Neon), qui ne garde pas les PREPARE
+    prepared_statements: bool = os.getenv("DB_PREPARED_STATEMENTS", "1") == "1"
 
 @dataclass
 class AppConfig:
     specialties: List[str] = None
     competition_time: int = 600  # 10 minutes en secondes
     max_questions: int = 50
+    timeline_max_points: int = 500  # Points maximum envoyés au navigateur pour la courbe de progression
+    speed_responses: int = 5000  # Réponses chronométrées les plus récentes analysées sur la page Profil
+    speed_bins: int = 5  # Classes de vitesse (quantiles) de la courbe vitesse–précision
+    profile_pages: bool = os.getenv("ECN_PROFILE_PAGES", "0") == "1"  # Durées d'import et de rendu par page
     
     def __post_init__(self):
         if self.specialties is None:
@@ -52,18 +60,95 @@ class ECNConfig:
                 "urgences": 11
             }
 
+@dataclass
+class AdaptiveConfig:
+    model: str = "2pl"  # "rasch" ou "2pl"
+    se_threshold: float = 0.30  # Arrêt quand l'erreur standard passe sous ce seuil
+    min_questions: int = 15
+    max_questions: int = 60
+    theta_min: float = -4.0
+    theta_max: float = 4.0
+    grid_points: int = 81
+    randomesque: int = 3  # Tirage parmi les N items les plus informatifs (contrôle d'exposition)
+    calibration_iterations: int = 30
+    min_responses: int = 5  # Réponses minimales avant de calibrer un item
+
+@dataclass
+class CohortConfig:
+    batch_size: int = 100  # Copies corrigées et enregistrées ensemble
+    max_wait: float = 2.0  # Délai maximal (s) avant de traiter un lot incomplet
+
+@dataclass
+class RoomConfig:
+    lobby_time: int = 30  # Délai (s) entre l'ouverture de la salle et le départ commun
+    questions: int = 50  # Questions tirées pour toute la salle
+    max_players: int = 500  # Joueurs par salle (tableau de scores tenu en mémoire)
+
+@dataclass
+class ApiConfig:
+    max_questions: int = 120  # Questions par tirage ou par correction
+    leaderboard_limit: int = 50  # Lignes maximum d'un classement
+    # Clé HMAC des tirages signés (compétition, ECN) : la même pour tous les workers de l'API
+    draw_secret: str = os.getenv("ECN_API_SECRET", "")
+    draw_ttl: int = 3 * 3600  # Validité (s) d'un tirage signé
+
+@dataclass
+class WorkerConfig:
+    workers: int = int(os.getenv("ECN_WORKERS", "1"))  # Processus Streamlit lancés par run_workers.py
+    base_port: int = int(os.getenv("ECN_BASE_PORT", "8501"))  # Ports base_port à base_port + workers - 1
+    bank_dir: str = os.getenv("ECN_BANK_DIR", "/dev/shm" if os.path.isdir("/dev/shm") else "/tmp")  # Emplacement de l'image partagée
+    bank_image: str = os.getenv("ECN_BANK_IMAGE", "")  # Image de la banque à projeter (renseignée par run_workers.py)
+    worker_path: str = os.getenv("ECN_WORKER_PATH", "")  # Préfixe d'URL du worker (w8501…), vide hors run_workers.py
+    restart_delay: float = 2.0  # Attente (s) avant de relancer un worker arrêté
+
+@dataclass
+class CacheConfig:
+    user_ttl: float = 30.0  # Durée de vie (s) des données par utilisateur ; borne le retard entre processus
+    user_cache_size: int = 10000  # Utilisateurs gardés en cache par processus (les moins récemment chargés sont évincés)
+    leaderboard_ttl: float = 10.0  # Durée de vie (s) des classements ; les écritures du processus les invalident aussitôt
+    leaderboard_size: int = 50  # Lignes chargées par classement (maximum du curseur « Nombre de résultats »)
+
+@dataclass
+class LiveRankingConfig:
+    channel: str = "score_events"  # Canal LISTEN/NOTIFY des nouveaux scores
+    specialties: Tuple[str, ...] = ("competition",)  # Classements par spécialité suivis en direct (en plus du général)
+    top_size: int = 50  # Lignes conservées pour l'affichage du top
+    refresh_interval: float = 1.0  # Recalcul du top au plus une fois par intervalle (s) quand des scores arrivent
+    poll_timeout: float = 5.0  # Attente maximale (s) entre deux vérifications de la connexion d'écoute
+
+@dataclass
+class SketchConfig:
+    k: int = 200  # Taille des sketches KLL (erreur de rang ≈ 1/k, ~3k valeurs stockées)
+    flush_every: int = 50  # Insertions accumulées en mémoire avant fusion en base
+    flush_interval: float = 30.0  # Délai maximal (s) avant fusion en base
+    refresh_ttl: float = 30.0  # Rechargement des sketches des autres processus
+
+@dataclass
+class RecommendationConfig:
+    half_life_days: float = 14.0  # Demi-vie de la pondération des réponses par ancienneté
+    prior_responses: int = 10  # Lissage de la précision vers 50% quand peu de réponses
+    reference_time: float = 60.0  # Temps par question (s) au-delà duquel la lenteur est pénalisée
+    stale_after_days: int = 30  # Inactivité (jours) considérée comme maximale
+    weight_accuracy: float = 0.5
+    weight_coverage: float = 0.2
+    weight_speed: float = 0.15
+    weight_recency: float = 0.15
+
 class BadgeSystem:
+    # Règles déclaratives : le badge est attribué quand le compteur "metric" de l'utilisateur
+    # satisfait "operator" (">=" par défaut) par rapport à "threshold"
+    FAST_ANSWER_MS = 20000  # Réponse exacte comptée dans fast_correct en dessous de ce temps
     BADGES = {
-        "debutant": {"name": "Débutant", "threshold": 10, "color": "badge-secondary"},
-        "intermediaire": {"name": "Intermédiaire", "threshold": 50, "color": "badge-primary"},
-        "expert": {"name": "Expert", "threshold": 100, "color": "badge-info"},
-        "champion": {"name": "Champion", "threshold": 200, "color": "badge-warning"},
-        "maitre": {"name": "Maître", "threshold": 500, "color": "badge-gold"},
-        "clinician": {"name": "Excellent Clinicien", "threshold": 300, "color": "badge-success"},
-        "rapide": {"name": "Rapide et Précise", "threshold": 150, "color": "badge-danger"},
-        "simulateur": {"name": "Simulateur ECN", "threshold": 1, "color": "badge-info"},
-        "excellent": {"name": "Excellent", "threshold": 85, "color": "badge-success"},
-        "rapide": {"name": "Rapide", "threshold": 150, "color": "badge-danger"},
-        "marathonien": {"name": "Marathonien", "threshold": 5, "color": "badge-warning"},
-        "podium": {"name": "Sur le Podium", "threshold": 3, "color": "badge-gold"}
-    }
\ No newline at end of file
+        "debutant": {"name": "Débutant", "threshold": 10, "color": "badge-secondary", "metric": "total_score"},
+        "intermediaire": {"name": "Intermédiaire", "threshold": 50, "color": "badge-primary", "metric": "total_score"},
+        "expert": {"name": "Expert", "threshold": 100, "color": "badge-info", "metric": "total_score"},
+        "champion": {"name": "Champion", "threshold": 200, "color": "badge-warning", "metric": "total_score"},
+        "maitre": {"name": "Maître", "threshold": 500, "color": "badge-gold", "metric": "total_score"},
+        "clinician": {"name": "Excellent Clinicien", "threshold": 300, "color": "badge-success", "metric": "total_score"},
+        "rapide_precise": {"name": "Rapide et Précise", "threshold": 50, "color": "badge-danger", "metric": "fast_correct"},
+        "simulateur": {"name": "Simulateur ECN", "threshold": 1, "color": "badge-info", "metric": "simulation_count"},
+        "excellent": {"name": "Excellent", "threshold": 85, "color": "badge-success", "metric": "best_percentage"},
+        "rapide": {"name": "Rapide", "threshold": 150, "color": "badge-danger", "metric": "total_score"},
+        "marathonien": {"name": "Marathonien", "threshold": 5, "color": "badge-warning", "metric": "simulation_count"},
+        "podium": {"name": "Sur le Podium", "threshold": 3, "color": "badge-gold", "metric": "ecn_rank", "operator": "<="}
+    }
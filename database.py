@@ -1,30 +1,131 @@
+import threading
 import psycopg2
+from psycopg2.extensions import connection as PgConnection
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 import streamlit as st
-from config import DatabaseConfig
-from typing import Dict
+from config import BadgeSystem, DatabaseConfig, SketchConfig
+from typing import Dict, List, Optional
+from utils.badge_rules import award_badges, award_badges_batch, fast_correct_count, update_counters
+from utils.draw_ledger import DrawAlreadyUsed, consume_draw, purge_consumed_draws
+from utils.leaderboard_cache import (ECN_LEADERBOARD, SCORES_LEADERBOARD, bump_version, ecn_top_cached,
+                                     leaderboard_cache, record_ecn_best)
+from utils.item_analysis import correct_mask, record_responses, response_rows
+from utils.live_ranking import notify_score
+from utils.quantile_sketch import ecn_sketch, rebuild_sketches, sketch_store, specialty_sketch
+from utils.rollups import rebuild_daily_stats, record_daily_score
+from utils.spaced_repetition import update_review_states
+from utils.statements import execute, prepare_statements
+from utils.user_cache import user_cache
 import json
 from datetime import datetime
 import time
 
+def connection_params(config: DatabaseConfig) -> Dict:
+    return dict(
+        host=config.host,
+        port=config.port,
+        database=config.database,
+        user=config.user,
+        password=config.password,
+        sslmode=config.sslmode,
+        connect_timeout=10
+    )
+
+
+def ecn_leaderboard_rows(top: List[tuple], stats: Dict) -> List[Dict]:
+    """Lignes du classement ECN : top (user_id, username, best_percentage) complété par
+    les statistiques agrégées de ces utilisateurs (dictionnaire par user_id). L'ordre de top
+    (meilleur score, puis date d'obtention) est conservé : c'est celui du badge de podium."""
+    leaderboard = []
+    for user_id, username, best_score in top:
+        row = stats.get(user_id, {})
+        leaderboard.append({
+            'username': username,
+            'avg_score': float(row['avg_score']) if row.get('avg_score') else 0.0,
+            'best_score': float(best_score) if best_score else 0.0,
+            'simulations_count': int(row.get('simulations_count', 0)),
+            'first_simulation': row.get('first_simulation'),
+            'last_simulation': row.get('last_simulation')
+        })
+    return leaderboard
+
+
+def ecn_stats_row(result) -> Dict:
+    if not result:
+        return {}
+    stats = dict(result)
+    # Convertir les types pour éviter les problèmes
+    stats['total_simulations'] = int(stats['total_simulations']) if stats['total_simulations'] else 0
+    stats['passed_count'] = int(stats['passed_count']) if stats['passed_count'] else 0
+    return stats
+
+
+class PooledConnection(PgConnection):
+    """Connexion empruntée à un pool : close() la rend au pool au lieu de la fermer,
+    les méthodes de DatabaseManager restent inchangées"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.release = None
+        self.statements_prepared = None  # Catalogue utils/statements.py préparé sur la connexion
+    
+    def close(self):
+        release, self.release = self.release, None
+        if release is None:
+            return super().close()
+        release(self)
+
+
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, pooled: bool = False):
+        """pooled : connexions réutilisées (au plus DatabaseConfig.pool_size, les demandes
+        supplémentaires attendent) au lieu d'une connexion ouverte par appel"""
         self.config = DatabaseConfig()
         self.max_retries = 3
+        self.pooled = pooled
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._pool_slots = threading.BoundedSemaphore(self.config.pool_size) if pooled else None
+    
+    def _connection_params(self) -> Dict:
+        return connection_params(self.config)
+    
+    def _borrow_connection(self):
+        with self._pool_lock:
+            if self._pool is None:
+                # minconn = maxconn : psycopg2 ferme les connexions rendues au-delà de minconn
+                size = self.config.pool_size
+                self._pool = ThreadedConnectionPool(size, size, connection_factory=PooledConnection,
+                                                    **self._connection_params())
+        self._pool_slots.acquire()
+        try:
+            conn = self._pool.getconn()
+        except Exception:
+            self._pool_slots.release()
+            raise
+        conn.release = self._return_connection
+        if conn.statements_prepared is None:
+            # Premier emprunt de cette connexion : PREPARE du catalogue, une fois
+            conn.statements_prepared = self.config.prepared_statements and prepare_statements(conn)
+        return conn
+    
+    def _return_connection(self, conn):
+        try:
+            if not conn.closed and conn.autocommit:
+                conn.rollback()
+                conn.autocommit = False
+            self._pool.putconn(conn)  # Transaction en cours annulée, connexion rompue fermée
+        finally:
+            self._pool_slots.release()
     
     def get_connection(self):
         """Établit une connexion avec Neon - avec gestion des reconnexions"""
         for attempt in range(self.max_retries):
             try:
-                conn = psycopg2.connect(
-                    host=self.config.host,
-                    port=self.config.port,
-                    database=self.config.database,
-                    user=self.config.user,
-                    password=self.config.password,
-                    sslmode=self.config.sslmode,
-                    connect_timeout=10
-                )
+                if self.pooled:
+                    return self._borrow_connection()
+                conn = psycopg2.connect(**self._connection_params())
                 return conn
             except Exception as e:
                 st.error(f"Tentative {attempt + 1}/{self.max_retries} - Erreur de connexion: {e}")
@@ -66,6 +167,9 @@ class DatabaseManager:
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     )
                 """)
+                # Chronologie des réponses (utils.answer_timing), ajoutée aux bases existantes
+                cur.execute("ALTER TABLE scores ADD COLUMN IF NOT EXISTS answer_order BYTEA")
+                cur.execute("ALTER TABLE scores ADD COLUMN IF NOT EXISTS answer_times BYTEA")
                 
                 # Table des badges
                 cur.execute("""
@@ -104,6 +208,199 @@ class DatabaseManager:
                     )
                 """)
                 
+                # Paramètres IRT calibrés des questions (simulation adaptative)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS item_parameters (
+                        question_id VARCHAR(100) PRIMARY KEY,
+                        difficulty DOUBLE PRECISION NOT NULL DEFAULT 0,
+                        discrimination DOUBLE PRECISION NOT NULL DEFAULT 1,
+                        n_responses INTEGER NOT NULL DEFAULT 0,
+                        model VARCHAR(10) NOT NULL DEFAULT '2pl',
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                
+                # Compteurs par utilisateur alimentés par les écritures (moteur de badges incrémental)
+                cur.execute("SELECT to_regclass('user_counters') IS NULL")
+                counters_missing = cur.fetchone()[0]
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS user_counters (
+                        user_id INTEGER PRIMARY KEY REFERENCES users(id),
+                        total_score BIGINT NOT NULL DEFAULT 0,
+                        quiz_count INTEGER NOT NULL DEFAULT 0,
+                        simulation_count INTEGER NOT NULL DEFAULT 0,
+                        best_percentage DECIMAL(5,2),
+                        competition_wins INTEGER NOT NULL DEFAULT 0,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                # Réponses exactes rapides (badge « Rapide et Précise »), reconstruites à l'ajout de la colonne
+                cur.execute("""
+                    SELECT NOT EXISTS (SELECT 1 FROM information_schema.columns
+                                       WHERE table_name = 'user_counters' AND column_name = 'fast_correct')
+                """)
+                fast_correct_missing = cur.fetchone()[0]
+                cur.execute("ALTER TABLE user_counters ADD COLUMN IF NOT EXISTS fast_correct INTEGER NOT NULL DEFAULT 0")
+                
+                # Un badge au plus par utilisateur (permet ON CONFLICT DO NOTHING)
+                cur.execute("SELECT to_regclass('idx_badges_user_type') IS NULL")
+                if cur.fetchone()[0]:
+                    cur.execute("""
+                        DELETE FROM badges a USING badges b
+                        WHERE a.user_id = b.user_id AND a.badge_type = b.badge_type AND a.id > b.id
+                    """)
+                    cur.execute("CREATE UNIQUE INDEX idx_badges_user_type ON badges (user_id, badge_type)")
+                
+                # Agrégats journaliers utilisateur × jour × spécialité (analytics de progression)
+                cur.execute("SELECT to_regclass('user_daily_stats') IS NULL")
+                daily_stats_missing = cur.fetchone()[0]
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS user_daily_stats (
+                        user_id INTEGER NOT NULL REFERENCES users(id),
+                        day DATE NOT NULL,
+                        specialty VARCHAR(100) NOT NULL,
+                        quiz_count INTEGER NOT NULL DEFAULT 0,
+                        score_sum BIGINT NOT NULL DEFAULT 0,
+                        score_sumsq BIGINT NOT NULL DEFAULT 0,
+                        time_sum BIGINT NOT NULL DEFAULT 0,
+                        PRIMARY KEY (user_id, day, specialty)
+                    )
+                """)
+                if daily_stats_missing:
+                    rebuild_daily_stats(cur)
+                
+                # Réponses individuelles aux questions (analyse des items, calibration)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS question_responses (
+                        user_id INTEGER NOT NULL REFERENCES users(id),
+                        question_id VARCHAR(100) NOT NULL,
+                        chosen_mask INTEGER NOT NULL,
+                        correct BOOLEAN NOT NULL,
+                        latency_ms INTEGER,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                if counters_missing or fast_correct_missing:
+                    self.rebuild_user_counters(cur)  # Lit scores, ecn_simulations et question_responses
+                if fast_correct_missing:
+                    # Badges « Rapide et Précise » attribués par l'ancienne règle (total_score, doublon de « Rapide ») réévalués
+                    cur.execute("DELETE FROM badges WHERE badge_type = 'rapide_precise'")
+                    cur.execute("SELECT user_id FROM user_counters WHERE fast_correct > 0")
+                    award_badges_batch(cur, [row[0] for row in cur.fetchall()], ['fast_correct'])
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS item_statistics (
+                        question_id VARCHAR(100) PRIMARY KEY,
+                        n_responses INTEGER NOT NULL,
+                        p_value DOUBLE PRECISION NOT NULL,
+                        point_biserial DOUBLE PRECISION,
+                        option_frequencies JSONB NOT NULL,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                
+                # État de révision espacée (SM-2) par utilisateur et question
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS review_states (
+                        user_id INTEGER NOT NULL REFERENCES users(id),
+                        question_id VARCHAR(100) NOT NULL,
+                        repetitions SMALLINT NOT NULL DEFAULT 0,
+                        interval_days REAL NOT NULL DEFAULT 0,
+                        ease REAL NOT NULL DEFAULT 2.5,
+                        lapses SMALLINT NOT NULL DEFAULT 0,
+                        due_at TIMESTAMP NOT NULL,
+                        last_reviewed_at TIMESTAMP NOT NULL,
+                        PRIMARY KEY (user_id, question_id)
+                    )
+                """)
+                # Index couvrant : « prochaines questions dues » en un parcours d'index seul
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_review_states_due ON review_states (user_id, due_at) INCLUDE (question_id)")
+                
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_question_responses_user ON question_responses (user_id)")
+                
+                # Recommandations précalculées (liste classée par utilisateur)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS user_recommendations (
+                        user_id INTEGER PRIMARY KEY REFERENCES users(id),
+                        recommendations JSONB NOT NULL,
+                        computed_at TIMESTAMP NOT NULL
+                    )
+                """)
+                
+                # Sketches de quantiles (KLL) par spécialité et par type de simulation ECN
+                cur.execute("SELECT to_regclass('quantile_sketches') IS NULL")
+                sketches_missing = cur.fetchone()[0]
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS quantile_sketches (
+                        name VARCHAR(150) PRIMARY KEY,
+                        sketch BYTEA NOT NULL,
+                        n BIGINT NOT NULL DEFAULT 0,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                if sketches_missing:
+                    rebuild_sketches(cur, SketchConfig().k)
+                
+                # Meilleur score ECN par utilisateur, indexé dans l'ordre du classement
+                cur.execute("SELECT to_regclass('ecn_best_scores') IS NULL")
+                best_scores_missing = cur.fetchone()[0]
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS ecn_best_scores (
+                        user_id INTEGER PRIMARY KEY REFERENCES users(id),
+                        best_percentage DECIMAL(5,2) NOT NULL,
+                        achieved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_ecn_best_scores_rank ON ecn_best_scores (best_percentage DESC, achieved_at)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_ecn_simulations_user ON ecn_simulations (user_id)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_scores_user ON scores (user_id)")
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS leaderboard_versions (
+                        name VARCHAR(50) PRIMARY KEY,
+                        version BIGINT NOT NULL DEFAULT 0
+                    )
+                """)
+                if best_scores_missing:
+                    cur.execute("""
+                        INSERT INTO ecn_best_scores (user_id, best_percentage, achieved_at)
+                        SELECT DISTINCT ON (user_id) user_id, percentage, created_at
+                        FROM ecn_simulations
+                        ORDER BY user_id, percentage DESC, created_at
+                    """)
+                    bump_version(cur, ECN_LEADERBOARD)
+                
+                # Examens blancs de cohorte : définition de session partagée
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS cohort_exams (
+                        id VARCHAR(100) PRIMARY KEY,
+                        title VARCHAR(255) NOT NULL,
+                        question_ids JSONB NOT NULL,
+                        duration INTEGER NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                
+                # Salles de compétition synchronisées : tirage, départ et échéance communs
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS competition_rooms (
+                        id VARCHAR(100) PRIMARY KEY,
+                        seed BIGINT NOT NULL,
+                        question_ids JSONB NOT NULL,
+                        starts_at TIMESTAMP NOT NULL,
+                        deadline TIMESTAMP NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                # Worker qui tient la salle en mémoire (préfixe d'URL routé par nginx)
+                cur.execute("ALTER TABLE competition_rooms ADD COLUMN IF NOT EXISTS worker VARCHAR(20) NOT NULL DEFAULT ''")
+                
+                # Tirages signés de l'API déjà enregistrés (utils/draw_ledger.py)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS consumed_draws (
+                        draw_id VARCHAR(32) PRIMARY KEY,
+                        consumed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                
                 conn.commit()
                 return True
                 
@@ -113,103 +410,174 @@ class DatabaseManager:
         finally:
             conn.close()
     
-    def save_score(self, username, specialty, score, total_questions, time_taken):
+    def rebuild_user_counters(self, cur, first_user_id: Optional[int] = None, last_user_id: Optional[int] = None):
+        """Recalcule les compteurs depuis l'historique (requête ensembliste), pour tous les utilisateurs
+        ou pour une tranche d'identifiants"""
+        bounds = {'first': first_user_id, 'last': last_user_id, 'fast_ms': BadgeSystem.FAST_ANSWER_MS}
+        cur.execute("""
+            INSERT INTO user_counters (user_id, total_score, quiz_count, simulation_count, best_percentage, fast_correct)
+            SELECT u.id, COALESCE(s.total_score, 0), COALESCE(s.quiz_count, 0),
+                   COALESCE(e.simulation_count, 0), e.best_percentage, COALESCE(r.fast_correct, 0)
+            FROM users u
+            LEFT JOIN (
+                SELECT user_id, SUM(score) AS total_score, COUNT(*) AS quiz_count
+                FROM scores
+                WHERE %(first)s::int IS NULL OR user_id BETWEEN %(first)s AND %(last)s
+                GROUP BY user_id
+            ) s ON s.user_id = u.id
+            LEFT JOIN (
+                SELECT user_id, COUNT(*) AS simulation_count, MAX(percentage) AS best_percentage
+                FROM ecn_simulations
+                WHERE %(first)s::int IS NULL OR user_id BETWEEN %(first)s AND %(last)s
+                GROUP BY user_id
+            ) e ON e.user_id = u.id
+            LEFT JOIN (
+                SELECT user_id, COUNT(*) AS fast_correct
+                FROM question_responses
+                WHERE correct AND latency_ms < %(fast_ms)s
+                  AND (%(first)s::int IS NULL OR user_id BETWEEN %(first)s AND %(last)s)
+                GROUP BY user_id
+            ) r ON r.user_id = u.id
+            WHERE %(first)s::int IS NULL OR u.id BETWEEN %(first)s AND %(last)s
+            ON CONFLICT (user_id) DO UPDATE SET
+                total_score = EXCLUDED.total_score,
+                quiz_count = EXCLUDED.quiz_count,
+                simulation_count = EXCLUDED.simulation_count,
+                best_percentage = EXCLUDED.best_percentage,
+                fast_correct = EXCLUDED.fast_correct,
+                updated_at = CURRENT_TIMESTAMP
+        """, bounds)
+    
+    def save_score(self, username, specialty, score, total_questions, time_taken,
+                   awarded_badges: Optional[List[str]] = None,
+                   questions: Optional[List[Dict]] = None, user_answers: Optional[List[Dict]] = None,
+                   answer_clock=None, draw_id: Optional[str] = None):
+        """Enregistre un score, met à jour les compteurs et attribue les badges dans la même transaction.
+        Les noms des badges obtenus sont ajoutés à awarded_badges si la liste est fournie ; les réponses
+        question par question sont enregistrées si questions et user_answers sont fournis, avec leur
+        temps de réponse si answer_clock (utils.answer_timing.AnswerClock) est fourni.
+        Un score seul ne compte jamais comme victoire : competition_wins n'est incrémenté qu'à la
+        clôture d'une salle de compétition (utils.competition_room), qui désigne les gagnants.
+        Avec draw_id (tirage signé de l'API), le tirage est consommé dans la transaction :
+        DrawAlreadyUsed est levée s'il a déjà été enregistré."""
         conn = self.get_connection()
         if conn is None:
             return False
         
         try:
             with conn.cursor() as cur:
+                if draw_id:
+                    consume_draw(cur, draw_id)
+                
                 # Récupérer ou créer l'utilisateur
-                cur.execute(
-                    "INSERT INTO users (username, email, specialty) VALUES (%s, %s, %s) ON CONFLICT (username) DO UPDATE SET specialty = EXCLUDED.specialty RETURNING id",
-                    (username, f"{username}@ecn.fr", specialty)
-                )
+                execute(cur, 'user_upsert', (username, f"{username}@ecn.fr", specialty))
                 user_id = cur.fetchone()[0]
                 
-                # Sauvegarder le score
-                cur.execute(
-                    "INSERT INTO scores (user_id, specialty, score, total_questions, time_taken) VALUES (%s, %s, %s, %s, %s)",
-                    (user_id, specialty, score, total_questions, time_taken)
-                )
+                # Sauvegarder le score et la chronologie des réponses
+                answer_order, answer_times = answer_clock.encode() if answer_clock else (None, None)
+                execute(cur, 'score_insert', (
+                    user_id, specialty, score, total_questions, time_taken,
+                    psycopg2.Binary(answer_order) if answer_order else None,
+                    psycopg2.Binary(answer_times) if answer_times else None
+                ))
+                score_id, stored_score = cur.fetchone()
+                notify_score(cur, score_id, user_id, username, specialty, stored_score)  # Délivrée au commit
+                
+                record_daily_score(cur, user_id, specialty, score, time_taken)
+                increments = {'total_score': score, 'quiz_count': 1}
+                if questions and user_answers:
+                    latencies = answer_clock.latencies(len(questions)) if answer_clock else None
+                    rows = response_rows(user_id, questions, user_answers, latencies)
+                    record_responses(cur, rows)
+                    update_review_states(cur, rows, {q['id']: correct_mask(q) for q in questions if 'id' in q})
+                    fast_correct = fast_correct_count(rows)
+                    if fast_correct:
+                        increments['fast_correct'] = fast_correct
+                
+                # Compteurs et badges dont les entrées ont changé
+                counters = update_counters(cur, user_id, **increments)
+                new_badges = award_badges(cur, user_id, counters, increments)
                 
                 conn.commit()
+                user_cache.invalidate(username)
+                leaderboard_cache.invalidate(SCORES_LEADERBOARD, None, specialty)
+                sketch_store.add(self, specialty_sketch(specialty), score)
+                if awarded_badges is not None:
+                    awarded_badges.extend(new_badges)
                 return True
                 
+        except DrawAlreadyUsed:
+            raise  # Transaction annulée à la libération de la connexion
         except Exception as e:
             st.error(f"Erreur lors de la sauvegarde: {e}")
             return False
         finally:
             conn.close()
     
+    def purge_consumed_draws(self, ttl: int) -> int:
+        """Supprime les tirages consommés dont le jeton a expiré (ttl en secondes)"""
+        conn = self.get_connection()
+        if conn is None:
+            return 0
+        
+        try:
+            with conn.cursor() as cur:
+                purged = purge_consumed_draws(cur, ttl)
+                conn.commit()
+                return purged
+        except Exception as e:
+            print(f"❌ Erreur purge des tirages: {e}")
+            return 0
+        finally:
+            conn.close()
+    
     def get_leaderboard(self, specialty=None, limit=10):
+        """Classement général ou par spécialité, servi depuis le cache partagé du processus"""
+        size = leaderboard_cache.config.leaderboard_size
+        if limit > size:
+            return self._load_leaderboard(specialty, limit) or []
+        rows = leaderboard_cache.get(SCORES_LEADERBOARD, specialty, lambda: self._load_leaderboard(specialty, size))
+        return (rows or [])[:limit]
+    
+    def _load_leaderboard(self, specialty, limit):
         conn = self.get_connection()
         if conn is None:
-            return []
+            return None
         
         try:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 if specialty:
-                    query = """
-                        SELECT u.username, SUM(s.score) as total_score, COUNT(s.id) as quizzes_taken
-                        FROM scores s
-                        JOIN users u ON s.user_id = u.id
-                        WHERE s.specialty = %s
-                        GROUP BY u.username
-                        ORDER BY total_score DESC
-                        LIMIT %s
-                    """
-                    cur.execute(query, (specialty, limit))
+                    execute(cur, 'specialty_leaderboard', (specialty, limit))
                 else:
-                    query = """
-                        SELECT u.username, SUM(s.score) as total_score, COUNT(s.id) as quizzes_taken
-                        FROM scores s
-                        JOIN users u ON s.user_id = u.id
-                        GROUP BY u.username
-                        ORDER BY total_score DESC
-                        LIMIT %s
-                    """
-                    cur.execute(query, (limit,))
+                    execute(cur, 'leaderboard', (limit,))
                 
                 return cur.fetchall()
                 
         except Exception as e:
             st.error(f"Erreur lors de la récupération du classement: {e}")
-            return []
+            return None
         finally:
             conn.close()
     
     def get_user_progress_data(self, username: str):
-        """Récupère les données de progression d'un utilisateur - VERSION CORRIGÉE"""
+        """Données de progression d'un utilisateur (mises en cache jusqu'à sa prochaine écriture)"""
+        return user_cache.get(username, 'progress', lambda: self._load_user_progress_data(username))
+    
+    def _load_user_progress_data(self, username: str):
+        """Récupère les données de progression d'un utilisateur depuis les agrégats journaliers"""
         conn = self.get_connection()
         if not conn:
             return None
         
         try:
             with conn.cursor() as cur:
-                # Scores par spécialité - REQUÊTE CORRIGÉE
-                cur.execute("""
-                    SELECT s.specialty, AVG(s.score) as avg_score, COUNT(*) as quiz_count,
-                        SUM(s.score) as total_score, AVG(s.time_taken) as avg_time
-                    FROM scores s 
-                    JOIN users u ON s.user_id = u.id 
-                    WHERE u.username = %s 
-                    GROUP BY s.specialty
-                    ORDER BY avg_score DESC
-                """, (username,))
+                # Scores par spécialité
+                execute(cur, 'progress_by_specialty', (username,))
                 
                 specialty_data = cur.fetchall()
                 
-                # Progression dans le temps - REQUÊTE CORRIGÉE
-                cur.execute("""
-                    SELECT DATE(s.created_at) as date, AVG(s.score) as daily_avg,
-                        COUNT(*) as daily_quizzes
-                    FROM scores s 
-                    JOIN users u ON s.user_id = u.id 
-                    WHERE u.username = %s 
-                    GROUP BY DATE(s.created_at)
-                    ORDER BY date
-                """, (username,))
+                # Progression dans le temps
+                execute(cur, 'progress_timeline', (username,))
                 
                 timeline_data = cur.fetchall()
                 
@@ -223,6 +591,46 @@ class DatabaseManager:
             return None
         finally:
             conn.close()
+    
+    def get_user_response_times(self, username: str, limit: int = 5000):
+        """Réponses chronométrées récentes (question_id, correct, latency_ms), en cache jusqu'à la prochaine écriture"""
+        return user_cache.get(username, 'response_times', lambda: self._load_user_response_times(username, limit))
+    
+    def _load_user_response_times(self, username: str, limit: int):
+        conn = self.get_connection()
+        if conn is None:
+            return None
+        
+        try:
+            with conn.cursor() as cur:
+                execute(cur, 'response_times', (username, limit))
+                return cur.fetchall()
+                
+        except Exception as e:
+            print(f"Erreur temps de réponse: {e}")
+            return None
+        finally:
+            conn.close()
+    
+    def get_user_global_stats(self, username: str):
+        """Statistiques globales des quiz (nombre, total, moyenne, premier et dernier jour)"""
+        return user_cache.get(username, 'global_stats', lambda: self._load_user_global_stats(username))
+    
+    def _load_user_global_stats(self, username: str):
+        conn = self.get_connection()
+        if conn is None:
+            return None
+        
+        try:
+            with conn.cursor() as cur:
+                execute(cur, 'global_stats', (username,))
+                return cur.fetchone()
+                
+        except Exception as e:
+            print(f"Erreur statistiques globales: {e}")
+            return None
+        finally:
+            conn.close()
     def debug_user_stats(self, username: str):
         """Méthode de debug pour les statistiques utilisateur"""
         conn = self.get_connection()
@@ -232,7 +640,7 @@ class DatabaseManager:
         try:
             with conn.cursor() as cur:
                 # Vérifier si l'utilisateur existe
-                cur.execute("SELECT id, username, created_at FROM users WHERE username = %s", (username,))
+                execute(cur, 'debug_user', (username,))
                 user = cur.fetchone()
                 if not user:
                     return f"❌ Utilisateur {username} non trouvé"
@@ -241,12 +649,12 @@ class DatabaseManager:
                 print(f"✅ Utilisateur trouvé: {user[1]} (ID: {user_id})")
                 
                 # Compter les scores
-                cur.execute("SELECT COUNT(*), MAX(created_at) FROM scores WHERE user_id = %s", (user_id,))
+                execute(cur, 'debug_scores', (user_id,))
                 score_stats = cur.fetchone()
                 print(f"📊 Scores: {score_stats[0]} entrées, dernière le {score_stats[1]}")
                 
                 # Compter les simulations ECN
-                cur.execute("SELECT COUNT(*), MAX(created_at) FROM ecn_simulations WHERE user_id = %s", (user_id,))
+                execute(cur, 'debug_simulations', (user_id,))
                 ecn_stats = cur.fetchone()
                 print(f"🎯 Simulations ECN: {ecn_stats[0]} entrées, dernière le {ecn_stats[1]}")
                 
@@ -257,8 +665,9 @@ class DatabaseManager:
         finally:
             conn.close()
             
-    def save_clinical_case_score(self, username: str, specialty: str, case_title: str, score: float, total_steps: int, correct_steps: int):
-        """Sauvegarde le score d'un dossier clinique"""
+    def save_clinical_case_score(self, username: str, specialty: str, case_title: str, score: float, total_steps: int, correct_steps: int,
+                                 awarded_badges: Optional[List[str]] = None):
+        """Sauvegarde le score d'un dossier clinique (compteurs et badges dans la même transaction)"""
         conn = self.get_connection()
         if conn is None:
             return False
@@ -266,18 +675,26 @@ class DatabaseManager:
         try:
             with conn.cursor() as cur:
                 # Récupérer l'ID utilisateur
-                cur.execute("SELECT id FROM users WHERE username = %s", (username,))
+                execute(cur, 'user_id', (username,))
                 result = cur.fetchone()
                 if result:
                     user_id = result[0]
                     
                     # Sauvegarder le score (utilisation de la table scores existante)
-                    cur.execute(
-                        "INSERT INTO scores (user_id, specialty, score, total_questions, time_taken, case_title) VALUES (%s, %s, %s, %s, %s, %s)",
-                        (user_id, specialty, int(score), total_steps, 0, case_title)  # time_taken à 0 pour les dossiers
-                    )
+                    execute(cur, 'case_score_insert',
+                            (user_id, specialty, int(score), total_steps, 0, case_title))  # time_taken à 0 pour les dossiers
+                    notify_score(cur, cur.fetchone()[0], user_id, username, specialty, int(score))
+                    
+                    record_daily_score(cur, user_id, specialty, int(score), 0)
+                    counters = update_counters(cur, user_id, total_score=int(score), quiz_count=1)
+                    new_badges = award_badges(cur, user_id, counters, ('total_score', 'quiz_count'))
                     
                     conn.commit()
+                    user_cache.invalidate(username)
+                    leaderboard_cache.invalidate(SCORES_LEADERBOARD, None, specialty)
+                    sketch_store.add(self, specialty_sketch(specialty), int(score))
+                    if awarded_badges is not None:
+                        awarded_badges.extend(new_badges)
                     return True
             return False
             
@@ -287,16 +704,21 @@ class DatabaseManager:
         finally:
             conn.close()
             
-    def save_ecn_simulation(self, username: str, simulation_data: Dict):
-        """Sauvegarde les résultats d'une simulation ECN - VERSION CORRIGÉE"""
+    def save_ecn_simulation(self, username: str, simulation_data: Dict, awarded_badges: Optional[List[str]] = None,
+                            draw_id: Optional[str] = None):
+        """Sauvegarde les résultats d'une simulation ECN (compteurs et badges dans la même transaction).
+        Avec draw_id, le tirage signé de l'API est consommé comme dans save_score."""
         conn = self.get_connection()
         if conn is None:
             return False
         
         try:
             with conn.cursor() as cur:
-                # Utiliser get_or_create_user au lieu de SELECT simple
-                user_id = self.get_or_create_user(username)
+                if draw_id:
+                    consume_draw(cur, draw_id)
+                
+                # Utilisateur récupéré ou créé dans la transaction (pas de seconde connexion du pool)
+                user_id = self._get_or_create_user_id(cur, username)
                 
                 if not user_id:
                     print(f"❌ Impossible de créer/récupérer l'utilisateur {username}")
@@ -306,27 +728,22 @@ class DatabaseManager:
                 session = simulation_data['session']
                 results = simulation_data['results']
                 
+                # Réponses compactes [question_id, correct] pour la calibration des items
+                responses = [
+                    [question['id'], int(detail['score'] == 2)]
+                    for question, detail in zip(session.get('questions', []), results.get('detailed_results', []))
+                    if 'id' in question and detail['user_answer'] not in ('Non répondu', '', [])
+                ]
+                
+                rows = response_rows(user_id, session.get('questions', []), simulation_data.get('user_answers') or [])
+                record_responses(cur, rows)
+                update_review_states(cur, rows, {q['id']: correct_mask(q) for q in session.get('questions', []) if 'id' in q})
+                
                 # S'assurer que simulation_data est sérialisable
-                serializable_data = {
-                    'session_id': session['id'],
-                    'session_title': session['title'],
-                    'total_questions': session['total_questions'],
-                    'results_summary': {
-                        'raw_score': results['raw_score'],
-                        'max_score': results['max_score'],
-                        'percentage': results['percentage'],
-                        'passed': results['passed'],
-                        'grade': results['grade']
-                    },
-                    'timestamp': datetime.now().isoformat()
-                }
+                serializable_data = self.build_simulation_data(session, results, responses)
                 
                 # Sauvegarder la simulation
-                cur.execute("""
-                    INSERT INTO ecn_simulations 
-                    (user_id, simulation_id, score, max_score, percentage, duration, passed, grade, simulation_data)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
+                execute(cur, 'ecn_simulation_insert', (
                     user_id,
                     session['id'],
                     float(results['raw_score']),
@@ -338,10 +755,24 @@ class DatabaseManager:
                     json.dumps(serializable_data)
                 ))
                 
+                percentage = round(float(results['percentage']), 2)
+                counters = update_counters(cur, user_id, simulation_count=1, best_percentage=percentage)
+                changed = ['simulation_count']
+                if record_ecn_best(cur, user_id, percentage):
+                    changed.append('best_percentage')
+                new_badges = award_badges(cur, user_id, counters, changed)
+                
                 conn.commit()
+                user_cache.invalidate(username)
+                leaderboard_cache.invalidate(ECN_LEADERBOARD)  # Moyennes et nombres de simulations affichés
+                sketch_store.add(self, ecn_sketch(serializable_data['mode']), percentage)
+                if awarded_badges is not None:
+                    awarded_badges.extend(new_badges)
                 print(f"✅ Simulation ECN sauvegardée pour {username}")
                 return True
                 
+        except DrawAlreadyUsed:
+            raise
         except Exception as e:
             print(f"❌ Erreur sauvegarde simulation: {e}")
             import traceback
@@ -350,6 +781,49 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    @staticmethod
+    def build_simulation_data(session: Dict, results: Dict, responses: list) -> Dict:
+        """Construit le résumé JSON sérialisable stocké dans ecn_simulations.simulation_data"""
+        simulation_data = {
+            'session_id': session['id'],
+            'session_title': session['title'],
+            'mode': session.get('mode', 'fixed'),
+            'total_questions': session['total_questions'],
+            'results_summary': {
+                'raw_score': float(results['raw_score']),
+                'max_score': float(results['max_score']),
+                'percentage': float(results['percentage']),
+                'passed': bool(results['passed']),
+                'grade': results['grade']
+            },
+            'responses': responses,
+            'timestamp': datetime.now().isoformat()
+        }
+        if 'theta' in results:
+            simulation_data['ability'] = {
+                'theta': results['theta'],
+                'standard_error': results['standard_error']
+            }
+        return simulation_data
+    
+    @staticmethod
+    def _get_or_create_user_id(cur, username: str, specialty: str = "general"):
+        """Identifiant de l'utilisateur, créé si besoin sur le curseur fourni (commit à la charge de l'appelant)"""
+        # Essayer de récupérer l'utilisateur
+        execute(cur, 'user_id', (username,))
+        result = cur.fetchone()
+        if result:
+            return result[0]  # Retourner l'ID existant
+        
+        # Créer un nouvel utilisateur (création concurrente du même nom : on relit l'existant)
+        execute(cur, 'user_insert', (username, f"{username}@ecn-prep.fr", specialty))
+        result = cur.fetchone()
+        if result:
+            print(f"✅ Nouvel utilisateur créé: {username} (ID: {result[0]})")
+            return result[0]
+        execute(cur, 'user_id', (username,))
+        return cur.fetchone()[0]
+    
     def get_or_create_user(self, username: str, specialty: str = "general"):
         """Récupère ou crée un utilisateur - VERSION CORRIGÉE"""
         conn = self.get_connection()
@@ -358,23 +832,9 @@ class DatabaseManager:
         
         try:
             with conn.cursor() as cur:
-                # Essayer de récupérer l'utilisateur
-                cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-                result = cur.fetchone()
-                
-                if result:
-                    return result[0]  # Retourner l'ID existant
-                else:
-                    # Créer un nouvel utilisateur
-                    email = f"{username}@ecn-prep.fr"
-                    cur.execute(
-                        "INSERT INTO users (username, email, specialty) VALUES (%s, %s, %s) RETURNING id",
-                        (username, email, specialty)
-                    )
-                    user_id = cur.fetchone()[0]
-                    conn.commit()
-                    print(f"✅ Nouvel utilisateur créé: {username} (ID: {user_id})")
-                    return user_id
+                user_id = self._get_or_create_user_id(cur, username, specialty)
+                conn.commit()
+                return user_id
                     
         except Exception as e:
             print(f"❌ Erreur get_or_create_user: {e}")
@@ -383,51 +843,64 @@ class DatabaseManager:
             conn.close()
 
     def get_ecn_leaderboard(self, limit: int = 20):
-        """Récupère le classement des simulations ECN - VERSION CORRIGÉE"""
+        """Classement des simulations ECN, servi depuis le cache partagé du processus"""
+        size = leaderboard_cache.config.leaderboard_size
+        if limit > size:
+            return self._load_ecn_leaderboard(limit) or []
+        rows = leaderboard_cache.get(ECN_LEADERBOARD, None, lambda: self._load_ecn_leaderboard(size))
+        return (rows or [])[:limit]
+    
+    def _load_ecn_leaderboard(self, limit: int):
+        """Top-N lu dans l'instantané en mémoire (invalidé par version), statistiques agrégées
+        uniquement pour ces N utilisateurs"""
         conn = self.get_connection()
         if conn is None:
-            return []
+            return None
         
         try:
+            with conn.cursor() as cur:
+                top = ecn_top_cached(cur, limit)
+            if not top:
+                return []
+            
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute("""
-                    SELECT 
-                        u.username,
-                        CAST(AVG(e.percentage) AS DECIMAL(5,2)) as avg_score,
-                        CAST(MAX(e.percentage) AS DECIMAL(5,2)) as best_score,
-                        COUNT(e.id) as simulations_count,
-                        MIN(e.created_at) as first_simulation,
-                        MAX(e.created_at) as last_simulation
-                    FROM ecn_simulations e
-                    JOIN users u ON e.user_id = u.id
-                    GROUP BY u.id, u.username
-                    HAVING COUNT(e.id) >= 1
-                    ORDER BY best_score DESC, avg_score DESC
-                    LIMIT %s
-                """, (limit,))
-                
-                leaderboard = []
-                for row in cur.fetchall():
-                    leaderboard.append({
-                        'username': row['username'],
-                        'avg_score': float(row['avg_score']) if row['avg_score'] else 0.0,
-                        'best_score': float(row['best_score']) if row['best_score'] else 0.0,
-                        'simulations_count': int(row['simulations_count']),
-                        'first_simulation': row['first_simulation'],
-                        'last_simulation': row['last_simulation']
-                    })
-                
-                return leaderboard
+                execute(cur, 'ecn_leaderboard_stats', ([row[0] for row in top],))
+                return ecn_leaderboard_rows(top, {row['user_id']: row for row in cur.fetchall()})
                 
         except Exception as e:
             print(f"❌ Erreur classement ECN: {e}")
             import traceback
             print(f"🔍 Détails: {traceback.format_exc()}")
-            return []
+            return None
         finally:
             conn.close()
 
+    def get_user_recommendations(self, username: str):
+        """Liste classée des spécialités à travailler, calculée par compute_recommendations.py"""
+        return user_cache.get(username, 'recommendations', lambda: self._load_user_recommendations(username))
+    
+    def _load_user_recommendations(self, username: str):
+        conn = self.get_connection()
+        if conn is None:
+            return None
+        
+        try:
+            with conn.cursor() as cur:
+                execute(cur, 'user_recommendations', (username,))
+                row = cur.fetchone()
+                return row[0] if row else []
+                
+        except Exception as e:
+            print(f"Erreur recommandations: {e}")
+            return None
+        finally:
+            conn.close()
+    
     def get_user_ecn_stats(self, username: str):
+        """Statistiques ECN d'un utilisateur (mises en cache jusqu'à sa prochaine simulation)"""
+        return user_cache.get(username, 'ecn_stats', lambda: self._load_user_ecn_stats(username))
+    
+    def _load_user_ecn_stats(self, username: str):
         """Récupère les statistiques ECN d'un utilisateur - VERSION CORRIGÉE"""
         conn = self.get_connection()
         if conn is None:
@@ -435,33 +908,14 @@ class DatabaseManager:
         
         try:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                # D'abord s'assurer que l'utilisateur existe
-                user_id = self.get_or_create_user(username)
-                if not user_id:
+                # Lecture seule : un utilisateur inconnu n'a pas de statistiques
+                execute(cur, 'user_id', (username,))
+                user = cur.fetchone()
+                if not user:
                     return {}
                 
-                cur.execute("""
-                    SELECT 
-                        COUNT(*) as total_simulations,
-                        CAST(AVG(e.percentage) AS DECIMAL(5,2)) as average_score,
-                        CAST(MAX(e.percentage) AS DECIMAL(5,2)) as best_score,
-                        CAST(MIN(e.percentage) AS DECIMAL(5,2)) as worst_score,
-                        CAST(AVG(e.duration) AS INTEGER) as average_time,
-                        SUM(CASE WHEN e.passed = true THEN 1 ELSE 0 END) as passed_count,
-                        MIN(e.created_at) as first_simulation,
-                        MAX(e.created_at) as last_simulation
-                    FROM ecn_simulations e
-                    WHERE e.user_id = %s
-                """, (user_id,))
-                
-                result = cur.fetchone()
-                if result:
-                    stats = dict(result)
-                    # Convertir les types pour éviter les problèmes
-                    stats['total_simulations'] = int(stats['total_simulations']) if stats['total_simulations'] else 0
-                    stats['passed_count'] = int(stats['passed_count']) if stats['passed_count'] else 0
-                    return stats
-                return {}
+                execute(cur, 'ecn_user_stats', (user['id'],))
+                return ecn_stats_row(cur.fetchone())
                 
         except Exception as e:
             print(f"❌ Erreur stats ECN: {e}")
@@ -471,6 +925,10 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def get_percentile(self, sketch_name: str, value: float):
+        """Position (0-100) d'une valeur dans la distribution de la spécialité ou du type de simulation"""
+        return sketch_store.percentile(self, sketch_name, value)
+    
     def test_connection(self):
         """Teste la connexion à Neon"""
         conn = self.get_connection()
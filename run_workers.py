@@ -0,0 +1,103 @@
+"""Lance plusieurs workers Streamlit derrière nginx, avec une banque de questions partagée.
+
+La banque (data/*.json) est analysée une seule fois : le superviseur en écrit une image
+binaire (utils/shared_bank.py) dans ECN_BANK_DIR (/dev/shm par défaut), puis démarre les
+workers avec ECN_BANK_IMAGE ; chaque worker projette l'image en lecture seule au lieu de
+garder sa propre copie de la banque. Un worker arrêté est relancé ; SIGTERM / SIGINT
+arrêtent tous les workers. Chaque worker est servi sous son propre préfixe d'URL
+(/w8501/, /w8502/…, ECN_WORKER_PATH) : nginx envoie un nouveau client vers un préfixe
+choisi par hachage de son adresse (sessions collantes : l'état d'une session Streamlit vit
+dans un seul worker), et un joueur peut être renvoyé vers le worker qui tient une salle
+de compétition (utils/competition_room.py).
+
+Exemples (depuis la racine du dépôt) :
+    python run_workers.py --workers 8                   # ports 8501 à 8508
+    python run_workers.py --workers 2 --base-port 9000 --no-shared-bank
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from config import WorkerConfig
+from utils.quiz_manager import QuizManager
+from utils.shared_bank import build_bank_image
+
+
+def build_image(data_dir: str, bank_dir: str) -> str:
+    start = time.time()
+    quiz_mgr = QuizManager(data_dir, bank_image="")
+    path = build_bank_image(quiz_mgr, os.path.join(bank_dir, f"ecn_bank_{os.getpid()}.bin"))
+    print(f"✅ Banque partagée : {len(quiz_mgr.questions_by_id)} questions, "
+          f"{os.path.getsize(path) / 1e6:.1f} Mo, {path} ({time.time() - start:.1f}s)")
+    return path
+
+
+def start_worker(port: int, env: dict) -> subprocess.Popen:
+    path = f"w{port}"
+    return subprocess.Popen([
+        sys.executable, "-m", "streamlit", "run", "app.py",
+        f"--server.port={port}", "--server.address=0.0.0.0", "--server.headless=true",
+        f"--server.baseUrlPath={path}"
+    ], env=dict(env, ECN_WORKER_PATH=path))
+
+
+def main():
+    config = WorkerConfig()
+    parser = argparse.ArgumentParser(description="Superviseur des workers Streamlit")
+    parser.add_argument("--workers", type=int, default=config.workers)
+    parser.add_argument("--base-port", type=int, default=config.base_port)
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--no-shared-bank", action="store_true", help="Chaque worker relit data/*.json")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    image = None
+    if not args.no_shared_bank:
+        image = env['ECN_BANK_IMAGE'] = build_image(args.data_dir, config.bank_dir)
+
+    ports = [args.base_port + i for i in range(args.workers)]
+    workers = {port: start_worker(port, env) for port in ports}
+    print(f"🚀 {args.workers} worker(s) sur les ports {ports[0]}-{ports[-1]}")
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.append(signum))
+
+    started = dict.fromkeys(ports, time.time())
+    delays, restart_at = {}, {}
+    try:
+        while not stopping:
+            time.sleep(0.5)
+            now = time.time()
+            for port, process in workers.items():
+                if port in restart_at:
+                    if now >= restart_at[port]:
+                        del restart_at[port]
+                        workers[port], started[port] = start_worker(port, env), now
+                    continue
+                code = process.poll()
+                if code is None:
+                    continue
+                # Relance différée ; le délai double si le worker s'arrête moins d'une minute après son démarrage
+                delay = min(delays.get(port, config.restart_delay / 2) * 2, 60.0) if now - started[port] < 60 else config.restart_delay
+                delays[port], restart_at[port] = delay, now + delay
+                print(f"⚠️ Worker {port} arrêté (code {code}), relance dans {delay:.0f}s")
+    finally:
+        for process in workers.values():
+            if process.poll() is None:
+                process.terminate()
+        deadline = time.time() + 10
+        for process in workers.values():
+            try:
+                process.wait(max(0.1, deadline - time.time()))
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if image:
+            os.remove(image)
+        print("🛑 Workers arrêtés")
+
+
+if __name__ == "__main__":
+    main()
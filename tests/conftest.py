@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+@pytest.fixture(scope="session")
+def quiz_manager():
+    """Banque de questions du dépôt (fichiers JSON de data/)"""
+    from utils.quiz_manager import QuizManager
+    return QuizManager(os.path.join(REPO_ROOT, "data"), bank_image="")
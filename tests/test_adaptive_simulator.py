@@ -0,0 +1,39 @@
+import numpy as np
+
+from config import AdaptiveConfig
+from utils.adaptive_simulator import ItemBank, ItemCalibrator, irt_probability
+
+
+def simulate_responses(rng, n_persons, difficulty, discrimination):
+    theta = rng.normal(size=n_persons)
+    p = irt_probability(theta[:, None], discrimination[None, :], difficulty[None, :])
+    correct = (rng.random(p.shape) < p).astype(int)
+    persons, items = np.meshgrid(np.arange(n_persons), np.arange(len(difficulty)), indexing="ij")
+    return persons.ravel(), [f"q{k}" for k in items.ravel()], correct.ravel()
+
+
+def test_fit_recovers_item_difficulty():
+    rng = np.random.default_rng(0)
+    difficulty = np.linspace(-2, 2, 20)
+    discrimination = np.full(20, 1.2)
+    persons, question_ids, correct = simulate_responses(rng, 800, difficulty, discrimination)
+
+    parameters = ItemCalibrator(None, AdaptiveConfig(model="2pl")).fit(persons, question_ids, correct)
+
+    estimated = np.array([parameters[f"q{k}"]['difficulty'] for k in range(20)])
+    # Échelle resserrée par les priors : on vérifie l'ordre des difficultés, pas leurs valeurs
+    assert np.corrcoef(estimated, difficulty)[0, 1] > 0.98
+    assert estimated[0] < -1 and estimated[-1] > 1
+
+
+def test_fit_skips_items_below_min_responses():
+    parameters = ItemCalibrator(None, AdaptiveConfig(min_responses=5)).fit(
+        [1, 2, 3, 4, 5, 1], ["a", "a", "a", "a", "a", "b"], [1, 0, 1, 1, 0, 1])
+    assert set(parameters) == {"a"}
+    assert parameters["a"]['n_responses'] == 5
+
+
+def test_information_peaks_at_item_difficulty():
+    bank = ItemBank(["easy", "medium", "hard"], [-2.0, 0.0, 2.0], [1.0, 1.0, 1.0])
+    for item, difficulty in enumerate(bank.difficulty):
+        assert abs(bank.grid[bank.information[:, item].argmax()] - difficulty) < 0.11
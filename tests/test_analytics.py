@@ -0,0 +1,24 @@
+import numpy as np
+
+from utils.analytics import lttb
+
+
+def test_keeps_endpoints_and_requested_count():
+    x = np.arange(1000)
+    y = np.sin(x / 30) + np.random.default_rng(0).normal(0, 0.1, 1000)
+    selected = lttb(x, y, 100)
+
+    assert len(selected) == 100
+    assert selected[0] == 0 and selected[-1] == 999
+    assert np.all(np.diff(selected) > 0)
+
+
+def test_keeps_isolated_peak():
+    y = np.zeros(500)
+    y[237] = 10.0
+    assert 237 in lttb(np.arange(500), y, 20)
+
+
+def test_short_series_unchanged():
+    assert lttb([1, 2, 3], [4, 5, 6], 10).tolist() == [0, 1, 2]
+    assert lttb(list(range(50)), list(range(50)), 2).tolist() == list(range(50))
@@ -0,0 +1,35 @@
+import numpy as np
+
+from utils.answer_timing import AnswerClock, decode_deltas, encode_deltas
+
+
+def test_round_trip():
+    rng = np.random.default_rng(0)
+    for values in ([], [0], [5, 3, 7, 7, 1], rng.integers(-10**12, 10**12, 1000), np.cumsum(rng.integers(0, 90_000, 500))):
+        assert decode_deltas(encode_deltas(values)).tolist() == list(np.asarray(values, dtype=np.int64))
+
+
+def test_extreme_values():
+    values = [0, 2**62, -2**62, 1, -1, 2**63 - 1]
+    assert decode_deltas(encode_deltas(values)).tolist() == values
+
+
+def test_zigzag_varint_sizes():
+    # Écarts 0, -1, 1, -64, 64 → zigzag 0, 1, 2, 127, 128 : 1 octet jusqu'à 127, puis 2
+    assert encode_deltas([0, -1, 0, -64, 0]) == bytes([0, 1, 2, 127, 128, 1])
+    assert len(encode_deltas(np.arange(0, 100_000, 1000))) == 100 * 2 - 1
+
+
+def test_decode_empty():
+    assert decode_deltas(None).size == 0
+    assert decode_deltas(b"").size == 0
+
+
+def test_clock_round_trip_and_latencies():
+    clock = AnswerClock(started_at=100.0)
+    for index, at in [(0, 101.5), (2, 104.0), (1, 104.25), (0, 110.0)]:
+        clock.lap(index, at)
+
+    restored = AnswerClock.decode(*clock.encode(), started_at=100.0)
+    assert (restored.order, restored.offsets) == ([0, 2, 1, 0], [1500, 4000, 4250, 10000])
+    assert restored.latencies(4) == [1500 + 5750, 250, 2500, None]
@@ -0,0 +1,60 @@
+import pytest
+
+import api
+from api import ApiError, require_drawn, resolve_answers, sign_draw
+
+
+@pytest.fixture
+def questions(quiz_manager, monkeypatch):
+    monkeypatch.setattr(api, "quiz_mgr", quiz_manager)
+    return [quiz_manager.get_question(qid) for qid in quiz_manager.sample_question_ids(5)]
+
+
+def api_error(call, *args) -> ApiError:
+    with pytest.raises(ApiError) as raised:
+        call(*args)
+    return raised.value
+
+
+def test_resolve_answers(questions):
+    first, second = questions[:2]
+    resolved, user_answers = resolve_answers({'answers': [
+        {'question_id': first['id'], 'selected': first['options'][0]['text']},
+        {'question_id': second['id']}
+    ]})
+    assert resolved == [first, second]
+    assert user_answers == [{'selected': first['options'][0]['text']}, {}]
+
+
+def test_resolve_answers_rejects_invalid_bodies(questions, monkeypatch):
+    question_id = questions[0]['id']
+    assert api_error(resolve_answers, {}).status == 400
+    assert api_error(resolve_answers, {'answers': ["x"]}).status == 400
+    assert api_error(resolve_answers, {'answers': [{'question_id': question_id}] * 2}).status == 400
+    assert api_error(resolve_answers, {'answers': [{'question_id': question_id, 'selected': 5}]}).status == 400
+    assert api_error(resolve_answers, {'answers': [{'question_id': "inconnue:1"}]}).status == 404
+
+    monkeypatch.setattr(api.config, "max_questions", 1)
+    assert api_error(resolve_answers, {'answers': [{'question_id': q['id']} for q in questions[:2]]}).status == 400
+
+
+def test_require_drawn(questions):
+    token = sign_draw(questions)
+    draw_id = require_drawn({'draw': token}, questions[:3])
+    assert draw_id == require_drawn({'draw': token}, questions)
+    # Chaque tirage a son identifiant, consommé par l'enregistrement
+    assert draw_id != require_drawn({'draw': sign_draw(questions)}, questions)
+
+
+def test_require_drawn_rejects(questions, monkeypatch):
+    token = sign_draw(questions[:3])
+    assert api_error(require_drawn, {}, questions[:3]).status == 400
+
+    tampered = token[:-2] + ("00" if not token.endswith("00") else "11")
+    assert api_error(require_drawn, {'draw': tampered}, questions[:3]).status == 403
+
+    outside = api_error(require_drawn, {'draw': token}, questions)
+    assert outside.status == 403 and questions[3]['id'] in str(outside)
+
+    monkeypatch.setattr(api.config, "draw_ttl", -1)
+    assert str(api_error(require_drawn, {'draw': token}, questions[:3])) == "Tirage expiré"
@@ -0,0 +1,67 @@
+from utils import badge_rules
+from utils.badge_rules import award_badges, rule_satisfied, rules_by_input
+from utils.statements import STATEMENTS
+
+
+class BadgeCursor:
+    """Curseur factice : enregistre les badges insérés, déjà possédés si dans `owned`"""
+
+    def __init__(self, owned=()):
+        self.connection = None
+        self.owned = set(owned)
+        self.inserted = []
+        self._row = None
+
+    def execute(self, sql, params=()):
+        assert sql == STATEMENTS['badge_insert']
+        user_id, badge_id = params
+        self.inserted.append(badge_id)
+        self._row = None if badge_id in self.owned else (badge_id,)
+
+    def fetchone(self):
+        return self._row
+
+
+def test_operators():
+    assert rule_satisfied({'threshold': 10}, 10)
+    assert not rule_satisfied({'threshold': 10}, 9)
+    assert rule_satisfied({'threshold': 3, 'operator': "<="}, 1)
+    assert not rule_satisfied({'threshold': 3, 'operator': "<="}, 4)
+    # Métrique absente (pas de simulation, hors podium) : jamais satisfaite
+    assert not rule_satisfied({'threshold': 3, 'operator': "<="}, None)
+
+
+def test_rules_indexed_by_input():
+    index = rules_by_input()
+    assert "podium" in index['best_percentage']
+    assert "ecn_rank" not in index
+    assert set(index['simulation_count']) == {"simulateur", "marathonien"}
+
+
+def test_only_changed_metrics_are_evaluated():
+    counters = {'total_score': 1000, 'quiz_count': 50, 'simulation_count': 5, 'best_percentage': 90}
+    cur = BadgeCursor()
+    names = award_badges(cur, 1, counters, ['simulation_count'])
+    assert sorted(cur.inserted) == ["marathonien", "simulateur"]
+    assert sorted(names) == ["Marathonien", "Simulateur ECN"]
+
+
+def test_owned_badges_are_not_reported():
+    cur = BadgeCursor(owned={"debutant"})
+    names = award_badges(cur, 1, {'total_score': 60}, ['total_score'])
+    assert sorted(cur.inserted) == ["debutant", "intermediaire"]
+    assert names == ["Intermédiaire"]
+
+
+def test_ecn_rank_podium(monkeypatch):
+    ranking = [7, 3, 9, 4]
+    monkeypatch.setattr(badge_rules, "ecn_podium", lambda cur, limit: ranking[:limit])
+    counters = {'best_percentage': 70}
+
+    cur = BadgeCursor()
+    award_badges(cur, 9, counters, ['best_percentage'])
+    assert cur.inserted == ["podium"]
+
+    cur = BadgeCursor()
+    award_badges(cur, 4, counters, ['best_percentage'])
+    assert cur.inserted == []
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from utils.deadlines import DeadlineScheduler, TimedRun
+
+
+class Recorder:
+    """on_finish qui compte ses appels"""
+
+    def __init__(self):
+        self.calls = []
+        self.done = threading.Event()
+
+    def __call__(self, run, elapsed):
+        self.calls.append(elapsed)
+        self.done.set()
+        return len(self.calls)
+
+
+def test_finish_runs_once():
+    on_finish = Recorder()
+    run = TimedRun(60, on_finish)
+    threads = [threading.Thread(target=run.finish) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(on_finish.calls) == 1
+    assert run.finish("expired") == 1
+    assert run.reason == "submitted"
+
+
+def test_apply_refused_after_deadline():
+    run = TimedRun(60, Recorder())
+    assert run.apply(lambda state: state.setdefault('answers', []).append(1))
+    run.deadline = time.time() - 1  # Échéance dépassée, clôture pas encore passée
+    assert not run.apply(lambda state: state['answers'].append(2))
+    assert run.state == {'answers': [1]}
+    assert run.elapsed() <= run.deadline - run.started_at
+
+
+def test_apply_refused_after_finish_or_cancel():
+    finished = TimedRun(60, Recorder())
+    finished.finish()
+    assert not finished.apply(lambda state: state.update(late=True))
+
+    cancelled = TimedRun(60, Recorder())
+    cancelled.cancel()
+    assert not cancelled.apply(lambda state: state.update(late=True))
+    assert cancelled.finish() is None
+    assert finished.state == cancelled.state == {}
+
+
+def test_scheduler_closes_at_deadline():
+    scheduler = DeadlineScheduler()
+    on_finish = Recorder()
+    run = scheduler.schedule(TimedRun(0.05, on_finish))
+
+    assert on_finish.done.wait(5)
+    assert run.finished and run.reason == "expired"
+    assert scheduler.pending() == 0
+
+
+def test_scheduler_skips_runs_closed_by_the_user():
+    scheduler = DeadlineScheduler()
+    on_finish = Recorder()
+    run = scheduler.schedule(TimedRun(0.05, on_finish))
+    run.finish()
+    # Épreuve suivante : son échéance garantit que la première a été dépassée
+    later = Recorder()
+    scheduler.schedule(TimedRun(0.1, later))
+
+    assert later.done.wait(5)
+    assert len(on_finish.calls) == 1 and run.reason == "submitted"
@@ -0,0 +1,49 @@
+import random
+
+import numpy as np
+import pytest
+
+from utils.ecn_simulator import ECNSimulator
+
+
+def random_answer(rng, question):
+    texts = [opt['text'] for opt in question['options']]
+    if question['type'] == 'single':
+        return {'selected': rng.choice(texts + [''])}
+    return {'selected': rng.sample(texts, rng.randint(0, len(texts)))}
+
+
+@pytest.fixture(scope="module")
+def simulator(quiz_manager):
+    return ECNSimulator(quiz_manager)
+
+
+def test_batch_scores_match_single_copy_scoring(simulator, quiz_manager):
+    rng = random.Random(7)
+    questions = [quiz_manager.get_question(qid) for qid in quiz_manager.sample_question_ids(60, rng=rng)]
+    answers_batch = [[random_answer(rng, q) for q in questions] for _ in range(40)]
+    answers_batch.append([])  # Copie blanche
+
+    batch = simulator.calculate_ecn_scores_batch(answers_batch, questions)
+
+    for s, user_answers in enumerate(answers_batch):
+        expected = simulator.calculate_ecn_score(user_answers, questions)
+        assert batch['raw_scores'][s] == pytest.approx(expected['raw_score'])
+        assert batch['percentages'][s] == pytest.approx(expected['percentage'])
+        assert batch['grades'][s] == expected['grade']
+        assert bool(batch['passed'][s]) == expected['passed']
+        assert batch['question_scores'][s].tolist() == pytest.approx(
+            [row['score'] for row in expected['detailed_results']])
+
+
+def test_batch_scores_unknown_answer_as_wrong(simulator, quiz_manager):
+    single = next(q for q in quiz_manager.questions_by_id.values() if q['type'] == 'single')
+    multiple = next(q for q in quiz_manager.questions_by_id.values() if q['type'] == 'multiple')
+    correct = [opt['text'] for opt in multiple['options'] if opt.get('correct')]
+
+    batch = simulator.calculate_ecn_scores_batch(
+        [[{'selected': "réponse inconnue"}, {'selected': correct + ["réponse inconnue"]}]], [single, multiple])
+
+    assert batch['question_scores'][0, 0] == -0.5
+    assert batch['question_scores'][0, 1] == max(0, len(correct) * 0.5 - 0.5)
+    assert np.all(batch['selected_masks'] != 0)
@@ -0,0 +1,71 @@
+import threading
+
+from utils.leaderboard_cache import SCORES_LEADERBOARD, LeaderboardCache
+
+
+class BlockingLoader:
+    """Loader qui compte ses appels et attend release avant de renvoyer ses lignes"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(5)
+        return self.rows
+
+
+def run_in_threads(count, target):
+    results = [None] * count
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, target())) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_loads_are_coalesced():
+    cache = LeaderboardCache()
+    loader = BlockingLoader([("alice", 10)])
+
+    threads, results = run_in_threads(8, lambda: cache.get(SCORES_LEADERBOARD, None, loader))
+    assert loader.started.wait(5)
+    loader.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert loader.calls == 1
+    assert results == [[("alice", 10)]] * 8
+    assert cache.get(SCORES_LEADERBOARD, None, lambda: []) == [("alice", 10)]
+
+
+def test_keys_load_independently():
+    cache = LeaderboardCache()
+    cache.get(SCORES_LEADERBOARD, "cardiologie", lambda: ["cardio"])
+    assert cache.get(SCORES_LEADERBOARD, None, lambda: ["général"]) == ["général"]
+    assert cache.get(SCORES_LEADERBOARD, "cardiologie", lambda: []) == ["cardio"]
+
+
+def test_invalidate_during_load():
+    cache = LeaderboardCache()
+    stale = BlockingLoader(["avant"])
+
+    threads, results = run_in_threads(1, lambda: cache.get(SCORES_LEADERBOARD, None, stale))
+    assert stale.started.wait(5)
+    cache.invalidate(SCORES_LEADERBOARD)  # Écriture validée pendant le chargement
+    # Un appelant arrivé après l'invalidation ne rejoint pas le chargement périmé
+    assert cache.get(SCORES_LEADERBOARD, None, lambda: ["après"]) == ["après"]
+    stale.release.set()
+    threads[0].join(5)
+
+    assert results == [["avant"]]
+    assert cache.get(SCORES_LEADERBOARD, None, lambda: ["rechargé"]) == ["après"]
+
+
+def test_failed_load_is_not_cached():
+    cache = LeaderboardCache()
+    assert cache.get(SCORES_LEADERBOARD, None, lambda: None) is None
+    assert cache.get(SCORES_LEADERBOARD, None, lambda: ["ok"]) == ["ok"]
@@ -0,0 +1,63 @@
+import random
+
+import numpy as np
+import pytest
+
+from utils.quantile_sketch import KLLSketch
+
+# Erreur de rang admise : quelques fois 1/k
+RANK_ERROR = 0.02
+
+
+def max_rank_error(sketch, values):
+    values = np.sort(values)
+    probes = np.quantile(values, np.linspace(0.01, 0.99, 99))
+    true_ranks = np.searchsorted(values, probes, side="right") / len(values)
+    return max(abs(sketch.rank(probe) - true_rank) for probe, true_rank in zip(probes, true_ranks))
+
+
+@pytest.fixture(autouse=True)
+def seeded():
+    random.seed(1)
+
+
+def test_rank_error_is_bounded():
+    values = np.random.default_rng(0).normal(60, 15, 100_000)
+    sketch = KLLSketch(k=200)
+    for value in values:
+        sketch.update(value)
+
+    assert sketch.n == len(values)
+    assert sum(len(items) for items in sketch.levels) < 1000
+    assert max_rank_error(sketch, values) < RANK_ERROR
+
+
+def test_merge_keeps_rank_error_bounded():
+    rng = np.random.default_rng(1)
+    parts = [rng.uniform(0, 100, 20_000) for _ in range(5)]
+    merged = KLLSketch(k=200)
+    for part in parts:
+        sketch = KLLSketch(k=200)
+        for value in part:
+            sketch.update(value)
+        merged.merge(sketch)
+
+    values = np.concatenate(parts)
+    assert merged.n == len(values)
+    assert max_rank_error(merged, values) < RANK_ERROR
+    assert merged.quantile(0.5) == pytest.approx(np.median(values), abs=100 * RANK_ERROR)
+
+
+def test_bytes_round_trip():
+    sketch = KLLSketch(k=50)
+    for value in range(5000):
+        sketch.update(value)
+
+    restored = KLLSketch.from_bytes(sketch.to_bytes())
+    assert (restored.k, restored.n, restored.levels) == (sketch.k, sketch.n, sketch.levels)
+
+
+def test_empty_sketch():
+    sketch = KLLSketch()
+    assert sketch.rank(10) is None
+    assert sketch.quantile(0.5) is None
@@ -0,0 +1,34 @@
+import random
+
+
+def specialty_of(quiz_manager, question_id):
+    return next(s for s, questions in quiz_manager.quizzes.items() if any(q['id'] == question_id for q in questions))
+
+
+def test_no_duplicates_and_respects_exclude(quiz_manager):
+    exclude = set(quiz_manager.sample_question_ids(300, rng=random.Random(1)))
+    for seed in range(20):
+        drawn = quiz_manager.sample_question_ids(200, exclude=exclude, rng=random.Random(seed))
+        assert len(drawn) == 200
+        assert len(set(drawn)) == len(drawn)
+        assert not exclude & set(drawn)
+        assert all(quiz_manager.get_question(qid) for qid in drawn)
+
+
+def test_exhausts_bank_without_duplicates(quiz_manager):
+    total = len(quiz_manager.questions_by_id)
+    exclude = set(list(quiz_manager.questions_by_id)[:100])
+    drawn = quiz_manager.sample_question_ids(total, exclude=exclude, rng=random.Random(3))
+    assert sorted(drawn) == sorted(set(quiz_manager.questions_by_id) - exclude)
+
+
+def test_weights_restrict_specialties(quiz_manager):
+    first, second = quiz_manager.get_specialties()[:2]
+    drawn = quiz_manager.sample_question_ids(30, weights={first: 1, second: 1}, rng=random.Random(5))
+    assert len(set(drawn)) == 30
+    assert {specialty_of(quiz_manager, qid) for qid in drawn} <= {first, second}
+
+
+def test_seeded_draw_is_reproducible(quiz_manager):
+    first = quiz_manager.sample_question_ids(50, rng=random.Random(42))
+    assert quiz_manager.sample_question_ids(50, rng=random.Random(42)) == first
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.spaced_repetition import INITIAL_EASE, MIN_EASE, answer_quality, sm2_update
+
+NOW = datetime(2026, 1, 1, 8, 0)
+
+
+def review(qualities, state=None):
+    intervals = []
+    for quality in qualities:
+        *state, due_at = sm2_update(state, quality, NOW)
+        assert due_at == NOW + timedelta(days=state[1])
+        intervals.append(state[1])
+    return intervals, tuple(state)
+
+
+def test_intervals_of_good_answers():
+    intervals, (repetitions, _, ease, lapses) = review([4, 4, 4, 4])
+    assert intervals == [1.0, 6.0, 15.0, 37.5]
+    assert (repetitions, ease, lapses) == (4, pytest.approx(INITIAL_EASE), 0)
+
+
+def test_perfect_answers_raise_ease():
+    intervals, (_, _, ease, _) = review([5, 5, 5])
+    assert ease == pytest.approx(INITIAL_EASE + 0.3)
+    assert intervals == [1.0, 6.0, round(6.0 * ease, 1)]
+
+
+def test_lapse_resets_interval():
+    intervals, (repetitions, _, ease, lapses) = review([4, 4, 4, 1, 4])
+    assert intervals == [1.0, 6.0, 15.0, 1.0, 1.0]
+    assert (repetitions, lapses) == (1, 1)
+    assert ease == pytest.approx(INITIAL_EASE - 0.54)
+
+
+def test_ease_floor():
+    _, (_, _, ease, lapses) = review([1] * 10)
+    assert ease == MIN_EASE
+    assert lapses == 10
+
+
+def test_answer_quality():
+    assert answer_quality(0b0110, 0b0110) == 4
+    assert answer_quality(0b0100, 0b0110) == 3
+    assert answer_quality(0b1100, 0b0110) == 1
+    assert answer_quality(0, 0b0110) == 1
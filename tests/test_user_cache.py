@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+import pytest
+
+from config import CacheConfig
+from utils import user_cache as user_cache_module
+from utils.user_cache import UserCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Horloge monotone contrôlée par le test"""
+    now = SimpleNamespace(value=0.0)
+    monkeypatch.setattr(user_cache_module, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_ttl(clock):
+    cache = UserCache(CacheConfig(user_ttl=30.0))
+    loads = []
+    loader = lambda: loads.append(1) or "stats"
+
+    assert cache.get("alice", "stats", loader) == "stats"
+    clock.value = 29.0
+    assert cache.get("alice", "stats", loader) == "stats"
+    assert len(loads) == 1
+
+    clock.value = 31.0
+    assert cache.lookup("alice", "stats")[1] is None
+    cache.get("alice", "stats", loader)
+    assert len(loads) == 2
+
+
+def test_invalidate_bumps_version(clock):
+    cache = UserCache()
+    cache.get("alice", "stats", lambda: "old")
+    cache.get("bob", "stats", lambda: "bob")
+
+    cache.invalidate("alice")
+    assert cache.lookup("alice", "stats")[1] is None
+    assert cache.lookup("bob", "stats")[1] == "bob"
+
+
+def test_load_started_before_invalidate_is_not_stored(clock):
+    cache = UserCache()
+    version, _ = cache.lookup("alice", "stats")
+    cache.invalidate("alice")  # Écriture pendant le chargement
+    cache.store("alice", "stats", version, "stale")
+    assert cache.lookup("alice", "stats")[1] is None
+
+    version, _ = cache.lookup("alice", "stats")
+    cache.store("alice", "stats", version, "fresh")
+    assert cache.lookup("alice", "stats")[1] == "fresh"
+
+
+def test_lru_bound(clock):
+    cache = UserCache(CacheConfig(user_cache_size=2))
+    for username in ("alice", "bob"):
+        cache.get(username, "stats", lambda: username)
+    cache.get("alice", "badges", lambda: [])  # alice redevient la plus récente
+    cache.get("carol", "stats", lambda: "carol")
+
+    assert cache.lookup("bob", "stats")[1] is None
+    assert cache.lookup("alice", "stats")[1] == "alice"
+    assert cache.lookup("carol", "stats")[1] == "carol"
+
+
+def test_evicted_version_is_not_reused(clock):
+    cache = UserCache(CacheConfig(user_cache_size=1))
+    version, _ = cache.lookup("alice", "stats")
+    cache.invalidate("alice")
+    cache.invalidate("bob")  # Version d'alice évincée
+    cache.store("alice", "stats", version, "stale")
+    assert cache.lookup("alice", "stats")[1] is None
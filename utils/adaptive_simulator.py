@@ -0,0 +1,282 @@
+import random
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+from config import AdaptiveConfig
+
+
+def irt_probability(theta, a, b):
+    """Probabilité de bonne réponse selon le modèle logistique à 2 paramètres"""
+    return 1.0 / (1.0 + np.exp(-a * (theta - b)))
+
+
+class ItemCalibrator:
+    """Calibre la difficulté (et la discrimination) des questions à partir des réponses stockées"""
+
+    def __init__(self, db, config: Optional[AdaptiveConfig] = None):
+        self.db = db
+        self.config = config or AdaptiveConfig()
+
+    def load_responses(self):
+        """Charge les réponses (session, question, correct) enregistrées avec les simulations ECN"""
+        conn = self.db.get_connection()
+        if conn is None:
+            return [], [], []
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT e.id, r->>0 AS question_id, (r->>1)::int AS correct
+                    FROM ecn_simulations e,
+                         jsonb_array_elements(e.simulation_data->'responses') r
+                    WHERE e.simulation_data ? 'responses'
+                """)
+                rows = cur.fetchall()
+
+            person_ids = [row[0] for row in rows]
+            question_ids = [row[1] for row in rows]
+            correct = [row[2] for row in rows]
+            return person_ids, question_ids, correct
+
+        except Exception as e:
+            print(f"❌ Erreur chargement des réponses: {e}")
+            return [], [], []
+        finally:
+            conn.close()
+
+    def fit(self, person_ids: List, question_ids: List[str], correct: List[int]) -> Dict:
+        """Ajuste le modèle Rasch/2PL par maximum a posteriori joint (vectorisé)"""
+        if not question_ids:
+            return {}
+
+        persons, u = np.unique(np.asarray(person_ids), return_inverse=True)
+        items, i = np.unique(np.asarray(question_ids), return_inverse=True)
+        y = np.asarray(correct, dtype=np.float64)
+
+        n_persons, n_items = len(persons), len(items)
+        theta = np.zeros(n_persons)
+        b = np.zeros(n_items)
+        a = np.ones(n_items)
+        fit_discrimination = self.config.model == "2pl"
+
+        # Priors gaussiens : évitent les estimations infinies (100% ou 0% de réussite)
+        theta_var, b_var, a_var = 1.0, 4.0, 0.25
+
+        for _ in range(self.config.calibration_iterations):
+            # Étape de Newton sur les capacités
+            p = irt_probability(theta[u], a[i], b[i])
+            r, w = y - p, p * (1 - p)
+            grad = np.bincount(u, a[i] * r, n_persons) - theta / theta_var
+            hess = np.bincount(u, a[i] ** 2 * w, n_persons) + 1 / theta_var
+            theta += np.clip(grad / hess, -1, 1)
+
+            # Étape de Newton sur les difficultés
+            p = irt_probability(theta[u], a[i], b[i])
+            r, w = y - p, p * (1 - p)
+            grad = -np.bincount(i, a[i] * r, n_items) - b / b_var
+            hess = np.bincount(i, a[i] ** 2 * w, n_items) + 1 / b_var
+            b += np.clip(grad / hess, -1, 1)
+
+            # Étape de Newton sur les discriminations (2PL uniquement)
+            if fit_discrimination:
+                p = irt_probability(theta[u], a[i], b[i])
+                r, w = y - p, p * (1 - p)
+                d = theta[u] - b[i]
+                grad = np.bincount(i, d * r, n_items) - (a - 1) / a_var
+                hess = np.bincount(i, d ** 2 * w, n_items) + 1 / a_var
+                a = np.clip(a + np.clip(grad / hess, -0.5, 0.5), 0.2, 3.0)
+
+        counts = np.bincount(i, minlength=n_items)
+        return {
+            str(question_id): {
+                'difficulty': float(b[k]),
+                'discrimination': float(a[k]),
+                'n_responses': int(counts[k])
+            }
+            for k, question_id in enumerate(items)
+            if counts[k] >= self.config.min_responses
+        }
+
+    def save(self, parameters: Dict) -> bool:
+        """Enregistre les paramètres calibrés dans la table item_parameters"""
+        if not parameters:
+            return True
+
+        conn = self.db.get_connection()
+        if conn is None:
+            return False
+
+        try:
+            from psycopg2.extras import execute_values
+            with conn.cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO item_parameters (question_id, difficulty, discrimination, n_responses, model)
+                    VALUES %s
+                    ON CONFLICT (question_id) DO UPDATE SET
+                        difficulty = EXCLUDED.difficulty,
+                        discrimination = EXCLUDED.discrimination,
+                        n_responses = EXCLUDED.n_responses,
+                        model = EXCLUDED.model,
+                        updated_at = CURRENT_TIMESTAMP
+                """, [
+                    (question_id, p['difficulty'], p['discrimination'], p['n_responses'], self.config.model)
+                    for question_id, p in parameters.items()
+                ], page_size=1000)
+                conn.commit()
+                return True
+
+        except Exception as e:
+            print(f"❌ Erreur sauvegarde calibration: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def run(self) -> int:
+        """Charge les réponses, calibre et enregistre. Retourne le nombre d'items calibrés"""
+        parameters = self.fit(*self.load_responses())
+        return len(parameters) if self.save(parameters) else 0
+
+
+class ItemBank:
+    """Banque d'items calibrés avec table d'information précalculée sur une grille de capacités"""
+
+    def __init__(self, question_ids: List[str], difficulty, discrimination, config: Optional[AdaptiveConfig] = None):
+        self.config = config or AdaptiveConfig()
+        self.question_ids = list(question_ids)
+        self.index = {question_id: k for k, question_id in enumerate(self.question_ids)}
+        self.difficulty = np.asarray(difficulty, dtype=np.float64)
+        self.discrimination = np.asarray(discrimination, dtype=np.float64)
+
+        # Tables (grille × items) : probabilité, log-vraisemblances et information de Fisher
+        self.grid = np.linspace(self.config.theta_min, self.config.theta_max, self.config.grid_points)
+        p = irt_probability(self.grid[:, None], self.discrimination[None, :], self.difficulty[None, :])
+        p = np.clip(p, 1e-9, 1 - 1e-9)
+        self.probability = p
+        self.log_p = np.log(p)
+        self.log_q = np.log1p(-p)
+        self.information = (self.discrimination[None, :] ** 2 * p * (1 - p)).astype(np.float32)
+        self.log_prior = -0.5 * self.grid ** 2
+
+    @classmethod
+    def from_database(cls, quiz_manager, db, config: Optional[AdaptiveConfig] = None):
+        """Construit la banque depuis les questions chargées et les paramètres calibrés"""
+        parameters = {}
+        conn = db.get_connection()
+        if conn is not None:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT question_id, difficulty, discrimination FROM item_parameters")
+                    parameters = {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+            except Exception as e:
+                print(f"❌ Erreur chargement des paramètres d'items: {e}")
+            finally:
+                conn.close()
+
+        # Les items non calibrés gardent les paramètres par défaut (b=0, a=1)
+        question_ids = list(quiz_manager.questions_by_id.keys())
+        difficulty = [parameters.get(q, (0.0, 1.0))[0] for q in question_ids]
+        discrimination = [parameters.get(q, (0.0, 1.0))[1] for q in question_ids]
+        return cls(question_ids, difficulty, discrimination, config)
+
+    def __len__(self):
+        return len(self.question_ids)
+
+
+class AdaptiveSimulator:
+    """Simulation ECN adaptative : sélection par information maximale et arrêt sur erreur standard"""
+
+    def __init__(self, ecn_simulator, item_bank: ItemBank):
+        self.ecn_simulator = ecn_simulator
+        self.quiz_manager = ecn_simulator.quiz_manager
+        self.item_bank = item_bank
+        self.config = item_bank.config
+
+    def start_session(self) -> Dict:
+        """Crée une session adaptative vide"""
+        return {
+            'id': f"ecn_adaptive_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            'title': "Simulation ECN Adaptative",
+            'mode': 'adaptive',
+            'duration': self.ecn_simulator.config.simulation_duration,
+            'created_at': datetime.now(),
+            'log_posterior': self.item_bank.log_prior.copy(),
+            'administered': [],
+            'questions': [],
+            'answers': [],
+            'responses': [],
+            'theta': 0.0,
+            'standard_error': 1.0
+        }
+
+    def next_question(self, session: Dict) -> Optional[Dict]:
+        """Sélectionne la question la plus informative au niveau de capacité estimé"""
+        bank = self.item_bank
+        if len(session['administered']) >= len(bank):
+            return None
+
+        grid_index = int(np.abs(bank.grid - session['theta']).argmin())
+        information = bank.information[grid_index].copy()
+        information[session['administered']] = -1
+
+        top_k = min(self.config.randomesque, len(bank) - len(session['administered']))
+        candidates = np.argpartition(information, -top_k)[-top_k:]
+        item = int(random.choice(candidates.tolist()))
+
+        question = self.quiz_manager.get_question(bank.question_ids[item])
+        session['administered'].append(item)
+        session['questions'].append(question)
+        session['answers'].append({})
+        return question
+
+    def record_answer(self, session: Dict, user_answer: Dict) -> bool:
+        """Enregistre la réponse à la dernière question et met à jour l'estimation (EAP)"""
+        question = session['questions'][-1]
+        item = session['administered'][-1]
+        session['answers'][-1] = user_answer
+
+        question_result = self.ecn_simulator.calculate_ecn_score([user_answer], [question])
+        correct = question_result['raw_score'] == 2
+        session['responses'].append([question['id'], int(correct)])
+
+        bank = self.item_bank
+        session['log_posterior'] = session['log_posterior'] + (bank.log_p[:, item] if correct else bank.log_q[:, item])
+        posterior = np.exp(session['log_posterior'] - session['log_posterior'].max())
+        posterior /= posterior.sum()
+        session['theta'] = float((posterior * bank.grid).sum())
+        session['standard_error'] = float(np.sqrt((posterior * (bank.grid - session['theta']) ** 2).sum()))
+        return correct
+
+    def is_finished(self, session: Dict) -> bool:
+        """Critère d'arrêt : précision atteinte, nombre maximal atteint ou banque épuisée"""
+        answered = len(session['responses'])
+        if answered >= self.config.max_questions or answered >= len(self.item_bank):
+            return True
+        return answered >= self.config.min_questions and session['standard_error'] < self.config.se_threshold
+
+    def finalize(self, session: Dict, time_taken: float) -> Dict:
+        """Calcule les résultats dans le format attendu par save_ecn_simulation"""
+        results = self.ecn_simulator.calculate_ecn_score(session['answers'], session['questions'])
+
+        # Pourcentage attendu sur l'ensemble de la banque au niveau de capacité estimé
+        expected = irt_probability(session['theta'], self.item_bank.discrimination, self.item_bank.difficulty)
+        percentage = float(expected.mean() * 100) if len(self.item_bank) else 0.0
+        results.update({
+            'percentage': percentage,
+            'passed': percentage >= self.ecn_simulator.config.passing_score,
+            'grade': self.ecn_simulator._calculate_grade(percentage),
+            'theta': session['theta'],
+            'standard_error': session['standard_error']
+        })
+
+        return {
+            'session': {
+                'id': session['id'],
+                'title': session['title'],
+                'mode': 'adaptive',
+                'total_questions': len(session['questions']),
+                'questions': session['questions']
+            },
+            'results': results,
+            'time_taken': time_taken,
+            'user_answers': session['answers']
+        }
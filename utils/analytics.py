@@ -1,8 +1,69 @@
-import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
+from datetime import date
+import numpy as np
+from config import AppConfig
 from database import DatabaseManager
-import streamlit as st
+from utils.quantile_sketch import specialty_sketch
+from utils.user_cache import user_cache
+
+
+def lttb(x, y, threshold: int):
+    """Sous-échantillonnage Largest-Triangle-Three-Buckets : conserve l'allure de la courbe
+    (pics et creux) avec au plus `threshold` points. Retourne les indices retenus."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)  # threshold - 2 seaux entre le premier et le dernier point
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    previous = 0
+    for k in range(threshold - 2):
+        start, end = edges[k], edges[k + 1]
+        # Moyenne du seau suivant (ou dernier point) comme troisième sommet du triangle
+        next_end = edges[k + 2] if k + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean() if next_end > end else x[-1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[-1]
+
+        areas = np.abs((x[previous] - avg_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (avg_y - y[previous]))
+        previous = start + int(areas.argmax())
+        selected[k + 1] = previous
+    return selected
+
+
+def speed_statistics(specialties, correct, latencies, bins: int):
+    """Vitesse de réponse, calculée sur des tableaux : temps médian (s) par spécialité et courbe
+    vitesse–précision (précision par classe de temps de réponse, classes de même effectif)"""
+    specialties = np.asarray(specialties)
+    correct = np.asarray(correct, dtype=float)
+    seconds = np.asarray(latencies, dtype=float) / 1000.0
+    if seconds.size == 0:
+        return {'median_by_specialty': {}, 'curve': []}
+
+    # Médiane par spécialité : tri par (spécialité, temps) puis élément central de chaque groupe
+    names, groups = np.unique(specialties, return_inverse=True)
+    order = np.lexsort((seconds, groups))
+    counts = np.bincount(groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    sorted_seconds = seconds[order]
+    medians = (sorted_seconds[starts + (counts - 1) // 2] + sorted_seconds[starts + counts // 2]) / 2
+
+    edges = np.unique(np.quantile(seconds, np.linspace(0, 1, bins + 1)))
+    classes = np.clip(np.searchsorted(edges, seconds, side='right') - 1, 0, max(len(edges) - 2, 0))
+    sizes = np.bincount(classes)
+    accuracy = np.bincount(classes, weights=correct) / np.maximum(sizes, 1)
+    centers = np.array([np.median(seconds[classes == k]) if sizes[k] else np.nan for k in range(len(sizes))])
+
+    return {
+        'median_by_specialty': dict(zip(names.tolist(), medians.round(1).tolist())),
+        'curve': [
+            {'seconds': float(center), 'accuracy': float(acc), 'responses': int(size)}
+            for center, acc, size in zip(centers, accuracy, sizes) if size
+        ]
+    }
 
 
 class Analytics:
@@ -10,64 +71,44 @@ class Analytics:
         self.db = DatabaseManager()
 
     def get_user_progress_data(self, username: str):
-        """Récupère les données de progression d'un utilisateur"""
-        conn = self.db.get_connection()
-        if not conn:
-            return None
+        """Récupère les données de progression d'un utilisateur (cache partagé avec DatabaseManager)"""
+        return self.db.get_user_progress_data(username)
 
-        try:
-            with conn.cursor() as cur:
-                # ✅ Scores par spécialité (préfixes ajoutés)
-                cur.execute("""
-                    SELECT s.specialty, 
-                           AVG(s.score::float) AS avg_score,
-                           COUNT(*) AS quiz_count,
-                           SUM(s.score) AS total_score,
-                           AVG(s.time_taken) AS avg_time
-                    FROM scores s 
-                    JOIN users u ON s.user_id = u.id 
-                    WHERE u.username = %s 
-                    GROUP BY s.specialty
-                    ORDER BY avg_score DESC
-                """, (username,))
-                specialty_data = cur.fetchall()
-
-                # ✅ Progression dans le temps (préfixes ajoutés)
-                cur.execute("""
-                    SELECT DATE(s.created_at) AS date,
-                           AVG(s.score::float) AS daily_avg,
-                           COUNT(*) AS daily_quizzes
-                    FROM scores s 
-                    JOIN users u ON s.user_id = u.id 
-                    WHERE u.username = %s 
-                    GROUP BY DATE(s.created_at)
-                    ORDER BY date
-                """, (username,))
-                timeline_data = cur.fetchall()
-
-                return {
-                    'by_specialty': specialty_data,
-                    'timeline': timeline_data
-                }
-
-        except Exception as e:
-            st.error(f"Erreur analytics: {e}")
-            return None
-        finally:
-            conn.close()
+    def get_specialty_percentiles(self, username: str):
+        """Position de la moyenne de l'utilisateur parmi tous les scores de chaque spécialité (sketches KLL)"""
+        data = self.get_user_progress_data(username)
+        if not data:
+            return {}
+        return {
+            row[0]: self.db.get_percentile(specialty_sketch(row[0]), row[1])
+            for row in data['by_specialty']
+        }
 
     def create_specialty_radar_chart(self, username: str):
-        """Crée un graphique radar des performances par spécialité"""
+        """Spécification Plotly du radar des performances par spécialité, mise en cache
+        jusqu'à la prochaine écriture de l'utilisateur"""
+        return user_cache.get(username, 'radar_figure', lambda: self._build_specialty_radar_chart(username))
+
+    def _build_specialty_radar_chart(self, username: str):
         data = self.get_user_progress_data(username)
         if not data or not data['by_specialty']:
             return None
 
+        import plotly.graph_objects as go  # Import différé : seule la page Profil en a besoin
+
         specialties = [row[0] for row in data['by_specialty']]
         scores = [row[1] for row in data['by_specialty']]
+        percentiles = self.get_specialty_percentiles(username)
+        labels = [
+            f"Top {100 - percentiles[s]:.0f}%" if percentiles.get(s) is not None else "Percentile indisponible"
+            for s in specialties
+        ]
 
         fig = go.Figure(data=go.Scatterpolar(
             r=scores + [scores[0]],  # Fermer le cercle
             theta=specialties + [specialties[0]],
+            customdata=labels + [labels[0]],
+            hovertemplate="%{theta}<br>Score moyen: %{r:.1f}<br>%{customdata}<extra></extra>",
             fill='toself',
             name='Score moyen'
         ))
@@ -82,23 +123,71 @@ class Analytics:
             title="Performances par spécialité"
         )
 
-        return fig
+        return fig.to_dict()
 
     def create_progress_timeline(self, username: str):
-        """Crée un graphique de progression temporelle"""
+        """Spécification Plotly de la progression temporelle, mise en cache jusqu'à la prochaine
+        écriture de l'utilisateur et sous-échantillonnée (LTTB) pour les longs historiques"""
+        return user_cache.get(username, 'timeline_figure', lambda: self._build_progress_timeline(username))
+
+    def _build_progress_timeline(self, username: str):
         data = self.get_user_progress_data(username)
         if not data or not data['timeline']:
             return None
 
+        import plotly.graph_objects as go
+
         dates = [row[0] for row in data['timeline']]
         scores = [row[1] for row in data['timeline']]
 
-        fig = px.line(
-            x=dates, y=scores,
+        keep = lttb([d.toordinal() if isinstance(d, date) else d for d in dates], scores, AppConfig().timeline_max_points)
+        dates = [dates[i] for i in keep]
+        scores = [scores[i] for i in keep]
+
+        fig = go.Figure(go.Scatter(x=dates, y=scores, mode='lines+markers'))
+        fig.update_layout(
             title="Progression des scores dans le temps",
-            labels={'x': 'Date', 'y': 'Score moyen'}
+            xaxis_title="Date",
+            yaxis_title="Score moyen"
         )
 
-        fig.update_traces(mode='lines+markers')
+        return fig.to_dict()
+
+    def get_speed_statistics(self, username: str):
+        """Temps médian par spécialité et courbe vitesse–précision à partir des réponses chronométrées"""
+        def build():
+            config = AppConfig()
+            rows = self.db.get_user_response_times(username, config.speed_responses)
+            if not rows:
+                return None
+            question_ids, correct, latencies = zip(*rows)
+            specialties = [question_id.split(':', 1)[0] for question_id in question_ids]
+            return speed_statistics(specialties, correct, latencies, config.speed_bins)
+        return user_cache.get(username, 'speed_statistics', build)
+
+    def create_speed_accuracy_chart(self, username: str):
+        """Spécification Plotly de la courbe vitesse–précision, mise en cache comme les autres graphiques"""
+        return user_cache.get(username, 'speed_figure', lambda: self._build_speed_accuracy_chart(username))
+
+    def _build_speed_accuracy_chart(self, username: str):
+        stats = self.get_speed_statistics(username)
+        if not stats or len(stats['curve']) < 2:
+            return None
+
+        import plotly.graph_objects as go
 
-        return fig
+        curve = stats['curve']
+        fig = go.Figure(go.Scatter(
+            x=[point['seconds'] for point in curve],
+            y=[point['accuracy'] * 100 for point in curve],
+            customdata=[point['responses'] for point in curve],
+            hovertemplate="%{x:.1f} s<br>Précision: %{y:.0f}%<br>%{customdata} réponses<extra></extra>",
+            mode='lines+markers'
+        ))
+        fig.update_layout(
+            title="Précision selon le temps de réponse",
+            xaxis_title="Temps de réponse médian (s)",
+            yaxis_title="Précision (%)",
+            yaxis=dict(range=[0, 100])
+        )
+        return fig.to_dict()
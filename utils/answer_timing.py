@@ -0,0 +1,87 @@
+import time
+from typing import List, Optional, Tuple
+import numpy as np
+
+# Chronologie des réponses d'une session : (indice de question, instant en ms depuis le début).
+# Stockée sur la ligne de la session sous forme de deux tableaux d'entiers encodés en deltas
+# (zigzag + varint) : les écarts entre réponses successives tiennent sur 1 à 3 octets.
+
+
+def encode_deltas(values) -> bytes:
+    """Encode une suite d'entiers par différences successives (zigzag + varint LEB128)"""
+    values = np.asarray(values, dtype=np.int64)
+    if values.size == 0:
+        return b""
+    deltas = np.diff(values, prepend=0)
+    zigzag = ((deltas << 1) ^ (deltas >> 63)).astype(np.uint64)
+
+    # Nombre d'octets par valeur (7 bits utiles par octet)
+    sizes = np.ones(zigzag.size, dtype=np.int64)
+    for shift in range(7, 64, 7):
+        sizes += zigzag >= (np.uint64(1) << np.uint64(shift))
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+    out = np.zeros(int(sizes.sum()), dtype=np.uint8)
+    for j in range(int(sizes.max())):
+        present = sizes > j
+        chunk = (zigzag[present] >> np.uint64(7 * j)) & np.uint64(0x7F)
+        more = (sizes[present] > j + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[present] + j] = (chunk | more).astype(np.uint8)
+    return out.tobytes()
+
+
+def decode_deltas(data: Optional[bytes]) -> np.ndarray:
+    """Inverse d'encode_deltas"""
+    raw = np.frombuffer(bytes(data or b""), dtype=np.uint8)
+    if raw.size == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    ends = raw < 0x80
+    value_index = np.concatenate(([0], np.cumsum(ends)[:-1]))
+    value_starts = np.flatnonzero(np.concatenate(([True], ends[:-1])))
+    shifts = (7 * (np.arange(raw.size) - value_starts[value_index])).astype(np.uint64)
+
+    zigzag = np.zeros(int(ends.sum()), dtype=np.uint64)
+    np.add.at(zigzag, value_index, (raw & 0x7F).astype(np.uint64) << shifts)
+    deltas = (zigzag >> np.uint64(1)).astype(np.int64) ^ -(zigzag & np.uint64(1)).astype(np.int64)
+    return np.cumsum(deltas)
+
+
+class AnswerClock:
+    """Temps passé sur chaque question, tenu en mémoire pendant la session (aucune écriture
+    en base par réponse) et enregistré avec la session"""
+
+    def __init__(self, started_at: Optional[float] = None):
+        self.started_at = time.time() if started_at is None else started_at
+        self.order = []
+        self.offsets = []
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def lap(self, index: int, at: Optional[float] = None):
+        """Fin du temps passé sur la question index (réponse validée, question passée ou quittée)"""
+        offset = int(((time.time() if at is None else at) - self.started_at) * 1000)
+        self.order.append(index)
+        self.offsets.append(max(offset, self.offsets[-1] if self.offsets else 0))
+
+    def latencies(self, num_questions: int) -> List[Optional[int]]:
+        """Temps total (ms) par question de la session ; None pour les questions jamais quittées"""
+        totals = [None] * num_questions
+        previous = 0
+        for index, offset in zip(self.order, self.offsets):
+            if 0 <= index < num_questions:
+                totals[index] = (totals[index] or 0) + offset - previous
+            previous = offset
+        return totals
+
+    def encode(self) -> Tuple[bytes, bytes]:
+        """(ordre des questions, instants) encodés pour les colonnes answer_order / answer_times"""
+        return encode_deltas(self.order), encode_deltas(self.offsets)
+
+    @classmethod
+    def decode(cls, answer_order: Optional[bytes], answer_times: Optional[bytes], started_at: float = 0.0) -> "AnswerClock":
+        clock = cls(started_at)
+        clock.order = decode_deltas(answer_order).tolist()
+        clock.offsets = decode_deltas(answer_times).tolist()
+        return clock
@@ -0,0 +1,131 @@
+import operator
+from typing import Dict, Iterable, List, Optional
+from config import BadgeSystem
+from utils.leaderboard_cache import ecn_podium
+from utils.statements import COUNTER_METRICS, execute
+
+OPERATORS = {">=": operator.ge, "<=": operator.le}
+
+# Métriques dérivées, calculées à la demande quand une règle qui en dépend est évaluée
+DERIVED_METRICS = {"ecn_rank": ("best_percentage",)}
+
+
+def rules_by_input() -> Dict[str, List[str]]:
+    """Index compteur -> badges dont la règle dépend de ce compteur"""
+    index = {}
+    for badge_id, info in BadgeSystem.BADGES.items():
+        for metric in DERIVED_METRICS.get(info['metric'], (info['metric'],)):
+            index.setdefault(metric, []).append(badge_id)
+    return index
+
+
+def rule_satisfied(info: Dict, value) -> bool:
+    if value is None:
+        return False
+    return OPERATORS[info.get('operator', '>=')](value, info['threshold'])
+
+
+def ecn_rank(cur, user_id: int, limit: int) -> Optional[int]:
+    """Rang ECN de l'utilisateur s'il figure parmi les `limit` meilleurs scores, None sinon"""
+    ranking = ecn_podium(cur, limit)
+    return ranking.index(user_id) + 1 if user_id in ranking else None
+
+
+def award_badges(cur, user_id: int, counters: Dict, changed: Iterable[str]) -> List[str]:
+    """Évalue uniquement les règles dont un compteur a changé et attribue les badges
+    dans la transaction du curseur. Retourne les noms des badges nouvellement obtenus."""
+    index = rules_by_input()
+    candidates = {badge_id for metric in changed for badge_id in index.get(metric, [])}
+
+    satisfied = []
+    for badge_id in candidates:
+        info = BadgeSystem.BADGES[badge_id]
+        if info['metric'] == "ecn_rank":
+            value = ecn_rank(cur, user_id, info['threshold'])
+        else:
+            value = counters.get(info['metric'])
+        if rule_satisfied(info, value):
+            satisfied.append(badge_id)
+
+    new_badges = []
+    for badge_id in satisfied:
+        execute(cur, 'badge_insert', (user_id, badge_id))
+        if cur.fetchone():
+            new_badges.append(BadgeSystem.BADGES[badge_id]['name'])
+    return new_badges
+
+
+def _insert_earned(cur, badge_ids: Iterable[str], user_filter: str, params: Dict) -> List[tuple]:
+    """Insère en une requête ensembliste les badges dont la règle est satisfaite par les
+    utilisateurs sélectionnés par user_filter. Retourne les couples (user_id, badge_type) ajoutés."""
+    earned, params = [], dict(params)
+    for badge_id in badge_ids:
+        info = BadgeSystem.BADGES[badge_id]
+        params[f"{badge_id}_threshold"] = info['threshold']
+        if info['metric'] == "ecn_rank":
+            earned.append(f"""
+                SELECT user_id, '{badge_id}' AS badge_type FROM (
+                    SELECT user_id FROM ecn_best_scores
+                    ORDER BY best_percentage DESC, achieved_at
+                    LIMIT %({badge_id}_threshold)s
+                ) ranking WHERE {user_filter}""")
+        else:
+            sql_operator = info.get('operator', '>=')
+            earned.append(f"""
+                SELECT user_id, '{badge_id}' AS badge_type FROM user_counters
+                WHERE {user_filter} AND {info['metric']} {sql_operator} %({badge_id}_threshold)s""")
+    if not earned:
+        return []
+
+    cur.execute(f"""
+        INSERT INTO badges (user_id, badge_type)
+        {" UNION ALL ".join(earned)}
+        ON CONFLICT (user_id, badge_type) DO NOTHING
+        RETURNING user_id, badge_type
+    """, params)
+    return cur.fetchall()
+
+
+def award_badges_batch(cur, user_ids: List[int], changed: Iterable[str]) -> Dict[int, List[str]]:
+    """Version ensembliste d'award_badges pour un lot d'utilisateurs (une seule requête).
+    Retourne les noms des badges nouvellement obtenus par identifiant d'utilisateur."""
+    index = rules_by_input()
+    candidates = sorted({badge_id for metric in changed for badge_id in index.get(metric, [])})
+    if not user_ids or not candidates:
+        return {}
+
+    awarded = {}
+    for user_id, badge_type in _insert_earned(cur, candidates, "user_id = ANY(%(user_ids)s)", {'user_ids': list(user_ids)}):
+        awarded.setdefault(user_id, []).append(BadgeSystem.BADGES[badge_type]['name'])
+    return awarded
+
+
+def backfill_badges(cur, first_user_id: int, last_user_id: int) -> Dict[str, int]:
+    """Évalue toutes les règles pour les utilisateurs d'une tranche d'identifiants.
+    Retourne le nombre de badges ajoutés par type."""
+    rows = _insert_earned(
+        cur, BadgeSystem.BADGES, "user_id BETWEEN %(first)s AND %(last)s",
+        {'first': first_user_id, 'last': last_user_id}
+    )
+    added = {}
+    for _, badge_type in rows:
+        added[badge_type] = added.get(badge_type, 0) + 1
+    return added
+
+
+def fast_correct_count(rows: Iterable[tuple]) -> int:
+    """Réponses exactes et chronométrées sous BadgeSystem.FAST_ANSWER_MS parmi des lignes
+    (user_id, question_id, chosen_mask, correct, latency_ms) de question_responses"""
+    return sum(1 for row in rows if row[3] and row[4] is not None and row[4] < BadgeSystem.FAST_ANSWER_MS)
+
+
+def update_counters(cur, user_id: int, **increments) -> Dict:
+    """Incrémente les compteurs de l'utilisateur (best_percentage : maximum) et retourne leurs valeurs"""
+    unknown = set(increments) - set(COUNTER_METRICS)
+    if unknown:
+        raise ValueError(f"Compteurs inconnus: {unknown}")
+
+    # Une seule requête préparée pour toutes les combinaisons : compteurs absents à 0, best_percentage à NULL
+    values = [increments.get(name, None if name == 'best_percentage' else 0) for name in COUNTER_METRICS]
+    execute(cur, 'counters_upsert', [user_id] + values)
+    return dict(zip(COUNTER_METRICS, cur.fetchone()))
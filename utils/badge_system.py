@@ -1,6 +1,16 @@
 from config import BadgeSystem
 from database import DatabaseManager
 from typing import Dict
+from utils.badge_rules import COUNTER_METRICS, award_badges
+from utils.statements import execute
+from utils.user_cache import user_cache
+
+
+def badge_names(badge_ids) -> list:
+    """Identifiants de badges → noms affichés (identifiants inconnus ignorés)"""
+    badges = BadgeSystem().BADGES
+    return [badges[badge_id]['name'] for badge_id in badge_ids if badge_id in badges]
+
 
 class BadgeManager:
     def __init__(self):
@@ -8,49 +18,27 @@ class BadgeManager:
         self.db = DatabaseManager()
     
     def check_and_award_badges(self, username: str, new_score: int):
-        """Vérifie et attribue les badges basés sur le score total"""
+        """Réévalue les règles liées aux scores à partir des compteurs de l'utilisateur.
+        Les écritures attribuent déjà les badges ; cet appel ne fait que rattraper un éventuel retard."""
+        return self._evaluate_rules(username, ('total_score', 'quiz_count', 'competition_wins', 'fast_correct'))
+    
+    def _evaluate_rules(self, username: str, inputs):
         conn = self.db.get_connection()
         if conn is None:
             return []
         
         try:
             with conn.cursor() as cur:
-                # Récupérer le score total de l'utilisateur
-                cur.execute("""
-                    SELECT SUM(score) as total_score 
-                    FROM scores s 
-                    JOIN users u ON s.user_id = u.id 
-                    WHERE u.username = %s
-                """, (username,))
-                
-                result = cur.fetchone()
-                total_score = result[0] if result[0] else 0
+                execute(cur, 'user_counters', (username,))
                 
-                # Vérifier les badges existants
-                cur.execute("""
-                    SELECT badge_type FROM badges b
-                    JOIN users u ON b.user_id = u.id
-                    WHERE u.username = %s
-                """, (username,))
-                
-                existing_badges = [row[0] for row in cur.fetchall()]
-                
-                # Attribuer de nouveaux badges
-                new_badges = []
-                for badge_id, badge_info in self.badge_system.BADGES.items():
-                    if badge_id not in existing_badges and total_score >= badge_info['threshold']:
-                        # Récupérer l'ID utilisateur
-                        cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-                        user_id = cur.fetchone()[0]
-                        
-                        # Attribuer le badge
-                        cur.execute(
-                            "INSERT INTO badges (user_id, badge_type) VALUES (%s, %s)",
-                            (user_id, badge_id)
-                        )
-                        new_badges.append(badge_info['name'])
+                row = cur.fetchone()
+                if not row:
+                    return []
                 
+                new_badges = award_badges(cur, row[0], dict(zip(COUNTER_METRICS, row[1:])), inputs)
                 conn.commit()
+                if new_badges:
+                    user_cache.invalidate(username)
                 return new_badges
                 
         except Exception as e:
@@ -60,6 +48,10 @@ class BadgeManager:
             conn.close()
     
     def get_user_badges(self, username: str):
+        """Badges d'un utilisateur (mis en cache jusqu'à sa prochaine écriture)"""
+        return user_cache.get(username, 'badges', lambda: self._load_user_badges(username))
+    
+    def _load_user_badges(self, username: str):
         """Récupère les badges d'un utilisateur - VERSION CORRIGÉE"""
         conn = self.db.get_connection()
         if conn is None:
@@ -67,23 +59,9 @@ class BadgeManager:
         
         try:
             with conn.cursor() as cur:
-                # Récupérer les badges de l'utilisateur
-                cur.execute("""
-                    SELECT b.badge_type 
-                    FROM badges b
-                    JOIN users u ON b.user_id = u.id
-                    WHERE u.username = %s
-                """, (username,))
-                
-                user_badges = [row[0] for row in cur.fetchall()]
-                
-                # Convertir les IDs de badges en noms
-                badge_names = []
-                for badge_id in user_badges:
-                    if badge_id in self.badge_system.BADGES:
-                        badge_names.append(self.badge_system.BADGES[badge_id]['name'])
-                
-                return badge_names
+                # Récupérer les badges de l'utilisateur puis convertir les IDs en noms
+                execute(cur, 'user_badges', (username,))
+                return badge_names(row[0] for row in cur.fetchall())
                 
         except Exception as e:
             print(f"Erreur lors de la récupération des badges: {e}")
@@ -92,85 +70,5 @@ class BadgeManager:
             conn.close()
             
     def check_ecn_badges(self, username: str, simulation_data: Dict):
-        """Vérifie les badges spécifiques aux simulations ECN - VERSION CORRIGÉE"""
-        conn = self.db.get_connection()
-        if conn is None:
-            return []
-        
-        try:
-            with conn.cursor() as cur:
-                # Récupérer l'ID utilisateur
-                user_id = self.db.get_or_create_user(username)
-                if not user_id:
-                    return []
-                
-                # Récupérer les stats ECN de l'utilisateur
-                cur.execute("""
-                    SELECT COUNT(*) as total_simulations, 
-                        MAX(percentage) as best_score, 
-                        AVG(percentage) as avg_score
-                    FROM ecn_simulations 
-                    WHERE user_id = %s
-                """, (user_id,))
-                
-                stats_result = cur.fetchone()
-                if not stats_result:
-                    return []
-                
-                total_simulations, best_score, avg_score = stats_result
-                
-                # Vérifier les badges existants
-                cur.execute("SELECT badge_type FROM badges WHERE user_id = %s", (user_id,))
-                existing_badges = [row[0] for row in cur.fetchall()]
-                
-                # Badges à vérifier
-                badges_to_award = []
-                
-                # Badge simulateur (première simulation)
-                if total_simulations >= 1 and "simulateur" not in existing_badges:
-                    badges_to_award.append("simulateur")
-                
-                # Badge marathonien (5 simulations)
-                if total_simulations >= 5 and "marathonien" not in existing_badges:
-                    badges_to_award.append("marathonien")
-                
-                # Badge excellent (score ≥ 85%)
-                if best_score and best_score >= 85 and "excellent" not in existing_badges:
-                    badges_to_award.append("excellent")
-                
-                # Badge podium (dans le top 3) - vérification séparée
-                cur.execute("""
-                    SELECT u.username
-                    FROM (
-                        SELECT user_id, MAX(percentage) as best_score
-                        FROM ecn_simulations
-                        GROUP BY user_id
-                        ORDER BY best_score DESC
-                        LIMIT 3
-                    ) top3
-                    JOIN users u ON top3.user_id = u.id
-                    WHERE u.id = %s
-                """, (user_id,))
-                
-                if cur.fetchone() and "podium" not in existing_badges:
-                    badges_to_award.append("podium")
-                
-                # Attribuer les nouveaux badges
-                new_badges = []
-                for badge_id in badges_to_award:
-                    cur.execute(
-                        "INSERT INTO badges (user_id, badge_type) VALUES (%s, %s)",
-                        (user_id, badge_id)
-                    )
-                    new_badges.append(self.badge_system.BADGES[badge_id]['name'])
-                
-                conn.commit()
-                return new_badges
-                
-        except Exception as e:
-            print(f"❌ Erreur badges ECN: {e}")
-            import traceback
-            print(f"🔍 Détails: {traceback.format_exc()}")
-            return []
-        finally:
-            conn.close()
\ No newline at end of file
+        """Réévalue les règles liées aux simulations ECN à partir des compteurs de l'utilisateur"""
+        return self._evaluate_rules(username, ('simulation_count', 'best_percentage'))
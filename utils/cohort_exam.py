@@ -0,0 +1,260 @@
+import json
+import secrets
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+from psycopg2.extras import execute_values
+from config import CohortConfig
+from utils.badge_rules import award_badges_batch
+from utils.item_analysis import correct_mask, record_responses
+from utils.leaderboard_cache import ECN_LEADERBOARD, leaderboard_cache, record_ecn_best_batch
+from utils.spaced_repetition import update_review_states
+from utils.quantile_sketch import ecn_sketch, sketch_store
+from utils.user_cache import user_cache
+
+
+class CohortExam:
+    """Examen blanc partagé par une cohorte : copies corrigées et enregistrées par lots"""
+
+    # Examens ouverts dans ce processus, partagés par toutes les sessions Streamlit
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, db, ecn_simulator, session: Dict, config: Optional[CohortConfig] = None):
+        self.db = db
+        self.simulator = ecn_simulator
+        self.session = session
+        self.exam_id = session['id']
+        self.config = config or CohortConfig()
+        self._pending = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    @classmethod
+    def create(cls, db, ecn_simulator, title: str = "Examen blanc ECN", config: Optional[CohortConfig] = None):
+        """Génère une session et enregistre sa définition pour toute la cohorte"""
+        session = ecn_simulator.generate_simulation_session()
+        session.update({'id': secrets.token_hex(3).upper(), 'title': title, 'mode': 'cohort'})
+
+        conn = db.get_connection()
+        if conn is None:
+            return None
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "INSERT INTO cohort_exams (id, title, question_ids, duration) VALUES (%s, %s, %s, %s)",
+                    (session['id'], title, json.dumps([q['id'] for q in session['questions']]), session['duration'])
+                )
+                conn.commit()
+
+            exam = cls(db, ecn_simulator, session, config)
+            with cls._registry_lock:
+                cls._registry[exam.exam_id] = exam
+            return exam
+
+        except Exception as e:
+            print(f"❌ Erreur création examen de cohorte: {e}")
+            return None
+        finally:
+            conn.close()
+
+    @classmethod
+    def load(cls, db, ecn_simulator, exam_id: str, config: Optional[CohortConfig] = None):
+        """Recharge la définition partagée d'un examen de cohorte"""
+        conn = db.get_connection()
+        if conn is None:
+            return None
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT title, question_ids, duration, created_at FROM cohort_exams WHERE id = %s", (exam_id,))
+                row = cur.fetchone()
+                if not row:
+                    return None
+
+            title, question_ids, duration, created_at = row
+            quiz_manager = ecn_simulator.quiz_manager
+            questions = [q for q in (quiz_manager.get_question(qid) for qid in question_ids) if q]
+            session = {
+                'id': exam_id,
+                'title': title,
+                'mode': 'cohort',
+                'duration': duration,
+                'total_questions': len(questions),
+                'questions': questions,
+                'created_at': created_at,
+                'sections': ecn_simulator._create_sections(questions),
+                'breaks': [1200, 2400]
+            }
+            return cls(db, ecn_simulator, session, config)
+
+        except Exception as e:
+            print(f"❌ Erreur chargement examen de cohorte: {e}")
+            return None
+        finally:
+            conn.close()
+
+    @classmethod
+    def get(cls, db, ecn_simulator, exam_id: str):
+        """Retourne l'examen ouvert dans ce processus, en le chargeant si nécessaire"""
+        exam_id = exam_id.strip().upper()
+        with cls._registry_lock:
+            exam = cls._registry.get(exam_id)
+            if exam is None:
+                exam = cls.load(db, ecn_simulator, exam_id)
+                if exam is not None:
+                    cls._registry[exam_id] = exam
+            return exam
+
+    def submit(self, username: str, user_answers: List[Dict], time_taken: float) -> Future:
+        """Ajoute une copie au lot en attente. Le résultat est disponible via le Future retourné"""
+        future = Future()
+        batch = None
+
+        with self._lock:
+            self._pending.append((username, user_answers, int(time_taken), future))
+            if len(self._pending) >= self.config.batch_size:
+                batch = self._take_pending()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.config.max_wait, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if batch:
+            self._process(batch)
+        return future
+
+    def flush(self):
+        """Traite immédiatement toutes les copies en attente"""
+        with self._lock:
+            batch = self._take_pending()
+        if batch:
+            self._process(batch)
+
+    def _take_pending(self) -> List:
+        batch, self._pending = self._pending, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _process(self, batch: List):
+        """Corrige le lot en une passe vectorisée puis l'enregistre en une transaction"""
+        try:
+            scores = self.simulator.calculate_ecn_scores_batch([item[1] for item in batch], self.session['questions'])
+            awarded = self._persist(batch, scores)
+
+            for k, (username, _, time_taken, future) in enumerate(batch):
+                future.set_result({
+                    'session': self.session,
+                    'results': {
+                        'raw_score': float(scores['raw_scores'][k]),
+                        'max_score': scores['max_score'],
+                        'percentage': float(scores['percentages'][k]),
+                        'passed': bool(scores['passed'][k]),
+                        'grade': scores['grades'][k],
+                        'question_scores': scores['question_scores'][k].tolist()
+                    },
+                    'time_taken': time_taken,
+                    'cohort_exam_id': self.exam_id,
+                    'new_badges': awarded.get(username, [])
+                })
+
+        except Exception as e:
+            print(f"❌ Erreur traitement du lot de cohorte: {e}")
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _persist(self, batch: List, scores: Dict) -> Dict[str, List[str]]:
+        """Insertions groupées des utilisateurs, simulations, compteurs et badges. Retourne les badges par utilisateur"""
+        conn = self.db.get_connection()
+        if conn is None:
+            raise ConnectionError("Impossible de se connecter à la base de données")
+
+        try:
+            with conn.cursor() as cur:
+                usernames = sorted({item[0] for item in batch})
+                execute_values(
+                    cur,
+                    "INSERT INTO users (username, email, specialty) VALUES %s ON CONFLICT DO NOTHING",
+                    [(username, f"{username}@ecn-prep.fr", "general") for username in usernames]
+                )
+                cur.execute("SELECT username, id FROM users WHERE username = ANY(%s)", (usernames,))
+                user_ids = dict(cur.fetchall())
+
+                question_ids = [q['id'] for q in self.session['questions']]
+                correct_masks = [correct_mask(q) for q in self.session['questions']]
+                rows, response_rows = [], []
+                for k, (username, _, time_taken, _) in enumerate(batch):
+                    masks = scores['selected_masks'][k]
+                    answered = masks != 0
+                    response_rows.extend(
+                        (user_ids[username], question_id, int(mask), int(mask) == expected, None)
+                        for question_id, mask, expected, is_answered in zip(question_ids, masks, correct_masks, answered)
+                        if is_answered
+                    )
+                    responses = [
+                        [question_id, int(score == 2)]
+                        for question_id, score, is_answered in zip(question_ids, scores['question_scores'][k], answered)
+                        if is_answered
+                    ]
+                    results = {
+                        'raw_score': scores['raw_scores'][k],
+                        'max_score': scores['max_score'],
+                        'percentage': scores['percentages'][k],
+                        'passed': scores['passed'][k],
+                        'grade': scores['grades'][k]
+                    }
+                    simulation_data = self.db.build_simulation_data(self.session, results, responses)
+                    simulation_data['cohort_exam_id'] = self.exam_id
+                    rows.append((
+                        user_ids[username], self.exam_id,
+                        float(results['raw_score']), float(results['max_score']), float(results['percentage']),
+                        time_taken, bool(results['passed']), results['grade'], json.dumps(simulation_data)
+                    ))
+
+                execute_values(cur, """
+                    INSERT INTO ecn_simulations
+                    (user_id, simulation_id, score, max_score, percentage, duration, passed, grade, simulation_data)
+                    VALUES %s
+                """, rows, page_size=500)
+                record_responses(cur, response_rows)
+                update_review_states(cur, response_rows, dict(zip(question_ids, correct_masks)))
+
+                # Compteurs du lot agrégés par utilisateur puis règles de badges évaluées en une requête
+                execute_values(cur, """
+                    INSERT INTO user_counters (user_id, simulation_count, best_percentage)
+                    SELECT user_id, COUNT(*), MAX(percentage)
+                    FROM (VALUES %s) AS batch (user_id, percentage)
+                    GROUP BY user_id
+                    ON CONFLICT (user_id) DO UPDATE SET
+                        simulation_count = user_counters.simulation_count + EXCLUDED.simulation_count,
+                        best_percentage = GREATEST(user_counters.best_percentage, EXCLUDED.best_percentage),
+                        updated_at = CURRENT_TIMESTAMP
+                """, [(row[0], round(row[4], 2)) for row in rows], template="(%s::int, %s::numeric)", page_size=1000)
+
+                bests = {}
+                for row in rows:
+                    bests[row[0]] = max(bests.get(row[0], 0.0), round(row[4], 2))
+                improved = record_ecn_best_batch(cur, bests)
+
+                awarded = award_badges_batch(cur, sorted(set(user_ids.values())), ['simulation_count'])
+                for user_id, badges in award_badges_batch(cur, improved, ['best_percentage']).items():
+                    awarded.setdefault(user_id, []).extend(badges)
+                conn.commit()
+                for username in usernames:
+                    user_cache.invalidate(username)
+                leaderboard_cache.invalidate(ECN_LEADERBOARD)
+                for row in rows:
+                    sketch_store.add(self.db, ecn_sketch('cohort'), row[4])
+
+                names_by_id = {user_id: username for username, user_id in user_ids.items()}
+                return {names_by_id[user_id]: badges for user_id, badges in awarded.items()}
+
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
@@ -0,0 +1,324 @@
+import json
+import random
+import secrets
+import threading
+import time
+from typing import Dict, List, Optional
+import psycopg2
+from psycopg2.extras import execute_values
+from config import AppConfig, RoomConfig, WorkerConfig
+from utils.answer_timing import AnswerClock
+from utils.badge_rules import award_badges_batch, fast_correct_count
+from utils.deadlines import start_timed_run
+from utils.ecn_simulator import ECNSimulator
+from utils.item_analysis import correct_mask, record_responses
+from utils.leaderboard_cache import SCORES_LEADERBOARD, leaderboard_cache
+from utils.live_ranking import notify_scores
+from utils.quantile_sketch import sketch_store, specialty_sketch
+from utils.rollups import record_daily_scores
+from utils.spaced_repetition import update_review_states
+from utils.user_cache import user_cache
+
+SPECIALTY = "competition"
+
+
+def answer_points(question: Dict, user_answer) -> float:
+    """Barème du mode compétition : bonne réponse +2, partielle +0.5 par option juste, fausse -1"""
+    correct_answers = [opt['text'] for opt in question['options'] if opt.get('correct', False)]
+    user_selection = [user_answer] if isinstance(user_answer, str) else list(user_answer or [])
+
+    if question['type'] == 'single':
+        return 2 if user_selection and user_selection[0] in correct_answers else -1
+
+    correct_count = sum(1 for ans in user_selection if ans in correct_answers)
+    incorrect_count = sum(1 for ans in user_selection if ans not in correct_answers)
+    if correct_count == len(correct_answers) and incorrect_count == 0:
+        return 2
+    if correct_count > 0:
+        return max(0, (correct_count * 0.5) - (incorrect_count * 0.5))
+    return -1
+
+
+class CompetitionRoom:
+    """Salle de compétition synchronisée : mêmes questions (tirage déterminé par une graine),
+    même début et même échéance fixés par le serveur pour tous les joueurs.
+
+    Les réponses sont comptées dans un tableau de scores en mémoire (aucune écriture en
+    base par réponse) ; à l'échéance, tous les scores de la salle sont enregistrés en une
+    transaction. Une salle vit dans le processus qui l'a ouverte, et tous ses joueurs doivent
+    y être servis : competition_rooms.worker retient le worker propriétaire (préfixe d'URL
+    routé par nginx, WorkerConfig.worker_path). Un autre worker ne charge pas la salle,
+    locate() indique où renvoyer le joueur."""
+
+    # Salles ouvertes dans ce processus, partagées par toutes les sessions Streamlit
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, db, quiz_manager, room_id: str, seed: int, question_ids: List[str],
+                 starts_at: float, deadline: float, config: Optional[RoomConfig] = None):
+        self.db = db
+        self.room_id = room_id
+        self.seed = seed
+        self.questions = [q for q in (quiz_manager.get_question(qid) for qid in question_ids) if q]
+        self.starts_at = starts_at
+        self.deadline = deadline
+        self.config = config or RoomConfig()
+        self.results = None
+        self._players = {}
+        self._lock = threading.Lock()
+        self._run = start_timed_run(max(0.0, deadline - time.time()), lambda run, elapsed: self._close())
+
+    @staticmethod
+    def draw_questions(quiz_manager, seed: int, count: int) -> List[str]:
+        """Tirage reproductible : la même graine donne la même séquence de questions"""
+        return quiz_manager.sample_question_ids(count, weights=dict.fromkeys(quiz_manager.get_specialties(), 1),
+                                                rng=random.Random(seed))
+
+    @classmethod
+    def create(cls, db, quiz_manager, config: Optional[RoomConfig] = None):
+        """Ouvre une salle : début dans lobby_time secondes, fin competition_time secondes plus tard"""
+        config = config or RoomConfig()
+        room_id = secrets.token_hex(3).upper()
+        seed = secrets.randbits(63)
+        question_ids = cls.draw_questions(quiz_manager, seed, config.questions)
+        starts_at = time.time() + config.lobby_time
+        deadline = starts_at + AppConfig().competition_time
+
+        conn = db.get_connection()
+        if conn is None:
+            return None
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO competition_rooms (id, seed, question_ids, starts_at, deadline, worker)
+                    VALUES (%s, %s, %s, to_timestamp(%s), to_timestamp(%s), %s)
+                """, (room_id, seed, json.dumps(question_ids), starts_at, deadline, WorkerConfig().worker_path))
+                conn.commit()
+
+            room = cls(db, quiz_manager, room_id, seed, question_ids, starts_at, deadline, config)
+            with cls._registry_lock:
+                cls._registry[room_id] = room
+            return room
+
+        except Exception as e:
+            print(f"❌ Erreur création de la salle: {e}")
+            return None
+        finally:
+            conn.close()
+
+    @classmethod
+    def load(cls, db, quiz_manager, room_id: str, config: Optional[RoomConfig] = None):
+        """Recharge la définition d'une salle encore ouverte de ce worker (après un redémarrage)"""
+        conn = db.get_connection()
+        if conn is None:
+            return None
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT seed, question_ids, EXTRACT(EPOCH FROM starts_at), EXTRACT(EPOCH FROM deadline)
+                    FROM competition_rooms
+                    WHERE id = %s AND deadline > CURRENT_TIMESTAMP AND worker = %s
+                """, (room_id, WorkerConfig().worker_path))
+                row = cur.fetchone()
+                if not row:
+                    return None
+
+            seed, question_ids, starts_at, deadline = row
+            return cls(db, quiz_manager, room_id, seed, question_ids, float(starts_at), float(deadline), config)
+
+        except Exception as e:
+            print(f"❌ Erreur chargement de la salle: {e}")
+            return None
+        finally:
+            conn.close()
+
+    @staticmethod
+    def locate(db, room_id: str) -> Optional[str]:
+        """Worker propriétaire d'une salle encore ouverte (None si inconnue ou terminée)"""
+        conn = db.get_connection()
+        if conn is None:
+            return None
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT worker FROM competition_rooms WHERE id = %s AND deadline > CURRENT_TIMESTAMP",
+                            (room_id.strip().upper(),))
+                row = cur.fetchone()
+                return row[0] if row else None
+
+        except Exception as e:
+            print(f"❌ Erreur recherche de la salle: {e}")
+            return None
+        finally:
+            conn.close()
+
+    @classmethod
+    def get(cls, db, quiz_manager, room_id: str):
+        """Retourne la salle ouverte dans ce processus, en la chargeant si nécessaire"""
+        room_id = room_id.strip().upper()
+        with cls._registry_lock:
+            # Les salles clôturées et enregistrées depuis plus d'une heure quittent le registre
+            now = time.time()
+            for code in [code for code, room in cls._registry.items()
+                         if room.results is not None and now - room.deadline > 3600]:
+                del cls._registry[code]
+
+            room = cls._registry.get(room_id)
+            if room is None:
+                room = cls.load(db, quiz_manager, room_id)
+                if room is not None:
+                    cls._registry[room_id] = room
+            return room
+
+    @property
+    def closed(self) -> bool:
+        return self._run.finished
+
+    def phase(self) -> str:
+        """« attente » avant le début commun, « en cours », puis « terminée »"""
+        if self._run.finished:
+            return "terminée"
+        return "attente" if time.time() < self.starts_at else "en cours"
+
+    def seconds_to_start(self) -> float:
+        return max(0.0, self.starts_at - time.time())
+
+    def remaining(self) -> float:
+        return self._run.remaining()
+
+    def join(self, username: str) -> bool:
+        """Inscrit le joueur (possible jusqu'à l'échéance, dans la limite de max_players)"""
+        def register(state):
+            with self._lock:
+                if username not in self._players and len(self._players) < self.config.max_players:
+                    self._players[username] = {'score': 0.0, 'answers': {}, 'clock': AnswerClock(self.starts_at)}
+        return self._run.apply(register) and username in self._players
+
+    def answer(self, username: str, index: int, user_answer) -> Optional[float]:
+        """Compte une réponse (une seule par question) ; None si refusée (hors délai, déjà répondue)"""
+        if time.time() < self.starts_at or not 0 <= index < len(self.questions):
+            return None
+        points = answer_points(self.questions[index], user_answer)
+        recorded = []
+
+        def record(state):
+            with self._lock:
+                player = self._players.get(username)
+                if player is None or index in player['answers']:
+                    return
+                player['answers'][index] = user_answer
+                player['clock'].lap(index)
+                player['score'] = max(0.0, player['score'] + points)
+                recorded.append(points)
+
+        self._run.apply(record)
+        return recorded[0] if recorded else None
+
+    def player(self, username: str) -> Optional[Dict]:
+        with self._lock:
+            player = self._players.get(username)
+            return {'score': player['score'], 'answered': set(player['answers'])} if player else None
+
+    def scoreboard(self, limit: Optional[int] = None) -> List[Dict]:
+        """Classement de la salle : score décroissant puis nombre de réponses"""
+        with self._lock:
+            rows = [
+                {'username': username, 'score': player['score'], 'answered': len(player['answers'])}
+                for username, player in self._players.items()
+            ]
+        rows.sort(key=lambda row: (-row['score'], -row['answered'], row['username']))
+        return rows[:limit] if limit else rows
+
+    def _close(self):
+        """Échéance : fige le tableau et l'enregistre en une transaction"""
+        with self._lock:
+            players = {username: dict(player) for username, player in self._players.items()}
+        board = self.scoreboard()
+        if players:
+            self._persist(players, board)
+        self.results = board
+        return board
+
+    def _persist(self, players: Dict, board: List[Dict]):
+        conn = self.db.get_connection()
+        if conn is None:
+            print(f"❌ Salle {self.room_id} : scores non enregistrés (base inaccessible)")
+            return
+
+        duration = int(self.deadline - self.starts_at)
+        best = board[0]['score'] if board else 0
+        winners = {row['username'] for row in board if best > 0 and row['score'] == best}
+        try:
+            with conn.cursor() as cur:
+                usernames = sorted(players)
+                execute_values(
+                    cur,
+                    "INSERT INTO users (username, email, specialty) VALUES %s ON CONFLICT DO NOTHING",
+                    [(username, f"{username}@ecn.fr", SPECIALTY) for username in usernames]
+                )
+                cur.execute("SELECT username, id FROM users WHERE username = ANY(%s)", (usernames,))
+                user_ids = dict(cur.fetchall())
+
+                score_rows = [
+                    (user_ids[username], SPECIALTY, int(round(player['score'])), len(player['answers']), duration,
+                     *(psycopg2.Binary(encoded) for encoded in player['clock'].encode()))
+                    for username, player in players.items()
+                ]
+                inserted = execute_values(cur, """
+                    INSERT INTO scores (user_id, specialty, score, total_questions, time_taken, answer_order, answer_times)
+                    VALUES %s
+                    RETURNING id, user_id, score
+                """, score_rows, page_size=1000, fetch=True)
+                record_daily_scores(cur, [(row[0], row[1], row[2], row[4]) for row in score_rows])
+
+                response_rows, fast_correct = [], {}
+                for username, player in players.items():
+                    latencies = player['clock'].latencies(len(self.questions))
+                    player_rows = []
+                    for index, user_answer in player['answers'].items():
+                        question = self.questions[index]
+                        mask = ECNSimulator.selection_mask(question, user_answer)
+                        if mask:
+                            player_rows.append((user_ids[username], question['id'], mask,
+                                                mask == correct_mask(question), latencies[index]))
+                    response_rows.extend(player_rows)
+                    fast_correct[username] = fast_correct_count(player_rows)
+                record_responses(cur, response_rows)
+                update_review_states(cur, response_rows, {q['id']: correct_mask(q) for q in self.questions})
+
+                # Compteurs du lot puis règles de badges évaluées en une requête
+                execute_values(cur, """
+                    INSERT INTO user_counters (user_id, total_score, quiz_count, competition_wins, fast_correct)
+                    VALUES %s
+                    ON CONFLICT (user_id) DO UPDATE SET
+                        total_score = user_counters.total_score + EXCLUDED.total_score,
+                        quiz_count = user_counters.quiz_count + EXCLUDED.quiz_count,
+                        competition_wins = user_counters.competition_wins + EXCLUDED.competition_wins,
+                        fast_correct = user_counters.fast_correct + EXCLUDED.fast_correct,
+                        updated_at = CURRENT_TIMESTAMP
+                """, [(user_ids[username], int(round(player['score'])), 1, int(username in winners),
+                       fast_correct[username])
+                      for username, player in players.items()], page_size=1000)
+                award_badges_batch(cur, sorted(user_ids.values()), ['total_score', 'quiz_count', 'fast_correct'])
+                award_badges_batch(cur, sorted(user_ids[username] for username in winners), ['competition_wins'])
+
+                names_by_id = {user_id: username for username, user_id in user_ids.items()}
+                notify_scores(cur, [(score_id, user_id, names_by_id[user_id], SPECIALTY, score)
+                                    for score_id, user_id, score in inserted])
+                conn.commit()
+
+            for username in usernames:
+                user_cache.invalidate(username)
+            leaderboard_cache.invalidate(SCORES_LEADERBOARD, None, SPECIALTY)
+            for row in score_rows:
+                sketch_store.add(self.db, specialty_sketch(SPECIALTY), row[2])
+            print(f"✅ Salle {self.room_id} : {len(score_rows)} scores enregistrés")
+
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Erreur enregistrement de la salle {self.room_id}: {e}")
+        finally:
+            conn.close()
+
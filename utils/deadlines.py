@@ -0,0 +1,103 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TimedRun:
+    """Épreuve chronométrée dont l'échéance est tenue par le serveur.
+
+    La clôture (correction, sauvegarde) est exécutée une seule fois, soit à la demande
+    de l'utilisateur, soit par le planificateur à l'échéance, même si la page n'est
+    plus affichée. Les réponses passent par apply() pour être refusées après la clôture."""
+
+    def __init__(self, duration: float, on_finish: Callable[["TimedRun", float], object]):
+        self.started_at = time.time()
+        self.deadline = self.started_at + duration
+        self.state = {}
+        self.finished = False
+        self.cancelled = False
+        self.reason = None
+        self.result = None
+        self._on_finish = on_finish
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.time())
+
+    def elapsed(self) -> float:
+        return min(time.time(), self.deadline) - self.started_at
+
+    def apply(self, update: Callable[[dict], object]) -> bool:
+        """Applique update(state) si l'épreuve est encore ouverte ; False si le temps est écoulé"""
+        with self._lock:
+            if self.finished or self.cancelled or time.time() >= self.deadline:
+                return False
+            update(self.state)
+            return True
+
+    def finish(self, reason: str = "submitted"):
+        """Clôture l'épreuve (idempotent) et retourne le résultat de on_finish"""
+        with self._lock:
+            if self.finished or self.cancelled:
+                return self.result
+            try:
+                self.result = self._on_finish(self, self.elapsed())
+            except Exception as e:
+                print(f"❌ Erreur clôture de l'épreuve: {e}")
+            self.finished, self.reason = True, reason
+            return self.result
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+
+
+class DeadlineScheduler:
+    """Thread unique par processus qui clôture les épreuves arrivées à échéance"""
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def schedule(self, run: TimedRun) -> TimedRun:
+        with self._condition:
+            heapq.heappush(self._heap, (run.deadline, next(self._counter), run))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="deadline-scheduler", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return run
+
+    def _next_due(self) -> Optional[TimedRun]:
+        with self._condition:
+            while True:
+                # Épreuves déjà closes ou abandonnées : rien à faire à l'échéance
+                while self._heap and (self._heap[0][2].finished or self._heap[0][2].cancelled):
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                wait = self._heap[0][0] - time.time()
+                if wait <= 0:
+                    return heapq.heappop(self._heap)[2]
+                self._condition.wait(wait)
+
+    def _loop(self):
+        while True:
+            self._next_due().finish("expired")
+
+    def pending(self) -> int:
+        with self._condition:
+            return sum(1 for _, _, run in self._heap if not run.finished and not run.cancelled)
+
+
+deadline_scheduler = DeadlineScheduler()
+
+
+def start_timed_run(duration: float, on_finish: Callable[[TimedRun, float], object]) -> TimedRun:
+    """Crée une épreuve et programme sa clôture automatique à l'échéance"""
+    return deadline_scheduler.schedule(TimedRun(duration, on_finish))
@@ -0,0 +1,29 @@
+"""Tirages signés de l'API (api.py) consommés par un seul enregistrement.
+
+Le jeton d'un tirage porte un identifiant aléatoire. L'enregistrement d'un score ou d'une
+simulation insère cet identifiant dans consumed_draws au début de sa propre transaction :
+la clé primaire rend la consommation atomique entre workers et entre requêtes simultanées
+(la seconde insertion attend le commit de la première puis ne renvoie rien). Un même tirage
+ne produit donc qu'un enregistrement ; les envois suivants lèvent DrawAlreadyUsed.
+
+Une ligne ne sert que tant que le jeton est valide (ApiConfig.draw_ttl) : au-delà, le jeton
+est refusé comme expiré et purge_consumed_draws peut supprimer la ligne.
+"""
+from utils.statements import execute
+
+
+class DrawAlreadyUsed(Exception):
+    """Tirage déjà consommé par un enregistrement précédent"""
+
+
+def consume_draw(cur, draw_id: str):
+    """Marque le tirage consommé dans la transaction en cours (annulé avec elle)"""
+    execute(cur, 'draw_consume', (draw_id,))
+    if cur.fetchone() is None:
+        raise DrawAlreadyUsed(draw_id)
+
+
+def purge_consumed_draws(cur, ttl: int) -> int:
+    """Supprime les tirages consommés depuis plus de ttl secondes (jetons expirés), renvoie leur nombre"""
+    execute(cur, 'draw_purge', (ttl,))
+    return cur.rowcount
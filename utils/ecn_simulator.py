@@ -2,9 +2,14 @@ import random
 import time
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+import numpy as np
 import streamlit as st
 from config import ECNConfig
 
+# Bit réservé aux réponses qui ne correspondent à aucune option (jamais correct)
+UNKNOWN_OPTION_BIT = 1 << 15
+POPCOUNT = np.array([bin(v).count("1") for v in range(1 << 16)], dtype=np.int8)
+
 class ECNSimulator:
     def __init__(self, quiz_manager):
         self.config = ECNConfig()
@@ -127,6 +132,66 @@ class ECNSimulator:
             'grade': self._calculate_grade(percentage)
         }
     
+    @staticmethod
+    def selection_mask(question: Dict, selected) -> int:
+        """Encode la sélection de l'utilisateur en masque de bits sur les options"""
+        if not selected:
+            return 0
+        if isinstance(selected, str):
+            selected = [selected]
+        
+        texts = [opt['text'] for opt in question['options']]
+        mask = 0
+        for answer in selected:
+            mask |= (1 << texts.index(answer)) if answer in texts else UNKNOWN_OPTION_BIT
+        return mask
+    
+    def calculate_ecn_scores_batch(self, answers_batch: List[List[Dict]], questions: List[Dict]) -> Dict:
+        """Calcule le score ECN de plusieurs copies en une passe vectorisée (même barème que calculate_ecn_score)"""
+        n_questions = len(questions)
+        correct_mask = np.zeros(n_questions, dtype=np.int64)
+        first_correct_mask = np.zeros(n_questions, dtype=np.int64)
+        is_single = np.zeros(n_questions, dtype=bool)
+        
+        for j, question in enumerate(questions):
+            correct_bits = [k for k, opt in enumerate(question['options']) if opt.get('correct', False)]
+            correct_mask[j] = sum(1 << k for k in correct_bits)
+            first_correct_mask[j] = (1 << correct_bits[0]) if correct_bits else 0
+            is_single[j] = question['type'] == 'single'
+        
+        selected = np.zeros((len(answers_batch), n_questions), dtype=np.int64)
+        for s, user_answers in enumerate(answers_batch):
+            for j, user_answer in enumerate(user_answers[:n_questions]):
+                chosen = (user_answer or {}).get('selected')
+                if is_single[j] and isinstance(chosen, list):
+                    chosen = chosen[0] if chosen else ''
+                selected[s, j] = self.selection_mask(questions[j], chosen)
+        
+        # Barème question simple : +2 si bonne réponse, -0.5 si mauvaise, 0 si non répondu
+        single_scores = np.where(selected == 0, 0.0, np.where(selected == first_correct_mask, 2.0, -0.5))
+        
+        # Barème question multiple : 2 si parfait, sinon 0.5 par bonne réponse moins 0.5 par mauvaise
+        correct_count = POPCOUNT[selected & correct_mask]
+        incorrect_count = POPCOUNT[selected & ~correct_mask & 0xFFFF]
+        perfect = (correct_count == POPCOUNT[correct_mask]) & (incorrect_count == 0)
+        partial = np.maximum(0.0, correct_count * 0.5 - incorrect_count * 0.5)
+        multiple_scores = np.where(perfect, 2.0, np.where(correct_count > 0, partial, 0.0))
+        
+        question_scores = np.where(is_single, single_scores, multiple_scores)
+        raw_scores = question_scores.sum(axis=1)
+        max_score = n_questions * 2
+        percentages = raw_scores / max_score * 100 if max_score > 0 else np.zeros(len(answers_batch))
+        
+        return {
+            'question_scores': question_scores,
+            'selected_masks': selected,
+            'raw_scores': raw_scores,
+            'max_score': max_score,
+            'percentages': percentages,
+            'passed': percentages >= self.config.passing_score,
+            'grades': [self._calculate_grade(p) for p in percentages]
+        }
+    
     def _calculate_grade(self, percentage: float) -> str:
         """Calcule la mention selon le score"""
         if percentage >= 90:
@@ -0,0 +1,168 @@
+import io
+import json
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from utils.ecn_simulator import ECNSimulator
+
+MAX_OPTIONS = 16  # Bits 0-14 : options de la question, bit 15 : réponse inconnue
+
+
+def correct_mask(question: Dict) -> int:
+    return sum(1 << k for k, opt in enumerate(question['options']) if opt.get('correct', False))
+
+
+def response_rows(user_id: int, questions: List[Dict], user_answers: List[Dict],
+                  latencies: Optional[List[Optional[int]]] = None) -> List[tuple]:
+    """Lignes (user_id, question_id, chosen_mask, correct, latency_ms) des questions répondues"""
+    rows = []
+    for k, question in enumerate(questions):
+        if 'id' not in question or k >= len(user_answers):
+            continue
+        mask = ECNSimulator.selection_mask(question, (user_answers[k] or {}).get('selected'))
+        if mask:
+            latency = latencies[k] if latencies and k < len(latencies) else None
+            rows.append((user_id, question['id'], mask, mask == correct_mask(question), latency))
+    return rows
+
+
+def record_responses(cur, rows: List[tuple]):
+    """Insère un lot de réponses en une requête, dans la transaction du curseur"""
+    if not rows:
+        return
+    from psycopg2.extras import execute_values
+    execute_values(cur, """
+        INSERT INTO question_responses (user_id, question_id, chosen_mask, correct, latency_ms)
+        VALUES %s
+    """, rows, page_size=1000)
+
+
+class ItemAnalyzer:
+    """Analyse classique des items : difficulté (p-value), discrimination (point-bisériale
+    corrigée) et fréquences de choix de chaque option, calculées en une passe vectorisée"""
+
+    def __init__(self, db, min_responses: int = 5):
+        self.db = db
+        self.min_responses = min_responses
+
+    def load_responses(self):
+        """Charge (user_id, question_id, chosen_mask, correct) via COPY, bien plus rapide qu'un fetch ligne à ligne"""
+        conn = self.db.get_connection()
+        if conn is None:
+            return None
+
+        try:
+            buffer = io.StringIO()
+            with conn.cursor() as cur:
+                cur.copy_expert("""
+                    COPY (SELECT user_id, question_id, chosen_mask, correct::int FROM question_responses)
+                    TO STDOUT WITH (FORMAT csv)
+                """, buffer)
+            buffer.seek(0)
+            return pd.read_csv(
+                buffer, header=None, names=['user_id', 'question_id', 'chosen_mask', 'correct'],
+                dtype={'user_id': np.int64, 'question_id': str, 'chosen_mask': np.int64, 'correct': np.int8}
+            )
+
+        except Exception as e:
+            print(f"❌ Erreur chargement des réponses: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def analyze(self, user_ids, question_ids, chosen_masks, correct) -> Dict:
+        """Statistiques par question à partir de tableaux de réponses alignés"""
+        if len(question_ids) == 0:
+            return {}
+
+        # Codage par hachage (plus rapide qu'un tri des identifiants textuels)
+        person, _ = pd.factorize(np.asarray(user_ids))
+        item, items = pd.factorize(np.asarray(question_ids))
+        x = np.asarray(correct, dtype=np.float64)
+        masks = np.asarray(chosen_masks, dtype=np.int64)
+        n_items = len(items)
+
+        # Score « reste » de la personne : proportion de réussite hors question analysée
+        person_n = np.bincount(person)
+        person_sum = np.bincount(person, x)
+        rest_n = person_n[person] - 1
+        valid = rest_n > 0
+        y = np.where(valid, (person_sum[person] - x) / np.maximum(rest_n, 1), 0.0)
+
+        n = np.bincount(item, minlength=n_items).astype(np.float64)
+        sum_x = np.bincount(item, x, n_items)
+
+        # Corrélation de Pearson par item entre réussite et score reste (réponses valides uniquement)
+        w = valid.astype(np.float64)
+        nv = np.bincount(item, w, n_items)
+        sx = np.bincount(item, x * w, n_items)
+        sy = np.bincount(item, y * w, n_items)
+        sxy = np.bincount(item, x * y * w, n_items)
+        syy = np.bincount(item, y * y * w, n_items)
+        covariance = nv * sxy - sx * sy
+        variance = (nv * sx - sx ** 2) * (nv * syy - sy ** 2)  # x binaire : somme des x² = somme des x
+        with np.errstate(invalid='ignore', divide='ignore'):
+            point_biserial = np.where(variance > 0, covariance / np.sqrt(np.abs(variance)), np.nan)
+
+        # Fréquence de choix de chaque option (un bit par option)
+        option_counts = np.column_stack([
+            np.bincount(item, (masks >> bit) & 1, n_items) for bit in range(MAX_OPTIONS)
+        ])
+        option_frequencies = option_counts / n[:, None]
+
+        statistics = {}
+        for k, question_id in enumerate(items):
+            if n[k] < self.min_responses:
+                continue
+            used = np.nonzero(option_counts[k])[0]
+            last_option = int(used.max()) + 1 if len(used) else 0
+            statistics[str(question_id)] = {
+                'n_responses': int(n[k]),
+                'p_value': float(sum_x[k] / n[k]),
+                'point_biserial': None if np.isnan(point_biserial[k]) else float(point_biserial[k]),
+                'option_frequencies': [round(float(f), 4) for f in option_frequencies[k, :last_option]]
+            }
+        return statistics
+
+    def save(self, statistics: Dict) -> bool:
+        """Enregistre les statistiques dans la table item_statistics"""
+        if not statistics:
+            return True
+
+        conn = self.db.get_connection()
+        if conn is None:
+            return False
+
+        try:
+            from psycopg2.extras import execute_values
+            with conn.cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO item_statistics (question_id, n_responses, p_value, point_biserial, option_frequencies)
+                    VALUES %s
+                    ON CONFLICT (question_id) DO UPDATE SET
+                        n_responses = EXCLUDED.n_responses,
+                        p_value = EXCLUDED.p_value,
+                        point_biserial = EXCLUDED.point_biserial,
+                        option_frequencies = EXCLUDED.option_frequencies,
+                        updated_at = CURRENT_TIMESTAMP
+                """, [
+                    (question_id, s['n_responses'], s['p_value'], s['point_biserial'], json.dumps(s['option_frequencies']))
+                    for question_id, s in statistics.items()
+                ], page_size=1000)
+                conn.commit()
+                return True
+
+        except Exception as e:
+            print(f"❌ Erreur sauvegarde de l'analyse des items: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def run(self) -> Dict:
+        """Charge les réponses, analyse et enregistre. Retourne les statistiques calculées"""
+        frame = self.load_responses()
+        if frame is None or frame.empty:
+            return {}
+        statistics = self.analyze(frame['user_id'].values, frame['question_id'].values,
+                                  frame['chosen_mask'].values, frame['correct'].values)
+        return statistics if self.save(statistics) else {}
@@ -0,0 +1,194 @@
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from config import CacheConfig
+from utils.statements import execute
+
+ECN_LEADERBOARD = "ecn"
+SCORES_LEADERBOARD = "scores"
+
+def bump_version(cur, name: str):
+    """Invalide les instantanés de classement de tous les processus"""
+    execute(cur, 'leaderboard_version_bump', (name,))
+
+
+def current_version(cur, name: str) -> int:
+    execute(cur, 'leaderboard_version', (name,))
+    row = cur.fetchone()
+    return row[0] if row else 0
+
+
+def record_ecn_best(cur, user_id: int, percentage: float) -> bool:
+    """Met à jour le meilleur score ECN de l'utilisateur uniquement s'il s'améliore.
+    Retourne True si le classement a changé."""
+    execute(cur, 'ecn_best', (user_id, percentage))
+    improved = cur.fetchone() is not None
+    if improved:
+        bump_version(cur, ECN_LEADERBOARD)
+    return improved
+
+
+def record_ecn_best_batch(cur, bests: Dict[int, float]) -> List[int]:
+    """Version ensembliste de record_ecn_best. Retourne les utilisateurs dont le meilleur score a progressé"""
+    if not bests:
+        return []
+    from psycopg2.extras import execute_values
+    improved = execute_values(cur, """
+        INSERT INTO ecn_best_scores (user_id, best_percentage) VALUES %s
+        ON CONFLICT (user_id) DO UPDATE SET
+            best_percentage = EXCLUDED.best_percentage,
+            achieved_at = CURRENT_TIMESTAMP
+        WHERE ecn_best_scores.best_percentage < EXCLUDED.best_percentage
+        RETURNING user_id
+    """, sorted(bests.items()), page_size=1000, fetch=True)
+    if improved:
+        bump_version(cur, ECN_LEADERBOARD)
+    return [row[0] for row in improved]
+
+
+def ecn_top(cur, limit: int) -> List[tuple]:
+    """Les `limit` meilleurs (user_id, username, best_percentage) par parcours de l'index ordonné"""
+    execute(cur, 'ecn_top', (limit,))
+    return cur.fetchall()
+
+
+class TopNSnapshot:
+    """Instantané en mémoire d'un classement top-N, reconstruit quand la version en base change"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.version = None
+        self.size = 0
+        self.rows = []
+        self._lock = threading.Lock()
+
+    def get(self, cur, limit: int, loader: Callable) -> List:
+        """Retourne les `limit` premières lignes ; loader(cur, limit) n'est appelé que si l'instantané est périmé"""
+        version = current_version(cur, self.name)
+        with self._lock:
+            if version == self.version and limit <= self.size:
+                return self.rows[:limit]
+
+        rows = loader(cur, limit)
+        with self._lock:
+            self.version, self.size, self.rows = version, limit, list(rows)
+        return rows
+
+    def invalidate(self):
+        with self._lock:
+            self.version = None
+
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_snapshot(name: str) -> TopNSnapshot:
+    """Instantané partagé par toutes les sessions du processus"""
+    with _snapshots_lock:
+        snapshot = _snapshots.get(name)
+        if snapshot is None:
+            snapshot = _snapshots[name] = TopNSnapshot(name)
+        return snapshot
+
+
+def ecn_podium(cur, limit: int) -> List[int]:
+    """Identifiants des `limit` premiers du classement ECN"""
+    return [row[0] for row in ecn_top(cur, limit)]
+
+
+def ecn_top_cached(cur, limit: int) -> List:
+    """Classement ECN servi depuis l'instantané du processus (lecture seule, hors transaction d'écriture)"""
+    return get_snapshot(ECN_LEADERBOARD).get(cur, limit, ecn_top)
+
+
+class _Flight:
+    """Chargement en cours d'un classement, partagé par les appelants concurrents"""
+
+    def __init__(self, version: int):
+        self.version = version
+        self.value = None
+        self.done = threading.Event()
+
+
+class LeaderboardCache:
+    """Classements top-N partagés par les sessions du processus.
+
+    Chaque classement (général, par spécialité, ECN) est chargé une fois avec
+    leaderboard_size lignes puis découpé à la demande : changer le nombre de résultats
+    affichés ne déclenche pas de requête. Les chargements simultanés d'un même
+    classement sont fusionnés : un seul appel au loader, les autres appelants attendent
+    son résultat. invalidate() périme les entrées (y compris un chargement en cours) ;
+    le TTL borne le retard face aux écritures des autres processus."""
+
+    def __init__(self, config: Optional[CacheConfig] = None):
+        self.config = config or CacheConfig()
+        self._entries = {}
+        self._versions = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, entry_key, version) -> Optional[List]:
+        entry = self._entries.get(entry_key)
+        if entry and entry[0] == version and entry[1] > time.monotonic():
+            return entry[2]
+        return None
+
+    def lookup(self, board: str, key: Hashable) -> Tuple[int, Optional[List]]:
+        """(version, lignes en cache ou None) ; la version est à repasser à store() après chargement"""
+        entry_key = (board, key)
+        with self._lock:
+            version = self._versions.get(entry_key, 0)
+            return version, self._fresh(entry_key, version)
+
+    def store(self, board: str, key: Hashable, version: int, rows: Optional[List]):
+        """Met en cache des lignes chargées hors de get() (ignorées si invalidées entre-temps)"""
+        entry_key = (board, key)
+        with self._lock:
+            if rows is not None and self._versions.get(entry_key, 0) == version:
+                self._entries[entry_key] = (version, time.monotonic() + self.config.leaderboard_ttl, rows)
+
+    def get(self, board: str, key: Hashable, loader: Callable) -> Optional[List]:
+        """Lignes du classement (board, key) ; loader() doit retourner leaderboard_size lignes, ou None en cas d'erreur"""
+        entry_key = (board, key)
+        with self._lock:
+            version = self._versions.get(entry_key, 0)
+            rows = self._fresh(entry_key, version)
+            if rows is not None:
+                return rows
+
+            flight = self._inflight.get(entry_key)
+            leader = flight is None or flight.version != version
+            if leader:
+                flight = self._inflight[entry_key] = _Flight(version)
+
+        if not leader:
+            flight.done.wait()
+            return flight.value
+
+        try:
+            flight.value = loader()
+        finally:
+            self.store(board, key, version, flight.value)
+            with self._lock:
+                if self._inflight.get(entry_key) is flight:
+                    del self._inflight[entry_key]
+            flight.done.set()
+        return flight.value
+
+    def invalidate(self, board: str, *keys: Hashable):
+        """À appeler après le commit d'une écriture qui modifie le classement ; sans clé, toutes les clés du classement"""
+        with self._lock:
+            if not keys:
+                keys = {k for b, k in list(self._entries) + list(self._inflight) if b == board}
+            for key in keys:
+                entry_key = (board, key)
+                self._versions[entry_key] = self._versions.get(entry_key, 0) + 1
+                self._entries.pop(entry_key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+leaderboard_cache = LeaderboardCache()
@@ -0,0 +1,204 @@
+import heapq
+import json
+import select
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from config import LiveRankingConfig
+from utils.leaderboard_cache import SCORES_LEADERBOARD, leaderboard_cache
+from utils.statements import execute
+
+ALL_SPECIALTIES = None  # Clé du classement général
+
+
+def notify_score(cur, score_id: int, user_id: int, username: str, specialty: str, score: float,
+                 channel: str = LiveRankingConfig.channel):
+    """Publie un nouveau score ; PostgreSQL ne délivre la notification qu'au commit de la transaction.
+    La charge utile se termine par l'identifiant de la transaction (txid_current())"""
+    payload = json.dumps([score_id, user_id, score, specialty, username], separators=(",", ":"))
+    execute(cur, 'notify_score', (channel, payload))
+
+
+def notify_scores(cur, events: List[tuple], channel: str = LiveRankingConfig.channel):
+    """Publie un lot de scores (score_id, user_id, username, specialty, score) en une requête,
+    avec l'identifiant de la transaction comme notify_score"""
+    if not events:
+        return
+    payloads = [json.dumps([score_id, user_id, score, specialty, username], separators=(",", ":"))
+                for score_id, user_id, username, specialty, score in events]
+    cur.execute("""
+        SELECT pg_notify(%s, (payload::jsonb || to_jsonb(txid_current()))::text)
+        FROM unnest(%s::text[]) AS payload
+    """, (channel, payloads))
+
+
+class LiveRanking:
+    """Classements tenus en mémoire et mis à jour par LISTEN/NOTIFY.
+
+    Un thread d'écoute par processus charge un instantané des totaux (général et
+    spécialités suivies) puis applique les notifications des nouveaux scores, quel que
+    soit le processus qui les a écrits. Les pages lisent top() sans requête SQL.
+    L'instantané est lu dans une transaction REPEATABLE READ dont on garde l'instantané
+    MVCC (txid_current_snapshot()) : une notification n'est ignorée que si la transaction
+    qui l'a émise (txid en fin de charge utile) était visible de cette lecture. Les
+    identifiants de score ne sont pas ordonnés par commit et ne servent pas à dédoublonner."""
+
+    def __init__(self, config: Optional[LiveRankingConfig] = None):
+        self.config = config or LiveRankingConfig()
+        self._boards = {}
+        self._names = {}
+        self._ids = {}
+        self._versions = {}
+        self._tops = {}
+        self._snapshot = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.events_applied = 0
+
+    def start(self, db) -> "LiveRanking":
+        """Démarre le thread d'écoute (une seule fois par processus)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, args=(db,), name="live-ranking", daemon=True)
+                self._thread.start()
+        return self
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def _board_keys(self, specialty: str):
+        keys = [ALL_SPECIALTIES]
+        if specialty in self.config.specialties:
+            keys.append(specialty)
+        return keys
+
+    @staticmethod
+    def _parse_snapshot(snapshot: str) -> Tuple[int, int, frozenset]:
+        """« xmin:xmax:xip,... » de txid_current_snapshot()"""
+        xmin, xmax, xip = snapshot.split(':')
+        return int(xmin), int(xmax), frozenset(int(txid) for txid in xip.split(',') if txid)
+
+    def _counted(self, txid: int) -> bool:
+        """La transaction txid (validée) était-elle visible de l'instantané chargé ?
+        Même règle que txid_visible_in_snapshot, sans aller-retour vers la base."""
+        xmin, xmax, in_progress = self._snapshot
+        return txid < xmin or (txid < xmax and txid not in in_progress)
+
+    def _load_snapshot(self, cur):
+        # Une seule image MVCC pour l'instantané et les totaux (connexion en autocommit)
+        cur.execute("BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        try:
+            cur.execute("SELECT txid_current_snapshot()::text")
+            snapshot = self._parse_snapshot(cur.fetchone()[0])
+            boards, names = self._read_totals(cur)
+        finally:
+            cur.execute("COMMIT")
+
+        with self._lock:
+            self._boards = boards
+            self._names = names
+            self._ids = {username: user_id for user_id, username in names.items()}
+            self._snapshot = snapshot
+            for key in boards:
+                self._versions[key] = self._versions.get(key, 0) + 1
+        self._ready.set()
+
+    def _read_totals(self, cur):
+        cur.execute("""
+            SELECT s.user_id, u.username, SUM(s.score), COUNT(*)
+            FROM scores s JOIN users u ON s.user_id = u.id
+            GROUP BY s.user_id, u.username
+        """)
+        boards = {ALL_SPECIALTIES: {}}
+        names = {}
+        for user_id, username, total, count in cur.fetchall():
+            boards[ALL_SPECIALTIES][user_id] = [float(total), count]
+            names[user_id] = username
+
+        cur.execute("""
+            SELECT user_id, specialty, SUM(score), COUNT(*)
+            FROM scores
+            WHERE specialty = ANY(%s)
+            GROUP BY user_id, specialty
+        """, (list(self.config.specialties),))
+        for specialty in self.config.specialties:
+            boards[specialty] = {}
+        for user_id, specialty, total, count in cur.fetchall():
+            boards[specialty][user_id] = [float(total), count]
+        return boards, names
+
+    def apply(self, payloads: List[str]):
+        """Applique un lot de notifications (une charge utile JSON par nouveau score)"""
+        touched = set()
+        with self._lock:
+            for payload in payloads:
+                score_id, user_id, score, specialty, username, txid = json.loads(payload)
+                if self._counted(txid):
+                    continue  # Déjà compté dans l'instantané
+                self._names[user_id] = username
+                self._ids[username] = user_id
+                for key in self._board_keys(specialty):
+                    entry = self._boards.setdefault(key, {}).setdefault(user_id, [0.0, 0])
+                    entry[0] += score
+                    entry[1] += 1
+                    self._versions[key] = self._versions.get(key, 0) + 1
+                touched.add(specialty)
+                self.events_applied += 1
+
+        # Écritures des autres processus : leurs classements SQL en cache sont périmés
+        if touched:
+            leaderboard_cache.invalidate(SCORES_LEADERBOARD, ALL_SPECIALTIES, *touched)
+
+    def _listen(self, db):
+        while True:
+            conn = db.get_connection()
+            if conn is None:
+                time.sleep(self.config.poll_timeout)
+                continue
+            try:
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.config.channel}")
+                    self._load_snapshot(cur)
+
+                while True:
+                    # Y compris les notifications reçues pendant le chargement de l'instantané
+                    if conn.notifies:
+                        events = [notify.payload for notify in conn.notifies]
+                        del conn.notifies[:]
+                        self.apply(events)
+                    if select.select([conn], [], [], self.config.poll_timeout) == ([], [], []):
+                        continue
+                    conn.poll()
+
+            except Exception as e:
+                # Connexion perdue : l'instantané est rechargé à la reconnexion (événements manqués inclus)
+                print(f"❌ Erreur écoute des scores: {e}")
+                time.sleep(1)
+            finally:
+                conn.close()
+
+    def top(self, specialty: Optional[str] = ALL_SPECIALTIES, limit: int = 10) -> List[Dict]:
+        """Top du classement en mémoire (même forme que DatabaseManager.get_leaderboard)"""
+        now = time.monotonic()
+        with self._lock:
+            board = self._boards.get(specialty, {})
+            version = self._versions.get(specialty, 0)
+            cached = self._tops.get(specialty)
+            if cached is None or (cached[0] != version and now - cached[1] >= self.config.refresh_interval):
+                best = heapq.nlargest(self.config.top_size, board.items(), key=lambda item: item[1][0])
+                rows = [
+                    {'username': self._names.get(user_id, '?'), 'total_score': total, 'quizzes_taken': count}
+                    for user_id, (total, count) in best
+                ]
+                cached = self._tops[specialty] = (version, now, rows)
+            return cached[2][:limit]
+
+    def user_total(self, username: str, specialty: Optional[str] = ALL_SPECIALTIES) -> Optional[float]:
+        with self._lock:
+            entry = self._boards.get(specialty, {}).get(self._ids.get(username))
+            return entry[0] if entry else None
+
+
+live_ranking = LiveRanking()
@@ -0,0 +1,58 @@
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from typing import Callable, Dict
+
+
+class PageProfiler:
+    """Mesure par page le coût d'import du module (premier affichage dans le processus)
+    et la durée de chaque rerun, à la manière de ``python -X importtime`` mais page par page"""
+
+    def __init__(self, max_samples: int = 1000):
+        self.imports = {}
+        # Durées des derniers reruns seulement (mémoire bornée quelle que soit la durée de vie du processus)
+        self.reruns = defaultdict(lambda: deque(maxlen=max_samples))
+        self.rerun_counts = Counter()
+        self._lock = threading.Lock()
+
+    def run(self, page: str, loader: Callable, render_args=()) -> Dict:
+        """Importe la page via loader() puis appelle son render() ; retourne les durées en ms"""
+        modules_before = len(sys.modules)
+        start = time.perf_counter()
+        module = loader()
+        imported = time.perf_counter()
+        try:
+            module.render(*render_args)
+        finally:
+            end = time.perf_counter()
+            timings = {
+                'import_ms': (imported - start) * 1000,
+                'render_ms': (end - imported) * 1000,
+                'new_modules': len(sys.modules) - modules_before,
+            }
+            with self._lock:
+                if timings['new_modules']:
+                    self.imports[page] = timings['import_ms']
+                self.reruns[page].append(timings['render_ms'])
+                self.rerun_counts[page] += 1
+            print(f"⏱️ {page}: import {timings['import_ms']:.1f} ms ({timings['new_modules']} modules), "
+                  f"rendu {timings['render_ms']:.1f} ms")
+        return timings
+
+    def summary(self) -> Dict[str, Dict]:
+        """Import initial et rendu médian / maximum par page (sur les derniers reruns conservés)"""
+        with self._lock:
+            result = {}
+            for page, samples in self.reruns.items():
+                ordered = sorted(samples)
+                result[page] = {
+                    'import_ms': round(self.imports.get(page, 0.0), 1),
+                    'reruns': self.rerun_counts[page],
+                    'render_median_ms': round(ordered[len(ordered) // 2], 1),
+                    'render_max_ms': round(ordered[-1], 1),
+                }
+            return result
+
+
+page_profiler = PageProfiler()
@@ -0,0 +1,259 @@
+import atexit
+import math
+import random
+import struct
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, Optional
+import numpy as np
+from config import SketchConfig
+
+_HEADER = struct.Struct("<HHQ")  # k, nombre de niveaux, nombre de valeurs
+
+
+class KLLSketch:
+    """Sketch de quantiles KLL : mémoire O(k), fusionnable, erreur de rang ~1/k.
+
+    Le niveau h contient des valeurs de poids 2**h. Quand un niveau dépasse sa
+    capacité, il est trié et une valeur sur deux (décalage aléatoire) est promue
+    au niveau supérieur."""
+
+    def __init__(self, k: int = 200):
+        self.k = k
+        self.n = 0
+        self.levels = [[]]
+        self._cdf = None
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        while sum(len(items) for items in self.levels) > sum(self._capacity(h) for h in range(len(self.levels))):
+            for h, items in enumerate(self.levels):
+                if len(items) >= self._capacity(h):
+                    if h + 1 == len(self.levels):
+                        self.levels.append([])
+                    items.sort()
+                    # Un élément isolé reste au niveau courant pour conserver le poids total exact
+                    keep = [items.pop()] if len(items) % 2 else []
+                    self.levels[h + 1].extend(items[random.getrandbits(1)::2])
+                    self.levels[h] = keep
+                    break
+
+    def update(self, value: float):
+        self.levels[0].append(float(value))
+        self.n += 1
+        self._cdf = None
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def merge(self, other: "KLLSketch"):
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, items in enumerate(other.levels):
+            self.levels[h].extend(items)
+        self.n += other.n
+        self._cdf = None
+        self._compress()
+
+    def copy(self) -> "KLLSketch":
+        sketch = KLLSketch(self.k)
+        sketch.n = self.n
+        sketch.levels = [list(items) for items in self.levels]
+        return sketch
+
+    def _distribution(self):
+        if self._cdf is None:
+            values = np.fromiter((v for items in self.levels for v in items), dtype=np.float64)
+            weights = np.concatenate([np.full(len(items), 2 ** h, dtype=np.float64) for h, items in enumerate(self.levels)])
+            order = np.argsort(values, kind="stable")
+            self._cdf = (values[order], np.cumsum(weights[order]))
+        return self._cdf
+
+    def rank(self, value: float) -> Optional[float]:
+        """Fraction estimée des valeurs inférieures ou égales à value"""
+        if self.n == 0:
+            return None
+        values, cumulative = self._distribution()
+        position = np.searchsorted(values, value, side="right")
+        return float(cumulative[position - 1] / cumulative[-1]) if position else 0.0
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.n == 0:
+            return None
+        values, cumulative = self._distribution()
+        index = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        return float(values[min(index, len(values) - 1)])
+
+    def to_bytes(self) -> bytes:
+        sizes = array("I", (len(items) for items in self.levels))
+        values = array("f", (v for items in self.levels for v in items))
+        return _HEADER.pack(self.k, len(self.levels), self.n) + sizes.tobytes() + values.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "KLLSketch":
+        k, n_levels, n = _HEADER.unpack_from(data)
+        offset = _HEADER.size
+        sizes = array("I")
+        sizes.frombytes(data[offset:offset + 4 * n_levels])
+        values = array("f")
+        values.frombytes(data[offset + 4 * n_levels:])
+
+        sketch = cls(k)
+        sketch.n = n
+        sketch.levels, start = [], 0
+        for size in sizes:
+            sketch.levels.append(values[start:start + size].tolist())
+            start += size
+        return sketch
+
+
+def specialty_sketch(specialty: str) -> str:
+    return f"specialty:{specialty}"
+
+
+def ecn_sketch(mode: str) -> str:
+    return f"ecn:{mode}"
+
+
+def rebuild_sketches(cur, k: int) -> Dict[str, KLLSketch]:
+    """Reconstruit tous les sketches depuis l'historique, lu par blocs de 10 000 lignes via un
+    curseur serveur nommé ouvert dans la transaction de cur (l'historique n'est pas chargé en mémoire)"""
+    sketches = {}
+    queries = [
+        ("SELECT specialty, score FROM scores", specialty_sketch),
+        ("SELECT COALESCE(simulation_data->>'mode', 'fixed'), percentage FROM ecn_simulations", ecn_sketch),
+    ]
+    for query, naming in queries:
+        with cur.connection.cursor(name="rebuild_sketches") as stream:
+            stream.itersize = 10000
+            stream.execute(query)
+            for key, value in stream:
+                name = naming(key)
+                if name not in sketches:
+                    sketches[name] = KLLSketch(k)
+                sketches[name].update(float(value))
+
+    save_sketches(cur, sketches)
+    return sketches
+
+
+def save_sketches(cur, sketches: Dict[str, KLLSketch]):
+    if not sketches:
+        return
+    from psycopg2.extras import execute_values
+    import psycopg2
+    execute_values(cur, """
+        INSERT INTO quantile_sketches (name, sketch, n) VALUES %s
+        ON CONFLICT (name) DO UPDATE SET sketch = EXCLUDED.sketch, n = EXCLUDED.n, updated_at = CURRENT_TIMESTAMP
+    """, [(name, psycopg2.Binary(sketch.to_bytes()), sketch.n) for name, sketch in sketches.items()])
+
+
+class SketchStore:
+    """Sketches partagés par les sessions du processus.
+
+    Chaque insertion met à jour en mémoire un sketch « delta » ; les deltas sont
+    fusionnés dans la table quantile_sketches toutes les flush_every insertions ou
+    flush_interval secondes. Les lectures utilisent un instantané rechargé au plus
+    toutes les refresh_ttl secondes, augmenté des deltas locaux non encore écrits."""
+
+    def __init__(self, config: Optional[SketchConfig] = None):
+        self.config = config or SketchConfig()
+        self._pending = {}
+        self._pending_count = 0
+        self._last_flush = time.monotonic()
+        self._snapshot = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._db = None
+
+    def add(self, db, name: str, value: float):
+        """Enregistre une valeur (à appeler après le commit de l'insertion correspondante)"""
+        with self._lock:
+            if self._db is None:
+                atexit.register(self.flush)
+            self._db = db
+            self._pending.setdefault(name, KLLSketch(self.config.k)).update(value)
+            if name in self._snapshot:
+                self._snapshot[name].update(value)
+            self._pending_count += 1
+            due = (self._pending_count >= self.config.flush_every
+                   or time.monotonic() - self._last_flush >= self.config.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Fusionne les deltas en attente dans les sketches persistés"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._pending_count = 0
+                self._last_flush = time.monotonic()
+            if not pending or self._db is None:
+                return
+
+            conn = self._db.get_connection()
+            if conn is None:
+                self._restore(pending)
+                return
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT name, sketch FROM quantile_sketches WHERE name = ANY(%s) ORDER BY name FOR UPDATE",
+                        (sorted(pending),)
+                    )
+                    for name, data in cur.fetchall():
+                        stored = KLLSketch.from_bytes(bytes(data))
+                        stored.merge(pending[name])
+                        pending[name] = stored
+                    save_sketches(cur, pending)
+                    conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ Erreur écriture des sketches: {e}")
+                self._restore(pending)
+            finally:
+                conn.close()
+
+    def _restore(self, pending: Dict[str, KLLSketch]):
+        with self._lock:
+            for name, sketch in pending.items():
+                self._pending.setdefault(name, KLLSketch(self.config.k)).merge(sketch)
+
+    def _refresh(self, db):
+        conn = db.get_connection()
+        if conn is None:
+            return
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT name, sketch FROM quantile_sketches")
+                snapshot = {name: KLLSketch.from_bytes(bytes(data)) for name, data in cur.fetchall()}
+        except Exception as e:
+            print(f"❌ Erreur lecture des sketches: {e}")
+            return
+        finally:
+            conn.close()
+
+        with self._lock:
+            for name, delta in self._pending.items():
+                snapshot.setdefault(name, KLLSketch(self.config.k)).merge(delta)
+            self._snapshot = snapshot
+            self._loaded_at = time.monotonic()
+
+    def percentile(self, db, name: str, value: float) -> Optional[float]:
+        """Pourcentage (0-100) des valeurs enregistrées inférieures ou égales à value"""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.config.refresh_ttl:
+            self._refresh(db)
+        with self._lock:
+            sketch = self._snapshot.get(name)
+            rank = sketch.rank(value) if sketch is not None else None
+        return rank * 100 if rank is not None else None
+
+    def percentiles(self, db, name_values: Iterable) -> Dict[str, Optional[float]]:
+        return {name: self.percentile(db, name, value) for name, value in name_values}
+
+
+sketch_store = SketchStore()
@@ -1,16 +1,46 @@
+import bisect
 import json
 import os
 import random
 from typing import Dict, List, Optional, Tuple
 import streamlit as st
 from typing import List, Dict
+from config import WorkerConfig
 
 class QuizManager:
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir="data", bank_image: Optional[str] = None):
+        """bank_image : image partagée de la banque (utils.shared_bank) projetée au lieu de relire
+        les fichiers JSON ; par défaut celle de ECN_BANK_IMAGE, renseignée par run_workers.py"""
         self.data_dir = data_dir
         self.quizzes = {}
         self.clinical_cases = {}
-        self.load_all_data()
+        self.questions_by_id = {}
+        self._flat_ids = []
+        self._flat_positions = {}
+        self._blocks = {}
+        self._block_starts = []
+        self._block_names = []
+        self.shared_bank = None
+        bank_image = WorkerConfig().bank_image if bank_image is None else bank_image
+        if not (bank_image and self._map_bank(bank_image)):
+            self.load_all_data()
+    
+    def _map_bank(self, path: str) -> bool:
+        """Projette l'image de la banque : questions et dossiers décodés à la demande, aucune copie privée"""
+        from utils.shared_bank import open_bank
+        bank = open_bank(path, self.data_dir)
+        if bank is None:
+            return False
+        
+        self.shared_bank = bank
+        self.quizzes = bank.quizzes
+        self.clinical_cases = bank.clinical_cases
+        self.questions_by_id = bank.questions_by_id
+        self._flat_ids = bank.flat_ids
+        self._flat_positions = bank.positions
+        self._blocks = bank.blocks
+        self._index_blocks()
+        return True
     
     def load_all_data(self):
         """Charge tous les fichiers JSON disponibles"""
@@ -27,8 +57,91 @@ class QuizManager:
                         data = json.load(f)
                         self.quizzes[specialty] = data.get('quizzes', [])
                         self.clinical_cases[specialty] = data.get('clinical_cases', [])
+                        self._index_questions(specialty)
                 except Exception as e:
                     st.error(f"Erreur lors du chargement de {file}: {e}")
+        
+        self._build_flat_index()
+    
+    def _index_questions(self, specialty: str):
+        """Attribue un identifiant stable (spécialité:index) à chaque question"""
+        for index, question in enumerate(self.quizzes[specialty]):
+            question_id = question.setdefault('id', f"{specialty}:{index}")
+            self.questions_by_id[question_id] = question
+    
+    def _build_flat_index(self):
+        """Index plat des identifiants de questions, contigus par spécialité (bloc [début, fin))"""
+        self._flat_ids = []
+        self._blocks = {}
+        for specialty, questions in self.quizzes.items():
+            start = len(self._flat_ids)
+            self._flat_ids.extend(question['id'] for question in questions)
+            self._blocks[specialty] = (start, len(self._flat_ids))
+        self._flat_positions = {question_id: position for position, question_id in enumerate(self._flat_ids)}
+        self._index_blocks()
+    
+    def _index_blocks(self):
+        non_empty = [(start, specialty) for specialty, (start, end) in self._blocks.items() if end > start]
+        self._block_starts = [start for start, _ in non_empty]
+        self._block_names = [specialty for _, specialty in non_empty]
+    
+    def sample_question_ids(self, num_questions: int, weights: Optional[Dict[str, float]] = None,
+                            exclude: Optional[set] = None, rng: Optional[random.Random] = None) -> List[str]:
+        """Tire des questions de toutes les spécialités en une passe, sans remise, dans un ordre aléatoire.
+        
+        Chaque tirage choisit une spécialité selon son poids (par défaut : proportionnellement à son
+        nombre de questions, soit un tirage uniforme) puis une position au hasard dans son bloc de
+        l'index plat. Les spécialités absentes de weights ne sont pas tirées ; les identifiants de
+        exclude ne sont jamais retournés. Le coût dépend du nombre de questions tirées, pas de la
+        taille de la banque."""
+        rng = rng or random
+        blocks = {
+            specialty: bounds for specialty, bounds in self._blocks.items()
+            if bounds[1] > bounds[0] and (weights is None or weights.get(specialty, 0) > 0)
+        }
+        available = {specialty: end - start for specialty, (start, end) in blocks.items()}
+        
+        # Positions exclues, décomptées de leur spécialité
+        excluded = {self._flat_positions[qid] for qid in (exclude or ()) if qid in self._flat_positions}
+        for position in excluded:
+            specialty = self._block_names[bisect.bisect_right(self._block_starts, position) - 1]
+            if specialty in available:
+                available[specialty] -= 1
+        
+        specialties = [specialty for specialty in blocks if available[specialty] > 0]
+        taken = set()
+        drawn = []
+        while len(drawn) < num_questions and specialties:
+            cum_weights = []
+            total = 0
+            for specialty in specialties:
+                total += available[specialty] if weights is None else weights[specialty]
+                cum_weights.append(total)
+            
+            # Tirages jusqu'à épuisement d'une spécialité (les poids ne changent qu'à ce moment)
+            while len(drawn) < num_questions:
+                specialty = specialties[bisect.bisect_right(cum_weights, rng.random() * total)]
+                start, end = blocks[specialty]
+                for _ in range(32):
+                    position = rng.randrange(start, end)
+                    if position not in taken and position not in excluded:
+                        break
+                else:
+                    # Bloc presque épuisé : tirage parmi les positions restantes
+                    position = rng.choice([p for p in range(start, end) if p not in taken and p not in excluded])
+                
+                taken.add(position)
+                drawn.append(self._flat_ids[position])
+                available[specialty] -= 1
+                if available[specialty] == 0:
+                    break
+            
+            specialties = [specialty for specialty in specialties if available[specialty] > 0]
+        return drawn
+    
+    def get_question(self, question_id: str) -> Optional[Dict]:
+        """Récupère une question par son identifiant"""
+        return self.questions_by_id.get(question_id)
     
     def get_specialties(self) -> List[str]:
         return list(self.quizzes.keys())
@@ -38,9 +151,59 @@ class QuizManager:
         if specialty not in self.quizzes:
             return []
         
-        questions = self.quizzes[specialty].copy()
-        random.shuffle(questions)
-        return questions[:num_questions]
+        # Mélange des positions plutôt que des questions : même tirage qu'un random.shuffle de la
+        # liste pour une graine donnée, sans décoder toute la spécialité d'une banque projetée
+        questions = self.quizzes[specialty]
+        order = list(range(len(questions)))
+        random.shuffle(order)
+        return [questions[i] for i in order[:num_questions]]
+    
+    def get_due_questions(self, db, username: str, specialty: Optional[str] = None, num_questions: int = 20) -> List[Dict]:
+        """Questions de révision espacée : d'abord celles arrivées à échéance (les plus en retard
+        en premier), puis des questions jamais vues tirées au hasard, puis les questions déjà vues
+        dont l'échéance est la plus proche : min(num_questions, taille de la banque) questions"""
+        from utils.spaced_repetition import due_question_ids, reviewed_question_ids
+        from utils.statements import execute
+        
+        conn = db.get_connection()
+        if conn is None:
+            return self.get_quiz_questions(specialty, num_questions) if specialty else []
+        
+        try:
+            with conn.cursor() as cur:
+                execute(cur, 'user_id', (username,))
+                row = cur.fetchone()
+                if row is None:
+                    return self.get_quiz_questions(specialty, num_questions) if specialty else []
+                user_id = row[0]
+                
+                prefix = f"{specialty}:" if specialty else None
+                questions = [q for q in map(self.get_question, due_question_ids(cur, user_id, num_questions, prefix)) if q]
+                
+                missing = num_questions - len(questions)
+                if missing > 0:
+                    chosen = {q['id'] for q in questions}
+                    reviewed = [qid for qid in reviewed_question_ids(cur, user_id, prefix)
+                                if qid in self.questions_by_id and qid not in chosen]
+                    seen = set(reviewed)
+                    
+                    # Questions nouvelles, tirées au hasard parmi toutes celles du bloc jamais vues
+                    start, end = self._blocks.get(specialty, (0, 0)) if specialty else (0, len(self._flat_ids))
+                    unseen = [position for position in range(start, end)
+                              if self._flat_ids[position] not in seen and self._flat_ids[position] not in chosen]
+                    positions = random.sample(unseen, min(missing, len(unseen)))
+                    questions.extend(self.get_question(self._flat_ids[position]) for position in positions)
+                    
+                    # Banque déjà parcourue : révisions anticipées, échéance la plus proche d'abord
+                    questions.extend(self.get_question(qid) for qid in reviewed[:num_questions - len(questions)])
+                
+                return questions
+                
+        except Exception as e:
+            print(f"Erreur révision espacée: {e}")
+            return self.get_quiz_questions(specialty, num_questions) if specialty else []
+        finally:
+            conn.close()
     
     def get_progressive_clinical_case(self, specialty: str, case_id: Optional[int] = None) -> Dict:
         """Récupère un dossier clinique progressif"""
@@ -0,0 +1,149 @@
+import json
+import time
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from config import RecommendationConfig
+
+
+class RecommendationEngine:
+    """Classe les spécialités à travailler pour chaque utilisateur à partir des agrégats
+    journaliers et des réponses question par question, puis stocke la liste classée"""
+
+    def __init__(self, db, quiz_manager, config: Optional[RecommendationConfig] = None):
+        self.db = db
+        self.quiz_manager = quiz_manager
+        self.config = config or RecommendationConfig()
+        self.bank_sizes = {s: len(q) for s, q in quiz_manager.quizzes.items() if q}
+
+    def stale_users(self, cur, full: bool = False) -> List[int]:
+        """Utilisateurs ayant une activité postérieure à leur dernier calcul"""
+        cur.execute("""
+            SELECT c.user_id
+            FROM user_counters c
+            LEFT JOIN user_recommendations r ON r.user_id = c.user_id
+            WHERE %s OR r.computed_at IS NULL OR c.updated_at > r.computed_at
+            ORDER BY c.user_id
+        """, (full,))
+        return [row[0] for row in cur.fetchall()]
+
+    def load_features(self, cur, user_ids: List[int]) -> pd.DataFrame:
+        """Caractéristiques utilisateur × spécialité pour un lot d'utilisateurs (deux requêtes agrégées)"""
+        cur.execute("""
+            SELECT user_id, split_part(question_id, ':', 1) AS specialty,
+                   SUM(w * correct::int) / SUM(w) AS accuracy,
+                   COUNT(*) AS responses,
+                   COUNT(DISTINCT question_id) AS seen,
+                   AVG(latency_ms) / 1000.0 AS latency
+            FROM (
+                SELECT user_id, question_id, correct, latency_ms,
+                       power(0.5, EXTRACT(EPOCH FROM (now() - created_at)) / 86400.0 / %(half_life)s) AS w
+                FROM question_responses
+                WHERE user_id = ANY(%(user_ids)s)
+            ) r
+            GROUP BY user_id, split_part(question_id, ':', 1)
+        """, {'user_ids': user_ids, 'half_life': self.config.half_life_days})
+        responses = pd.DataFrame(cur.fetchall(), columns=['user_id', 'specialty', 'accuracy', 'responses', 'seen', 'latency'])
+
+        cur.execute("""
+            SELECT user_id, specialty, SUM(time_sum) AS time_sum, CURRENT_DATE - MAX(day) AS idle_days
+            FROM user_daily_stats
+            WHERE user_id = ANY(%s)
+            GROUP BY user_id, specialty
+        """, (user_ids,))
+        rollups = pd.DataFrame(cur.fetchall(), columns=['user_id', 'specialty', 'time_sum', 'idle_days'])
+
+        # Toutes les spécialités de la banque pour chaque utilisateur : les spécialités jamais travaillées comptent
+        grid = pd.MultiIndex.from_product([user_ids, sorted(self.bank_sizes)], names=['user_id', 'specialty']).to_frame(index=False)
+        features = grid.merge(responses, how='left', on=['user_id', 'specialty']).merge(rollups, how='left', on=['user_id', 'specialty'])
+        for column in ('accuracy', 'responses', 'seen', 'latency', 'time_sum', 'idle_days'):
+            features[column] = pd.to_numeric(features[column], errors='coerce')
+        return features
+
+    def score(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Priorité de révision vectorisée : précision récente faible, couverture faible,
+        lenteur et inactivité font monter la spécialité dans la liste"""
+        config = self.config
+        f = features.copy()
+        f['responses'] = f['responses'].fillna(0)
+
+        # Précision lissée vers 0.5 quand peu de réponses
+        prior = config.prior_responses
+        f['accuracy_smoothed'] = (f['accuracy'].fillna(0.5) * f['responses'] + 0.5 * prior) / (f['responses'] + prior)
+        f['coverage'] = (f['seen'].fillna(0) / f['specialty'].map(self.bank_sizes)).clip(0, 1)
+
+        # Temps par question : latence mesurée sinon temps total des sessions / réponses enregistrées
+        fallback = np.where(f['responses'] > 0, f['time_sum'] / f['responses'].where(f['responses'] > 0), np.nan)
+        f['time_per_question'] = f['latency'].fillna(pd.Series(fallback, index=f.index))
+        f['slowness'] = (f['time_per_question'] / config.reference_time - 1).clip(0, 1).fillna(0)
+        f['staleness'] = (f['idle_days'] / config.stale_after_days).clip(0, 1).fillna(1)
+
+        f['priority'] = (config.weight_accuracy * (1 - f['accuracy_smoothed'])
+                         + config.weight_coverage * (1 - f['coverage'])
+                         + config.weight_speed * f['slowness']
+                         + config.weight_recency * f['staleness'])
+        return f
+
+    @staticmethod
+    def _reasons(f: pd.DataFrame) -> np.ndarray:
+        """Motif principal de chaque ligne, évalué dans l'ordre des conditions"""
+        return np.select(
+            [f['responses'] == 0, f['accuracy_smoothed'] < 0.6, f['coverage'] < 0.3, f['slowness'] > 0.5, f['staleness'] >= 1],
+            ["Jamais travaillée",
+             "Précision récente " + (f['accuracy_smoothed'] * 100).round().astype(int).astype(str) + "%",
+             "Seulement " + (f['coverage'] * 100).round().astype(int).astype(str) + "% des questions vues",
+             f['time_per_question'].round().fillna(0).astype(int).astype(str) + "s par question",
+             "Non révisée récemment"],
+            default="À consolider"
+        )
+
+    def rank(self, scored: pd.DataFrame) -> Dict[int, List[Dict]]:
+        """Liste classée (priorité décroissante) par utilisateur"""
+        f = scored.sort_values(['user_id', 'priority'], ascending=[True, False])
+        items = pd.DataFrame({
+            'specialty': f['specialty'],
+            'priority': f['priority'].round(4),
+            'accuracy': f['accuracy'].round(4).astype(object).where(f['accuracy'].notna(), None),
+            'coverage': f['coverage'].round(4),
+            'time_per_question': f['time_per_question'].round(1).astype(object).where(f['time_per_question'].notna(), None),
+            'reason': self._reasons(f)
+        }).to_dict('records')
+
+        ranked = {}
+        for user_id, item in zip(f['user_id'].tolist(), items):
+            ranked.setdefault(int(user_id), []).append(item)
+        return ranked
+
+    def save(self, cur, ranked: Dict[int, List[Dict]]):
+        from psycopg2.extras import execute_values
+        execute_values(cur, """
+            INSERT INTO user_recommendations (user_id, recommendations, computed_at) VALUES %s
+            ON CONFLICT (user_id) DO UPDATE SET
+                recommendations = EXCLUDED.recommendations,
+                computed_at = EXCLUDED.computed_at
+        """, [(user_id, json.dumps(items)) for user_id, items in ranked.items()],
+            template="(%s, %s, now())", page_size=1000)
+
+    def run(self, full: bool = False, chunk_size: int = 1000) -> int:
+        """Recalcule les recommandations des utilisateurs actifs depuis le dernier passage"""
+        conn = self.db.get_connection()
+        if conn is None:
+            return 0
+
+        try:
+            with conn.cursor() as cur:
+                user_ids = self.stale_users(cur, full)
+                start = time.perf_counter()
+                for offset in range(0, len(user_ids), chunk_size):
+                    chunk = user_ids[offset:offset + chunk_size]
+                    self.save(cur, self.rank(self.score(self.load_features(cur, chunk))))
+                    conn.commit()
+                    print(f"  {offset + len(chunk)}/{len(user_ids)} utilisateurs  {time.perf_counter() - start:.1f}s")
+                return len(user_ids)
+
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Erreur calcul des recommandations: {e}")
+            return 0
+        finally:
+            conn.close()
@@ -0,0 +1,48 @@
+from typing import List, Optional
+from utils.statements import execute
+
+# Agrégats journaliers par utilisateur × jour × spécialité, alimentés à chaque score enregistré.
+# La somme des carrés permet de retrouver la variance sans relire l'historique brut.
+
+
+def record_daily_score(cur, user_id: int, specialty: str, score: int, time_taken: int):
+    """Ajoute un score au cumul du jour, dans la transaction du curseur"""
+    execute(cur, 'daily_score', (user_id, specialty, score, score * score, time_taken))
+
+
+def record_daily_scores(cur, rows: List[tuple]):
+    """Version groupée de record_daily_score pour des lignes (user_id, specialty, score, time_taken)"""
+    if not rows:
+        return
+    from psycopg2.extras import execute_values
+    execute_values(cur, """
+        INSERT INTO user_daily_stats (user_id, day, specialty, quiz_count, score_sum, score_sumsq, time_sum)
+        SELECT user_id, CURRENT_DATE, specialty, COUNT(*), SUM(score), SUM(score::bigint * score), SUM(time_taken)
+        FROM (VALUES %s) AS v (user_id, specialty, score, time_taken)
+        GROUP BY user_id, specialty
+        ON CONFLICT (user_id, day, specialty) DO UPDATE SET
+            quiz_count = user_daily_stats.quiz_count + EXCLUDED.quiz_count,
+            score_sum = user_daily_stats.score_sum + EXCLUDED.score_sum,
+            score_sumsq = user_daily_stats.score_sumsq + EXCLUDED.score_sumsq,
+            time_sum = user_daily_stats.time_sum + EXCLUDED.time_sum
+    """, rows, template="(%s::int, %s::varchar, %s::int, %s::int)", page_size=1000)
+
+
+def rebuild_daily_stats(cur, first_user_id: Optional[int] = None, last_user_id: Optional[int] = None) -> int:
+    """Recalcule les agrégats depuis la table scores, pour tous les utilisateurs ou une tranche d'identifiants.
+    Retourne le nombre de lignes d'agrégats écrites."""
+    bounds = {'first': first_user_id, 'last': last_user_id}
+    cur.execute("""
+        DELETE FROM user_daily_stats
+        WHERE %(first)s::int IS NULL OR user_id BETWEEN %(first)s AND %(last)s
+    """, bounds)
+    cur.execute("""
+        INSERT INTO user_daily_stats (user_id, day, specialty, quiz_count, score_sum, score_sumsq, time_sum)
+        SELECT user_id, DATE(created_at), specialty, COUNT(*), SUM(score),
+               SUM(score::bigint * score), SUM(time_taken)
+        FROM scores
+        WHERE user_id IS NOT NULL
+          AND (%(first)s::int IS NULL OR user_id BETWEEN %(first)s AND %(last)s)
+        GROUP BY user_id, DATE(created_at), specialty
+    """, bounds)
+    return cur.rowcount
@@ -0,0 +1,221 @@
+import json
+import mmap
+import os
+from collections.abc import Mapping, Sequence
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Image binaire de la banque de questions, construite une fois par run_workers.py puis
+# projetée en lecture seule (mmap) par chaque worker : les pages sont partagées entre
+# processus au lieu d'une copie Python privée de toute la banque par worker.
+#
+# Format : MAGIC, longueur du manifeste (uint64), manifeste JSON, puis des sections
+# alignées sur 8 octets décrites par le manifeste (nom → [position, taille]) :
+#   question_offsets / question_blob : questions en JSON, dans l'ordre de l'index plat
+#   id_offsets / id_blob             : identifiants des questions, même ordre
+#   id_sorted                        : positions triées par identifiant (recherche dichotomique)
+#   case_offsets / case_blob         : dossiers cliniques en JSON
+
+MAGIC = b"ECNBANK1"
+
+
+def source_fingerprint(data_dir: str) -> List:
+    """(fichier, taille, date de modification) des fichiers JSON de la banque"""
+    entries = []
+    for name in sorted(os.listdir(data_dir)):
+        if name.endswith('.json'):
+            stat = os.stat(os.path.join(data_dir, name))
+            entries.append([name, stat.st_size, stat.st_mtime_ns])
+    return entries
+
+
+def _packed(records: List[bytes]) -> Tuple[np.ndarray, bytes]:
+    offsets = np.zeros(len(records) + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum([len(record) for record in records], dtype=np.uint64)
+    return offsets, b"".join(records)
+
+
+def build_bank_image(quiz_manager, path: str) -> str:
+    """Écrit l'image de la banque chargée par quiz_manager (remplacement atomique du fichier)"""
+    def encode(record):
+        return json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    specialties = list(quiz_manager.quizzes)
+    questions = [question for specialty in specialties for question in quiz_manager.quizzes[specialty]]
+    cases = [case for specialty in specialties for case in quiz_manager.clinical_cases.get(specialty, [])]
+    ids = [question['id'].encode('utf-8') for question in questions]
+
+    sections = {}
+    sections['question_offsets'], sections['question_blob'] = _packed([encode(q) for q in questions])
+    sections['id_offsets'], sections['id_blob'] = _packed(ids)
+    sections['id_sorted'] = np.array(sorted(range(len(ids)), key=ids.__getitem__), dtype=np.int64)
+    sections['case_offsets'], sections['case_blob'] = _packed([encode(c) for c in cases])
+
+    manifest = {
+        'source': os.path.realpath(quiz_manager.data_dir),
+        'fingerprint': source_fingerprint(quiz_manager.data_dir),
+        'specialties': [[s, len(quiz_manager.quizzes[s]), len(quiz_manager.clinical_cases.get(s, []))]
+                        for s in specialties],
+        'sections': {}
+    }
+    payloads = {name: data.tobytes() if isinstance(data, np.ndarray) else data for name, data in sections.items()}
+
+    # Positions des sections : dépendent de la taille du manifeste, qui les contient
+    header_size = 0
+    while True:
+        position = header_size
+        for name, payload in payloads.items():
+            position += -position % 8
+            manifest['sections'][name] = [position, len(payload)]
+            position += len(payload)
+        encoded = json.dumps(manifest).encode('utf-8')
+        size = len(MAGIC) + 8 + len(encoded)
+        size += -size % 8
+        if size == header_size:
+            break
+        header_size = size
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + len(encoded).to_bytes(8, 'little') + encoded)
+        for name, payload in payloads.items():
+            f.seek(manifest['sections'][name][0])
+            f.write(payload)
+    os.replace(tmp_path, path)
+    return path
+
+
+class MappedRecords(Sequence):
+    """Suite d'objets JSON de l'image, décodés à la demande (nouvel objet à chaque accès)"""
+
+    def __init__(self, buffer, offsets: np.ndarray, base: int, decode=json.loads):
+        self._buffer = buffer
+        self._offsets = offsets
+        self._base = base
+        self._decode = decode
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start = self._base + int(self._offsets[index])
+        return self._decode(self._buffer[start:self._base + int(self._offsets[index + 1])])
+
+    def copy(self) -> List:
+        return list(self)
+
+
+class MappedPositions(Mapping):
+    """Identifiant de question → position dans l'index plat, par dichotomie sur id_sorted"""
+
+    def __init__(self, ids: MappedRecords, id_sorted: np.ndarray):
+        self._ids = ids
+        self._sorted = id_sorted
+
+    def __getitem__(self, question_id) -> int:
+        if not isinstance(question_id, str):
+            raise KeyError(question_id)
+        low, high = 0, len(self._sorted)
+        while low < high:
+            middle = (low + high) // 2
+            if self._ids[int(self._sorted[middle])] < question_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self._sorted):
+            position = int(self._sorted[low])
+            if self._ids[position] == question_id:
+                return position
+        raise KeyError(question_id)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class MappedQuestionIndex(Mapping):
+    """Équivalent de QuizManager.questions_by_id sur l'image (ordre de l'index plat)"""
+
+    def __init__(self, questions: MappedRecords, positions: MappedPositions):
+        self._questions = questions
+        self._positions = positions
+
+    def __getitem__(self, question_id) -> Dict:
+        return self._questions[self._positions[question_id]]
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def __len__(self) -> int:
+        return len(self._questions)
+
+
+class SharedBank:
+    """Image de la banque projetée en lecture seule"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self._mmap, 'madvise'):
+            self._mmap.madvise(mmap.MADV_RANDOM)  # Accès dispersés : pas de lecture anticipée
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} n'est pas une image de banque")
+        length = int.from_bytes(self._mmap[len(MAGIC):len(MAGIC) + 8], 'little')
+        self.manifest = json.loads(self._mmap[len(MAGIC) + 8:len(MAGIC) + 8 + length])
+
+        questions = MappedRecords(self._mmap, self._array('question_offsets', np.uint64), self._section('question_blob'))
+        ids = MappedRecords(self._mmap, self._array('id_offsets', np.uint64), self._section('id_blob'),
+                            decode=lambda raw: raw.decode('utf-8'))
+        cases = MappedRecords(self._mmap, self._array('case_offsets', np.uint64), self._section('case_blob'))
+
+        self.flat_ids = ids
+        self.positions = MappedPositions(ids, self._array('id_sorted', np.int64))
+        self.questions_by_id = MappedQuestionIndex(questions, self.positions)
+        self.blocks = {}
+        self.quizzes = {}
+        self.clinical_cases = {}
+        question_start = case_start = 0
+        for specialty, num_questions, num_cases in self.manifest['specialties']:
+            self.blocks[specialty] = (question_start, question_start + num_questions)
+            self.quizzes[specialty] = self._slice(questions, question_start, num_questions)
+            self.clinical_cases[specialty] = self._slice(cases, case_start, num_cases)
+            question_start += num_questions
+            case_start += num_cases
+
+    def _section(self, name: str) -> int:
+        return self.manifest['sections'][name][0]
+
+    def _array(self, name: str, dtype) -> np.ndarray:
+        position, size = self.manifest['sections'][name]
+        return np.frombuffer(self._mmap, dtype=dtype, count=size // np.dtype(dtype).itemsize, offset=position)
+
+    @staticmethod
+    def _slice(records: MappedRecords, start: int, count: int) -> MappedRecords:
+        return MappedRecords(records._buffer, records._offsets[start:start + count + 1], records._base, records._decode)
+
+    def matches(self, data_dir: str) -> bool:
+        """L'image a été construite à partir de ce dossier, dans son état actuel"""
+        return (self.manifest['source'] == os.path.realpath(data_dir)
+                and self.manifest['fingerprint'] == source_fingerprint(data_dir))
+
+
+def open_bank(path: str, data_dir: str) -> Optional[SharedBank]:
+    """Image projetée, ou None si absente, illisible ou périmée (la banque est alors relue depuis data_dir)"""
+    try:
+        bank = SharedBank(path)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Image de banque {path} inutilisable: {e}")
+        return None
+    if not bank.matches(data_dir):
+        print(f"⚠️ Image de banque {path} périmée pour {data_dir}")
+        return None
+    return bank
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from utils.statements import execute
+
+# Algorithme SM-2 : qualité de réponse de 0 (oubli total) à 5 (réponse parfaite)
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+
+
+def answer_quality(chosen_mask: int, correct_mask: int) -> int:
+    """Qualité SM-2 déduite de la sélection : parfaite 4, partielle sans erreur 3, fausse 1"""
+    if chosen_mask == correct_mask:
+        return 4
+    if chosen_mask & correct_mask and not chosen_mask & ~correct_mask:
+        return 3
+    return 1
+
+
+def sm2_update(state: Optional[Tuple[int, float, float, int]], quality: int, now: datetime):
+    """Nouvel état (repetitions, interval_days, ease, lapses, due_at) après une révision"""
+    repetitions, interval, ease, lapses = state or (0, 0.0, INITIAL_EASE, 0)
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+    if quality < 3:
+        repetitions, interval, lapses = 0, 1.0, lapses + 1
+    else:
+        repetitions += 1
+        interval = 1.0 if repetitions == 1 else 6.0 if repetitions == 2 else round(interval * ease, 1)
+
+    return repetitions, interval, ease, lapses, now + timedelta(days=interval)
+
+
+def update_review_states(cur, rows: List[tuple], correct_masks: Dict[str, int], now: Optional[datetime] = None):
+    """Applique un lot de réponses (user_id, question_id, chosen_mask, ...) aux états de révision :
+    une lecture des états concernés puis une écriture groupée, dans la transaction du curseur"""
+    if not rows:
+        return
+    from psycopg2.extras import execute_values
+    now = now or datetime.now()
+
+    keys = sorted({(row[0], row[1]) for row in rows})
+    states = dict(((user_id, question_id), state) for user_id, question_id, *state in execute_values(cur, """
+        SELECT r.user_id, r.question_id, r.repetitions, r.interval_days, r.ease, r.lapses
+        FROM review_states r
+        JOIN (VALUES %s) AS k (user_id, question_id)
+          ON r.user_id = k.user_id AND r.question_id = k.question_id
+    """, keys, template="(%s::int, %s::varchar)", fetch=True))
+
+    updated = {}
+    for user_id, question_id, chosen_mask, *_ in rows:
+        key = (user_id, question_id)
+        new_state = sm2_update(states.get(key), answer_quality(chosen_mask, correct_masks[question_id]), now)
+        states[key] = new_state[:4]
+        updated[key] = new_state
+
+    execute_values(cur, """
+        INSERT INTO review_states (user_id, question_id, repetitions, interval_days, ease, lapses, due_at, last_reviewed_at)
+        VALUES %s
+        ON CONFLICT (user_id, question_id) DO UPDATE SET
+            repetitions = EXCLUDED.repetitions,
+            interval_days = EXCLUDED.interval_days,
+            ease = EXCLUDED.ease,
+            lapses = EXCLUDED.lapses,
+            due_at = EXCLUDED.due_at,
+            last_reviewed_at = EXCLUDED.last_reviewed_at
+    """, [key + state + (now,) for key, state in updated.items()], page_size=1000)
+
+
+def due_question_ids(cur, user_id: int, limit: int, prefix: Optional[str] = None, now: Optional[datetime] = None) -> List[str]:
+    """Questions à réviser, les plus en retard d'abord (parcours d'index (user_id, due_at) sans accès à la table)"""
+    execute(cur, 'due_question_ids', (user_id, now or datetime.now(), prefix, f"{prefix}%", limit))
+    return [row[0] for row in cur.fetchall()]
+
+
+def reviewed_question_ids(cur, user_id: int, prefix: Optional[str] = None) -> List[str]:
+    """Toutes les questions déjà vues par l'utilisateur (préfixe de spécialité), par échéance croissante"""
+    execute(cur, 'reviewed_question_ids', (user_id, prefix, f"{prefix}%"))
+    return [row[0] for row in cur.fetchall()]
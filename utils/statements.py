@@ -0,0 +1,262 @@
+import re
+
+# Catalogue des requêtes exécutées à chaque page ou écriture (database.py, badge_system.py, la
+# révision espacée et les écritures incrémentales de utils/). Sur les connexions de pool (DatabaseManager(pooled=True),
+# AsyncDatabaseManager), toutes sont préparées côté serveur une fois, au premier emprunt de la
+# connexion (PREPARE) : chaque appel n'envoie plus que EXECUTE nom (paramètres), sans nouvelle
+# analyse ni planification du texte SQL. Les connexions ouvertes pour un seul appel exécutent le
+# texte tel quel, de même que le DDL, les lots execute_values et les requêtes construites à la
+# volée (règles de badges ensemblistes, reconstructions).
+
+# Compteurs maintenus par utilisateur dans la table user_counters (ordre des colonnes retournées)
+COUNTER_METRICS = ("total_score", "quiz_count", "simulation_count", "best_percentage", "competition_wins",
+                   "fast_correct")
+
+COUNTERS_COLUMNS = ", ".join(COUNTER_METRICS)
+
+STATEMENTS = {
+    # Utilisateurs
+    'user_id': "SELECT id FROM users WHERE username = %s",
+    'user_insert': """
+        INSERT INTO users (username, email, specialty) VALUES (%s, %s, %s)
+        ON CONFLICT (username) DO NOTHING RETURNING id
+    """,
+    'user_upsert': """
+        INSERT INTO users (username, email, specialty) VALUES (%s, %s, %s)
+        ON CONFLICT (username) DO UPDATE SET specialty = EXCLUDED.specialty RETURNING id
+    """,
+
+    # Écritures d'un score
+    'score_insert': """
+        INSERT INTO scores (user_id, specialty, score, total_questions, time_taken, answer_order, answer_times)
+        VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id, score
+    """,
+    'case_score_insert': """
+        INSERT INTO scores (user_id, specialty, score, total_questions, time_taken, case_title)
+        VALUES (%s, %s, %s, %s, %s, %s) RETURNING id
+    """,
+    # Identifiant de la transaction ajouté à la charge utile : voir LiveRanking._load_snapshot
+    'notify_score': "SELECT pg_notify(%s, (%s::jsonb || to_jsonb(txid_current()))::text)",
+    'daily_score': """
+        INSERT INTO user_daily_stats (user_id, day, specialty, quiz_count, score_sum, score_sumsq, time_sum)
+        VALUES (%s, CURRENT_DATE, %s, 1, %s, %s, %s)
+        ON CONFLICT (user_id, day, specialty) DO UPDATE SET
+            quiz_count = user_daily_stats.quiz_count + 1,
+            score_sum = user_daily_stats.score_sum + EXCLUDED.score_sum,
+            score_sumsq = user_daily_stats.score_sumsq + EXCLUDED.score_sumsq,
+            time_sum = user_daily_stats.time_sum + EXCLUDED.time_sum
+    """,
+    # Incréments nuls sans effet ; best_percentage NULL conservé par GREATEST (qui ignore NULL)
+    'counters_upsert': f"""
+        INSERT INTO user_counters (user_id, {COUNTERS_COLUMNS})
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_score = user_counters.total_score + EXCLUDED.total_score,
+            quiz_count = user_counters.quiz_count + EXCLUDED.quiz_count,
+            simulation_count = user_counters.simulation_count + EXCLUDED.simulation_count,
+            best_percentage = GREATEST(user_counters.best_percentage, EXCLUDED.best_percentage),
+            competition_wins = user_counters.competition_wins + EXCLUDED.competition_wins,
+            fast_correct = user_counters.fast_correct + EXCLUDED.fast_correct,
+            updated_at = CURRENT_TIMESTAMP
+        RETURNING {COUNTERS_COLUMNS}
+    """,
+    'user_counters': f"""
+        SELECT c.user_id, {COUNTERS_COLUMNS}
+        FROM user_counters c
+        JOIN users u ON c.user_id = u.id
+        WHERE u.username = %s
+    """,
+    'badge_insert': """
+        INSERT INTO badges (user_id, badge_type) VALUES (%s, %s)
+        ON CONFLICT (user_id, badge_type) DO NOTHING RETURNING badge_type
+    """,
+
+    # Simulations ECN
+    'ecn_simulation_insert': """
+        INSERT INTO ecn_simulations
+        (user_id, simulation_id, score, max_score, percentage, duration, passed, grade, simulation_data)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """,
+    'ecn_best': """
+        INSERT INTO ecn_best_scores (user_id, best_percentage) VALUES (%s, %s)
+        ON CONFLICT (user_id) DO UPDATE SET
+            best_percentage = EXCLUDED.best_percentage,
+            achieved_at = CURRENT_TIMESTAMP
+        WHERE ecn_best_scores.best_percentage < EXCLUDED.best_percentage
+        RETURNING user_id
+    """,
+    'leaderboard_version_bump': """
+        INSERT INTO leaderboard_versions (name, version) VALUES (%s, 1)
+        ON CONFLICT (name) DO UPDATE SET version = leaderboard_versions.version + 1
+    """,
+    'leaderboard_version': "SELECT version FROM leaderboard_versions WHERE name = %s",
+
+    # Classements
+    'leaderboard': """
+        SELECT u.username, SUM(s.score) as total_score, COUNT(s.id) as quizzes_taken
+        FROM scores s
+        JOIN users u ON s.user_id = u.id
+        GROUP BY u.username
+        ORDER BY total_score DESC
+        LIMIT %s
+    """,
+    'specialty_leaderboard': """
+        SELECT u.username, SUM(s.score) as total_score, COUNT(s.id) as quizzes_taken
+        FROM scores s
+        JOIN users u ON s.user_id = u.id
+        WHERE s.specialty = %s
+        GROUP BY u.username
+        ORDER BY total_score DESC
+        LIMIT %s
+    """,
+    'ecn_top': """
+        SELECT b.user_id, u.username, b.best_percentage
+        FROM ecn_best_scores b
+        JOIN users u ON b.user_id = u.id
+        ORDER BY b.best_percentage DESC, b.achieved_at
+        LIMIT %s
+    """,
+    'ecn_leaderboard_stats': """
+        SELECT
+            user_id,
+            CAST(AVG(percentage) AS DECIMAL(5,2)) as avg_score,
+            COUNT(id) as simulations_count,
+            MIN(created_at) as first_simulation,
+            MAX(created_at) as last_simulation
+        FROM ecn_simulations
+        WHERE user_id = ANY(%s)
+        GROUP BY user_id
+    """,
+
+    # Profil et analytics
+    'progress_by_specialty': """
+        SELECT d.specialty, SUM(d.score_sum)::float / SUM(d.quiz_count) as avg_score,
+            SUM(d.quiz_count) as quiz_count, SUM(d.score_sum) as total_score,
+            SUM(d.time_sum)::float / SUM(d.quiz_count) as avg_time
+        FROM user_daily_stats d
+        JOIN users u ON d.user_id = u.id
+        WHERE u.username = %s
+        GROUP BY d.specialty
+        ORDER BY avg_score DESC
+    """,
+    'progress_timeline': """
+        SELECT d.day as date, SUM(d.score_sum)::float / SUM(d.quiz_count) as daily_avg,
+            SUM(d.quiz_count) as daily_quizzes
+        FROM user_daily_stats d
+        JOIN users u ON d.user_id = u.id
+        WHERE u.username = %s
+        GROUP BY d.day
+        ORDER BY date
+    """,
+    'global_stats': """
+        SELECT COALESCE(SUM(d.quiz_count), 0), SUM(d.score_sum),
+            SUM(d.score_sum)::float / NULLIF(SUM(d.quiz_count), 0),
+            MIN(d.day), MAX(d.day)
+        FROM user_daily_stats d
+        JOIN users u ON d.user_id = u.id
+        WHERE u.username = %s
+    """,
+    'response_times': """
+        SELECT r.question_id, r.correct, r.latency_ms
+        FROM question_responses r
+        JOIN users u ON r.user_id = u.id
+        WHERE u.username = %s AND r.latency_ms IS NOT NULL
+        ORDER BY r.created_at DESC
+        LIMIT %s
+    """,
+    'user_badges': """
+        SELECT b.badge_type
+        FROM badges b
+        JOIN users u ON b.user_id = u.id
+        WHERE u.username = %s
+    """,
+    'ecn_user_stats': """
+        SELECT
+            COUNT(*) as total_simulations,
+            CAST(AVG(e.percentage) AS DECIMAL(5,2)) as average_score,
+            CAST(MAX(e.percentage) AS DECIMAL(5,2)) as best_score,
+            CAST(MIN(e.percentage) AS DECIMAL(5,2)) as worst_score,
+            CAST(AVG(e.duration) AS INTEGER) as average_time,
+            SUM(CASE WHEN e.passed = true THEN 1 ELSE 0 END) as passed_count,
+            MIN(e.created_at) as first_simulation,
+            MAX(e.created_at) as last_simulation
+        FROM ecn_simulations e
+        WHERE e.user_id = %s
+    """,
+    'user_recommendations': """
+        SELECT r.recommendations
+        FROM user_recommendations r
+        JOIN users u ON r.user_id = u.id
+        WHERE u.username = %s
+    """,
+
+    # Révision espacée (QuizManager.get_due_questions)
+    'due_question_ids': """
+        SELECT question_id
+        FROM review_states
+        WHERE user_id = %s AND due_at <= %s AND (%s::text IS NULL OR question_id LIKE %s)
+        ORDER BY due_at
+        LIMIT %s
+    """,
+    'reviewed_question_ids': """
+        SELECT question_id
+        FROM review_states
+        WHERE user_id = %s AND (%s::text IS NULL OR question_id LIKE %s)
+        ORDER BY due_at
+    """,
+
+    # Tirages signés de l'API consommés (utils/draw_ledger.py)
+    'draw_consume': """
+        INSERT INTO consumed_draws (draw_id) VALUES (%s)
+        ON CONFLICT (draw_id) DO NOTHING RETURNING draw_id
+    """,
+    'draw_purge': "DELETE FROM consumed_draws WHERE consumed_at < CURRENT_TIMESTAMP - make_interval(secs => %s)",
+
+    # Diagnostic (DatabaseManager.debug_user_stats)
+    'debug_user': "SELECT id, username, created_at FROM users WHERE username = %s",
+    'debug_scores': "SELECT COUNT(*), MAX(created_at) FROM scores WHERE user_id = %s",
+    'debug_simulations': "SELECT COUNT(*), MAX(created_at) FROM ecn_simulations WHERE user_id = %s",
+}
+
+
+def _numbered(sql: str) -> str:
+    """Paramètres %s → $1, $2… (syntaxe de PREPARE)"""
+    counter = iter(range(1, sql.count('%s') + 1))
+    return re.sub(r'%s', lambda _: f"${next(counter)}", sql)
+
+
+def _execute_sql(name: str, sql: str) -> str:
+    count = sql.count('%s')
+    return f"EXECUTE {name} ({', '.join(['%s'] * count)})" if count else f"EXECUTE {name}"
+
+
+# Lot de préparation envoyé en un aller-retour, et EXECUTE correspondants
+PREPARE_SQL = ";\n".join(f"PREPARE {name} AS {_numbered(sql).strip()}" for name, sql in STATEMENTS.items())
+EXECUTE_STATEMENTS = {name: _execute_sql(name, sql) for name, sql in STATEMENTS.items()}
+
+
+def query(conn, name: str) -> str:
+    """Texte à envoyer pour la requête `name` : EXECUTE si elle est préparée sur la connexion"""
+    if getattr(conn, 'statements_prepared', False):
+        return EXECUTE_STATEMENTS[name]
+    return STATEMENTS[name]
+
+
+def execute(cur, name: str, params=()):
+    """cur.execute de la requête `name` du catalogue"""
+    cur.execute(query(cur.connection, name), params)
+
+
+def prepare_statements(conn) -> bool:
+    """Prépare tout le catalogue sur une connexion synchrone (transaction validée).
+    En cas d'échec (schéma pas encore créé, pooler en mode transaction), la connexion
+    exécutera le texte SQL."""
+    try:
+        with conn.cursor() as cur:
+            cur.execute(PREPARE_SQL)
+        conn.commit()
+        return True
+    except Exception as e:
+        conn.rollback()
+        print(f"⚠️ Requêtes préparées indisponibles, texte SQL utilisé: {e}")
+        return False
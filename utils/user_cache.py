@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+from config import CacheConfig
+
+
+class UserCache:
+    """Cache de lecture par utilisateur partagé par les sessions du processus.
+
+    Chaque entrée est associée à la version d'écriture de l'utilisateur au moment du
+    chargement : invalidate() attribue une nouvelle version à l'utilisateur, ce qui périme
+    toutes ses entrées, y compris celles d'un chargement en cours. Le TTL borne le retard
+    face aux écritures faites par d'autres processus.
+
+    La mémoire est bornée à user_cache_size utilisateurs (entrées et versions, les moins
+    récents évincés en premier) ; les entrées expirées sont retirées à la lecture. Un
+    utilisateur sans version conservée a la plus grande version évincée : un chargement
+    commencé avant une éviction n'est donc jamais mis en cache avec une version périmée."""
+
+    def __init__(self, config: Optional[CacheConfig] = None):
+        self.config = config or CacheConfig()
+        self._entries = OrderedDict()
+        self._versions = OrderedDict()
+        self._clock = 0
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def _version(self, username: str) -> int:
+        return self._versions.get(username, self._floor)
+
+    def _evict(self):
+        size = self.config.user_cache_size
+        while len(self._entries) > size:
+            self._entries.popitem(last=False)
+        while len(self._versions) > size:
+            _, version = self._versions.popitem(last=False)
+            self._floor = max(self._floor, version)
+
+    def lookup(self, username: str, dataset: str) -> Tuple[int, Any]:
+        """(version, donnée en cache ou None) ; la version est à repasser à store() après chargement"""
+        with self._lock:
+            version = self._version(username)
+            datasets = self._entries.get(username, {})
+            entry = datasets.get(dataset)
+            if entry and entry[0] == version and entry[1] > time.monotonic():
+                return version, entry[2]
+            if entry:
+                del datasets[dataset]
+                if not datasets:
+                    del self._entries[username]
+            return version, None
+
+    def store(self, username: str, dataset: str, version: int, value):
+        """Met en cache une donnée chargée hors de get() (ignorée si None ou si l'utilisateur a écrit entre-temps)"""
+        if value is None:
+            return
+        with self._lock:
+            if self._version(username) == version:
+                self._entries.setdefault(username, {})[dataset] = (version, time.monotonic() + self.config.user_ttl, value)
+                self._entries.move_to_end(username)
+                self._evict()
+
+    def get(self, username: str, dataset: str, loader: Callable):
+        """Retourne la donnée en cache ou l'obtient via loader() (résultat None non mis en cache)"""
+        version, value = self.lookup(username, dataset)
+        if value is not None:
+            return value
+
+        value = loader()
+        self.store(username, dataset, version, value)
+        return value
+
+    def invalidate(self, username: str):
+        """À appeler après toute écriture concernant l'utilisateur (score, simulation, badge)"""
+        with self._lock:
+            self._clock += 1
+            self._versions[username] = self._clock
+            self._versions.move_to_end(username)
+            self._entries.pop(username, None)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
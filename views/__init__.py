@@ -0,0 +1,21 @@
+"""Pages de l'application, importées à la première visite seulement.
+
+Chaque module expose ``render()`` ; app.py n'importe que la page choisie, si bien
+qu'un rerun de l'accueil ne charge ni plotly ni le simulateur ECN."""
+import importlib
+
+PAGES = {
+    "Accueil": "home",
+    "Mode Quiz": "quiz",
+    "Dossiers Cliniques Progressifs": "clinical_cases",
+    "Mode Compétition": "competition",
+    "🏆 Simulations ECN": "ecn",
+    "Classement": "leaderboard",
+    "Bibliothèque de Ressources": "resources",
+    "Profil et Badges": "profile",
+}
+
+
+def load_page(label: str):
+    """Module de la page (mis en cache par sys.modules après le premier import)"""
+    return importlib.import_module(f"{__name__}.{PAGES[label]}")
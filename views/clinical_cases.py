@@ -0,0 +1,287 @@
+"""Dossiers cliniques progressifs"""
+import streamlit as st
+from views.common import init_managers
+
+
+def render():
+    db, quiz_mgr, _ = init_managers()
+
+    st.markdown("## 💼 Dossiers Cliniques Progressifs")
+    
+    if not st.session_state.username:
+        st.warning("Veuillez entrer votre nom d'utilisateur dans la page d'accueil")
+        st.stop()
+    
+    specialty = st.selectbox("Choisir une spécialité", quiz_mgr.get_specialties(), key="clinical_specialty")
+    
+    if st.button("📂 Charger un nouveau dossier clinique"):
+        clinical_case = quiz_mgr.get_progressive_clinical_case(specialty)
+        if clinical_case:
+            st.session_state.clinical_case = clinical_case
+            st.session_state.current_step = 0
+            st.session_state.case_answers = []
+            st.session_state.case_finished = False
+            st.session_state.case_results = None
+            st.session_state.score_saved = False
+        else:
+            st.error("Aucun dossier clinique disponible pour cette spécialité")
+    
+    if 'clinical_case' in st.session_state and not st.session_state.get('case_finished', False):
+        if 'clinical_case' not in st.session_state or st.session_state.clinical_case is None:
+            st.warning("Aucun dossier clinique chargé. Cliquez sur '📂 Charger un nouveau dossier clinique'.")
+            st.stop()
+        case = st.session_state.clinical_case
+        current_step = st.session_state.current_step
+        
+        st.markdown(f"### {case['title']}")
+        st.markdown(f"**Difficulté:** {case.get('difficulty', 'Non spécifiée')}")
+        
+        # Barre de progression
+        total_steps = len(case['steps'])
+        progress = current_step / total_steps
+        st.progress(progress)
+        st.write(f"Étape {current_step + 1} sur {total_steps}")
+        
+        # Affichage progressif
+        if current_step < len(case['steps']):
+            step = case['steps'][current_step]
+            
+            st.markdown(f"#### {step['title']}")
+            st.markdown(step['content'])
+            
+            # Initialiser la réponse si elle n'existe pas encore
+            current_answer_exists = any(ans['step'] == current_step for ans in st.session_state.case_answers)
+            
+            if 'question' in step:
+                st.markdown("---")
+                st.markdown(f"**❓ Question:** {step['question']}")
+                
+                if step.get('type') == 'multiple_choice':
+                    options = step['options']
+                    default_index = 0
+                    if current_answer_exists:
+                        existing_answer = next(ans for ans in st.session_state.case_answers if ans['step'] == current_step)
+                        if existing_answer['answer'] in options:
+                            default_index = options.index(existing_answer['answer'])
+                    
+                    answer = st.radio("Choisissez votre réponse:", options, key=f"step_{current_step}", index=default_index)
+                
+                elif step.get('type') == 'multiple':
+                    options = step['options']
+                    default_selection = []
+                    if current_answer_exists:
+                        existing_answer = next(ans for ans in st.session_state.case_answers if ans['step'] == current_step)
+                        default_selection = existing_answer['answer'] if isinstance(existing_answer['answer'], list) else [existing_answer['answer']]
+                    
+                    answer = st.multiselect("Sélectionnez une ou plusieurs réponses:", options, key=f"step_{current_step}", default=default_selection)
+                
+                elif step.get('type') == 'text':
+                    default_text = ""
+                    if current_answer_exists:
+                        existing_answer = next(ans for ans in st.session_state.case_answers if ans['step'] == current_step)
+                        default_text = existing_answer['answer']
+                    
+                    answer = st.text_area("Votre analyse:", key=f"step_{current_step}", height=150, value=default_text)
+                
+                else:
+                    default_text = ""
+                    if current_answer_exists:
+                        existing_answer = next(ans for ans in st.session_state.case_answers if ans['step'] == current_step)
+                        default_text = existing_answer['answer']
+                    
+                    answer = st.text_input("Votre réponse:", key=f"step_{current_step}", value=default_text)
+            else:
+                answer = None
+            
+            col1, col2, col3 = st.columns([1, 1, 1])
+            
+            with col1:
+                if current_step > 0 and st.button("⬅️ Étape précédente"):
+                    # Sauvegarder la réponse actuelle avant de changer d'étape
+                    if answer is not None:
+                        existing_answer_index = next((i for i, ans in enumerate(st.session_state.case_answers) 
+                                                   if ans['step'] == current_step), -1)
+                        
+                        if existing_answer_index >= 0:
+                            st.session_state.case_answers[existing_answer_index]['answer'] = answer
+                        else:
+                            st.session_state.case_answers.append({
+                                'step': current_step, 
+                                'answer': answer
+                            })
+                    
+                    st.session_state.current_step -= 1
+                    st.rerun()
+            
+            with col2:
+                if answer is not None and st.button("💾 Sauvegarder cette étape"):
+                    # Sauvegarder la réponse
+                    existing_answer_index = next((i for i, ans in enumerate(st.session_state.case_answers) 
+                                               if ans['step'] == current_step), -1)
+                    
+                    if existing_answer_index >= 0:
+                        st.session_state.case_answers[existing_answer_index]['answer'] = answer
+                    else:
+                        st.session_state.case_answers.append({
+                            'step': current_step, 
+                            'answer': answer
+                        })
+                    
+                    st.success("Réponse sauvegardée!")
+            
+            with col3:
+                if current_step < len(case['steps']) - 1:
+                    if st.button("Étape suivante ➡️"):
+                        # Sauvegarder la réponse actuelle avant de changer d'étape
+                        if answer is not None:
+                            existing_answer_index = next((i for i, ans in enumerate(st.session_state.case_answers) 
+                                                       if ans['step'] == current_step), -1)
+                            
+                            if existing_answer_index >= 0:
+                                st.session_state.case_answers[existing_answer_index]['answer'] = answer
+                            else:
+                                st.session_state.case_answers.append({
+                                    'step': current_step, 
+                                    'answer': answer
+                                })
+                        
+                        st.session_state.current_step += 1
+                        st.rerun()
+                else:
+                    if st.button("✅ Terminer le dossier"):
+                        # Sauvegarder la dernière réponse
+                        if answer is not None:
+                            existing_answer_index = next((i for i, ans in enumerate(st.session_state.case_answers) 
+                                                       if ans['step'] == current_step), -1)
+                            
+                            if existing_answer_index >= 0:
+                                st.session_state.case_answers[existing_answer_index]['answer'] = answer
+                            else:
+                                st.session_state.case_answers.append({
+                                    'step': current_step, 
+                                    'answer': answer
+                                })
+                        
+                        # Calculer les résultats
+                        st.session_state.case_results = quiz_mgr.calculate_clinical_case_score(
+                            case, st.session_state.case_answers
+                        )
+                        st.session_state.case_finished = True
+                        st.rerun()
+    
+    # Affichage des résultats
+    elif st.session_state.get('case_finished', False) and st.session_state.get('case_results'):
+        case = st.session_state.clinical_case
+        results = st.session_state.case_results
+        
+        st.markdown("## 📊 Résultats du Dossier Clinique")
+        
+        # Score global
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("📈 Score", f"{results['score_percentage']:.1f}%")
+        with col2:
+            st.metric("✅ Réponses correctes", f"{results['correct_steps']}/{results['total_steps']}")
+        with col3:
+            performance = "Excellent" if results['score_percentage'] >= 80 else "Bon" if results['score_percentage'] >= 60 else "À revoir"
+            st.metric("🎯 Performance", performance)
+        
+        # Sauvegarder le score et vérifier les badges
+        if not st.session_state.get('score_saved', False):
+            # Sauvegarder le score (les badges sont attribués dans la même transaction)
+            new_badges = []
+            success = db.save_clinical_case_score(
+                st.session_state.username,
+                specialty,
+                case['title'],
+                results['score_percentage'],
+                results['total_steps'],
+                results['correct_steps'],
+                awarded_badges=new_badges
+            )
+            if success:
+                st.session_state.score_saved = True
+                
+                if new_badges:
+                    st.balloons()
+                    st.success("🎖️ Nouveaux badges débloqués!")
+                    for badge in new_badges:
+                        st.markdown(f'<span class="badge badge-gold">{badge}</span>', unsafe_allow_html=True)
+        
+        # Feedback détaillé
+        st.markdown("### 📝 Détail des réponses")
+        
+        for feedback in results['detailed_feedback']:
+            with st.expander(f"Étape {feedback['step'] + 1}: {feedback['title']}"):
+                st.markdown(f"**Question:** {feedback['question']}")
+                
+                col_a, col_b = st.columns(2)
+                
+                with col_a:
+                    st.markdown("**Votre réponse:**")
+                    if isinstance(feedback['user_answer'], list):
+                        if feedback['user_answer']:
+                            for ans in feedback['user_answer']:
+                                st.write(f"- {ans}")
+                        else:
+                            st.write("Aucune réponse sélectionnée")
+                    else:
+                        st.write(feedback['user_answer'])
+                
+                with col_b:
+                    st.markdown("**Réponse attendue:**")
+                    st.write(feedback['correct_answer'])
+                
+                st.markdown("**Explication:**")
+                st.info(feedback['explanation'])
+                
+                if feedback['is_correct']:
+                    st.success("✅ Bonne réponse!")
+                else:
+                    st.error("❌ Réponse incorrecte")
+        
+        # Solution complète
+        st.markdown("### 🎯 Solution et Discussion Complète")
+        st.markdown(case.get('solution', 'Aucune solution disponible.'))
+        
+        # Recommandations
+        st.markdown("### 📚 Points à revoir")
+        if results['score_percentage'] < 60:
+            st.warning("""
+            **Recommandations:**
+            - Revoyez les concepts fondamentaux de cette spécialité
+            - Consultez les ressources de la bibliothèque
+            - Entraînez-vous avec d'autres dossiers similaires
+            """)
+        elif results['score_percentage'] < 80:
+            st.info("""
+            **Recommandations:**
+            - Bonne maîtrise générale
+            - Travaillez les points spécifiques où vous avez fait des erreurs
+            - Poursuivez votre entraînement avec des dossiers plus complexes
+            """)
+        else:
+            st.success("""
+            **Recommandations:**
+            - Excellente performance!
+            - Vous maîtrisez bien ce sujet
+            - Passez à des dossiers de difficulté supérieure
+            """)
+        
+        # Boutons d'action
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("📋 Nouveau dossier clinique"):
+                for key in ['clinical_case', 'current_step', 'case_answers', 'case_finished', 'case_results', 'score_saved']:
+                    if key in st.session_state:
+                        del st.session_state[key]
+                st.rerun()
+        
+        with col2:
+            if st.button("🔄 Refaire le même dossier"):
+                st.session_state.current_step = 0
+                st.session_state.case_answers = []
+                st.session_state.case_finished = False
+                st.session_state.case_results = None
+                st.session_state.score_saved = False
+                st.rerun()
@@ -0,0 +1,103 @@
+"""Ressources partagées par les pages : créées une fois par processus et réutilisées à chaque rerun"""
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+from database import DatabaseManager
+from utils.quiz_manager import QuizManager
+from utils.badge_system import BadgeManager
+
+CSS = """
+<style>
+    .main-header {
+        font-size: 2.5rem;
+        color: #1f77b4;
+        text-align: center;
+        margin-bottom: 2rem;
+    }
+    .badge {
+        display: inline-block;
+        padding: 0.25em 0.6em;
+        font-size: 0.75em;
+        font-weight: 700;
+        line-height: 1;
+        text-align: center;
+        white-space: nowrap;
+        vertical-align: baseline;
+        border-radius: 0.375rem;
+        background-color: #6c757d;
+        color: white;
+        margin: 0.1rem;
+    }
+    .badge-gold { background-color: #ffd700; color: black; }
+    .badge-silver { background-color: #c0c0c0; color: black; }
+    .badge-bronze { background-color: #cd7f32; color: white; }
+    .quiz-question {
+        background-color: #f8f9fa;
+        padding: 1.5rem;
+        border-radius: 0.5rem;
+        margin-bottom: 1rem;
+        border-left: 4px solid #1f77b4;
+    }
+</style>
+"""
+
+
+@st.cache_resource
+def init_managers():
+    db = DatabaseManager()
+    db.init_database()
+    quiz_mgr = QuizManager()
+    badge_mgr = BadgeManager()
+    return db, quiz_mgr, badge_mgr
+
+
+@st.cache_resource(ttl=3600)
+def init_item_bank():
+    from utils.adaptive_simulator import ItemBank
+    db, quiz_mgr, _ = init_managers()
+    return ItemBank.from_database(quiz_mgr, db)
+
+
+@st.cache_resource
+def init_live_ranking():
+    """Classements en direct du processus (thread LISTEN démarré à la première utilisation)"""
+    from utils.live_ranking import live_ranking
+    db, _, _ = init_managers()
+    return live_ranking.start(db)
+
+
+@st.cache_resource
+def init_analytics():
+    from utils.analytics import Analytics
+    return Analytics()
+
+
+def rerun_fragment():
+    """Relance seulement le fragment courant ; relance toute la page si le fragment
+    s'exécute dans un rerun complet (premier affichage, tests sans navigateur)"""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+
+def complete_ecn_simulation(simulator, session, answers, username, time_taken):
+    """Corrige la simulation terminée : localement, ou via le lot de l'examen de cohorte.
+    N'accède pas au session state : peut être appelée par le planificateur d'échéances"""
+    if session.get('mode') == 'cohort':
+        from utils.cohort_exam import CohortExam
+        db, _, _ = init_managers()
+        exam = CohortExam.get(db, simulator, session['id'])
+        if exam is None:
+            st.error(f"❌ Examen de cohorte {session['id']} introuvable")
+            return None  # _show_ecn_results signale l'échec de la correction
+        results_data = exam.submit(username, answers, time_taken).result(timeout=60)
+        results_data['user_answers'] = answers
+        return results_data
+    
+    results = simulator.calculate_ecn_score(answers, session['questions'])
+    return {
+        'session': session,
+        'results': results,
+        'time_taken': time_taken,
+        'user_answers': answers
+    }
@@ -0,0 +1,451 @@
+"""Mode Compétition : 50 questions en 10 minutes, en solo ou en salle synchronisée.
+
+Une salle partage tirage, départ et échéance entre tous ses joueurs ; son tableau de
+scores est tenu en mémoire dans le worker qui l'a ouverte et enregistré en une fois à
+l'échéance. Un joueur servi par un autre worker est renvoyé vers celui de la salle
+(lien /<worker>/?room=CODE, routé par nginx)."""
+from urllib.parse import urlencode
+import streamlit as st
+from config import AppConfig, WorkerConfig
+from utils.answer_timing import AnswerClock
+from utils.competition_room import CompetitionRoom, answer_points
+from utils.deadlines import start_timed_run
+from views.common import init_live_ranking, init_managers, rerun_fragment
+
+
+def render():
+    db, quiz_mgr, _ = init_managers()
+
+    st.markdown("## 🏆 Mode Compétition")
+    
+    # Joueur renvoyé depuis un autre worker : même nom d'utilisateur que sur la page d'origine
+    if "room" in st.query_params and not st.session_state.username:
+        st.session_state.username = st.query_params.get("user", "")
+    
+    if not st.session_state.username:
+        st.warning("Veuillez entrer votre nom d'utilisateur dans la page d'accueil")
+        st.stop()
+    
+    st.markdown("""
+    ### Défi Chronométré
+    
+    Dans ce mode, vous avez **10 minutes** pour répondre au maximum de questions.
+    Chaque bonne réponse rapporte des points, mais les mauvaises réponses en retirent!
+    
+    **Règles:**
+    - ⏱️ 10 minutes maximum
+    - ✅ Bonne réponse: +2 points
+    - ❌ Mauvaise réponse: -1 point
+    - ⏭️ Passer une question: 0 point
+    """)
+    
+    if st.radio("Mode de jeu", ["👤 Solo", "👥 Salle synchronisée"], horizontal=True, key="comp_play_mode",
+                index=1 if "room" in st.query_params else 0) != "👤 Solo":
+        _render_room(db, quiz_mgr, st.session_state.username)
+        return
+    
+    # Initialiser l'état de compétition
+    if 'competition_mode' not in st.session_state:
+        st.session_state.competition_mode = False
+    if 'comp_questions' not in st.session_state:
+        st.session_state.comp_questions = []
+    if 'comp_current_q' not in st.session_state:
+        st.session_state.comp_current_q = 0
+    if 'comp_run' not in st.session_state:
+        st.session_state.comp_run = None
+    
+    if st.button("🎯 Démarrer la compétition", type="primary") and not st.session_state.competition_mode:
+        # 50 questions tirées en une passe, chaque spécialité avec le même poids
+        question_ids = quiz_mgr.sample_question_ids(50, weights=dict.fromkeys(quiz_mgr.get_specialties(), 1))
+        st.session_state.comp_questions = [quiz_mgr.get_question(qid) for qid in question_ids]
+        
+        # Échéance tenue par le serveur : le score est sauvegardé à la fin du temps même sans rerun de la page
+        username = st.session_state.username
+        
+        questions = st.session_state.comp_questions
+        
+        def save_competition(run, elapsed):
+            # Réponses et temps par question tenus en mémoire, enregistrés en une transaction avec le score
+            user_answers = [{'selected': answer} if answer else {} for answer in run.state['answers']]
+            db.save_score(username, "competition", run.state['score'], sum(run.state['answered']), int(elapsed),
+                          questions=questions, user_answers=user_answers, answer_clock=run.state['clock'])
+        
+        run = start_timed_run(AppConfig().competition_time, save_competition)
+        run.state.update(score=0, answered=[False] * len(questions), answers=[None] * len(questions),
+                         clock=AnswerClock())
+        
+        # Initialiser l'état
+        st.session_state.comp_current_q = 0
+        st.session_state.comp_run = run
+        st.session_state.competition_mode = True
+        st.session_state.comp_finished = False
+        st.rerun()
+    
+    run = st.session_state.comp_run
+    
+    # VÉRIFICATION DE SÉCURITÉ - S'assurer que l'index est valide
+    if st.session_state.competition_mode and st.session_state.comp_questions:
+        current_index = st.session_state.comp_current_q
+        if current_index >= len(st.session_state.comp_questions):
+            st.session_state.comp_current_q = len(st.session_state.comp_questions) - 1
+            st.rerun()
+    
+    if st.session_state.get('competition_mode', False) and not st.session_state.get('comp_finished', False):
+        # Vérifier qu'il y a des questions
+        if not st.session_state.comp_questions or run is None:
+            st.error("Aucune question disponible pour la compétition")
+            st.session_state.competition_mode = False
+            st.rerun()
+        
+        if run.finished:
+            st.session_state.competition_mode = False
+            st.session_state.comp_finished = True
+            st.rerun()
+        
+        _competition_timer(run)
+        _competition_question(run)
+        with st.sidebar:
+            _live_leaderboard(init_live_ranking(), st.session_state.username)
+    
+    # Écran de fin de compétition
+    elif st.session_state.get('comp_finished', False) and run is not None:
+        if not run.finished:
+            run.finish()
+        
+        st.markdown("## 🎉 Compétition Terminée!")
+        if run.reason == "expired":
+            st.error("⏰ Temps écoulé!")
+        
+        score = run.state['score']
+        total_questions = len(st.session_state.comp_questions) if st.session_state.comp_questions else 0
+        answered_questions = sum(run.state['answered'])
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("🏆 Score Final", score)
+        with col2:
+            st.metric("✅ Questions répondues", f"{answered_questions}/{total_questions}")
+        with col3:
+            accuracy = (score / (answered_questions * 2)) * 100 if answered_questions > 0 else 0
+            st.metric("🎯 Précision", f"{accuracy:.1f}%")
+        
+        with st.sidebar:
+            _live_leaderboard(init_live_ranking(), st.session_state.username)
+        
+        # Classement instantané
+        st.markdown("### 📊 Performance")
+        if accuracy >= 80:
+            st.success("🌟 Performance excellente! Vous maîtrisez bien les concepts.")
+        elif accuracy >= 60:
+            st.info("💪 Bonne performance! Continuez à vous entraîner.")
+        else:
+            st.warning("📚 Performance correcte. Revoyez les notions difficiles.")
+        
+        # Boutons d'action
+        col_restart, col_home = st.columns(2)
+        with col_restart:
+            if st.button("🔄 Nouvelle compétition", width='stretch'):
+                # Réinitialiser l'état
+                for key in [k for k in st.session_state.keys() if k.startswith('comp_')]:
+                    del st.session_state[key]
+                st.rerun()
+        
+        with col_home:
+            if st.button("🏠 Retour à l'accueil", width='stretch'):
+                # Réinitialiser l'état
+                for key in [k for k in st.session_state.keys() if k.startswith('comp_')]:
+                    del st.session_state[key]
+                st.rerun()
+
+
+@st.fragment(run_every=1)
+def _competition_timer(run):
+    """Compte à rebours rafraîchi chaque seconde sans relancer le reste de la page"""
+    if run.finished:
+        st.rerun()  # La clôture a eu lieu côté serveur : afficher l'écran de fin
+    
+    remaining_time = run.remaining()
+    minutes = int(remaining_time // 60)
+    seconds = int(remaining_time % 60)
+    total = len(st.session_state.comp_questions)
+    
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        st.metric("⏱️ Temps restant", f"{minutes:02d}:{seconds:02d}")
+    with col2:
+        st.metric("🎯 Score actuel", run.state['score'])
+    with col3:
+        st.metric("📊 Progression", f"{st.session_state.comp_current_q + 1}/{total}")
+    
+    # BARRE DE PROGRESSION
+    progress = (st.session_state.comp_current_q + 1) / total
+    st.progress(min(1.0, progress))
+
+
+def _next_question():
+    if st.session_state.comp_current_q < len(st.session_state.comp_questions) - 1:
+        st.session_state.comp_current_q += 1
+    else:
+        st.session_state.comp_current_q = 0  # Recommencer depuis le début
+
+
+@st.fragment
+def _competition_question(run):
+    """Question courante et navigation : une réponse ne relance que ce fragment"""
+    # Question actuelle - AVEC VÉRIFICATION DE SÉCURITÉ
+    current_index = st.session_state.comp_current_q
+    if current_index >= len(st.session_state.comp_questions):
+        # Cas où l'index est hors limites
+        st.error("Erreur: index de question invalide")
+        st.session_state.comp_current_q = 0
+        rerun_fragment()
+    
+    question = st.session_state.comp_questions[current_index]
+    
+    st.markdown(f'<div class="quiz-question"><h3>Question {current_index + 1}</h3><p>{question["question"]}</p></div>', unsafe_allow_html=True)
+    
+    options = [opt['text'] for opt in question['options']]
+    user_answer = st.radio("Votre réponse:", options + ["⏭️ Passer"], key="comp_question")
+    
+    col_btn1, col_btn2, col_btn3 = st.columns([1, 1, 1])
+    
+    with col_btn1:
+        if st.button("✅ Valider", width='stretch') and user_answer != "⏭️ Passer":
+            delta = answer_points(question, user_answer)
+            
+            def record(state):
+                state['score'] = max(0, state['score'] + delta)
+                state['answered'][current_index] = True
+                state['answers'][current_index] = user_answer
+                state['clock'].lap(current_index)
+            
+            # Réponse refusée si l'échéance serveur est passée
+            if not run.apply(record):
+                st.rerun()
+            
+            _next_question()
+            rerun_fragment()
+    
+    with col_btn2:
+        if st.button("⏭️ Passer", width='stretch'):
+            # Passer sans pénalité
+            run.apply(lambda state: state['clock'].lap(current_index))
+            _next_question()
+            rerun_fragment()
+    
+    with col_btn3:
+        if st.button("🏁 Terminer", type="secondary", width='stretch'):
+            st.session_state.competition_mode = False
+            st.session_state.comp_finished = True
+            
+            # Sauvegarder le score
+            run.finish()
+            st.rerun()
+    
+    # NAVIGATION RAPIDE
+    st.markdown("---")
+    st.markdown("**Navigation rapide:**")
+    
+    # Afficher les 10 prochaines questions
+    start_idx = max(0, current_index - 5)
+    end_idx = min(len(st.session_state.comp_questions), current_index + 6)
+    
+    nav_cols = st.columns(end_idx - start_idx)
+    for i, col_idx in enumerate(range(start_idx, end_idx)):
+        with nav_cols[i]:
+            status = "✅" if run.state['answered'][col_idx] else "⚪"
+            is_current = "🔵" if col_idx == current_index else ""
+            if st.button(f"{status}{is_current}{col_idx + 1}", 
+                       key=f"nav_{col_idx}",
+                       width='stretch',
+                       type="primary" if col_idx == current_index else "secondary"):
+                run.apply(lambda state: state['clock'].lap(current_index))
+                st.session_state.comp_current_q = col_idx
+                rerun_fragment()
+
+
+@st.fragment(run_every=2)
+def _live_leaderboard(ranking, username):
+    """Classement des compétitions tenu en mémoire par LISTEN/NOTIFY : aucune requête par rafraîchissement"""
+    st.markdown("### 🏁 Classement en direct")
+    leaderboard = ranking.top("competition", 10)
+    if not leaderboard:
+        st.caption("Chargement du classement..." if not ranking.wait_ready(0) else "Aucun score de compétition")
+        return
+    
+    for i, student in enumerate(leaderboard):
+        medal = ["🥇", "🥈", "🥉"][i] if i < 3 else f"#{i + 1}"
+        name = f"**{student['username']}**" if student['username'] == username else student['username']
+        st.markdown(f"{medal} {name} — {student['total_score']:.0f} pts")
+    
+    total = ranking.user_total(username, "competition")
+    if total is not None and all(student['username'] != username for student in leaderboard):
+        st.caption(f"Vous : {total:.0f} pts")
+
+
+def _room_redirect(db, code, username):
+    """Salle tenue par un autre worker : lien vers son préfixe d'URL (le tableau de scores n'existe que là-bas)"""
+    worker = CompetitionRoom.locate(db, code)
+    if worker is None or worker == WorkerConfig().worker_path:
+        st.error("Salle introuvable ou terminée")
+        return
+    query = urlencode({'room': code.strip().upper(), 'user': username})
+    st.info("Cette salle est ouverte sur un autre serveur de la plateforme")
+    st.link_button("➡️ Entrer dans la salle", f"/{worker}/?{query}", width='stretch')
+
+
+def _leave_room():
+    for key in ("comp_room", "comp_room_q"):
+        st.session_state.pop(key, None)
+    st.query_params.clear()
+
+
+def _render_room(db, quiz_mgr, username):
+    """Salle synchronisée : création ou entrée par code, attente du départ commun, épreuve, résultats"""
+    room = st.session_state.get('comp_room')
+    
+    if room is None:
+        col_create, col_join = st.columns(2)
+        with col_create:
+            st.markdown("#### Ouvrir une salle")
+            if st.button("🆕 Créer une salle", width='stretch'):
+                room = CompetitionRoom.create(db, quiz_mgr)
+                if room is None:
+                    st.error("Impossible de créer la salle")
+                    return
+        with col_join:
+            st.markdown("#### Rejoindre une salle")
+            code = st.text_input("Code de la salle", key="comp_room_code")
+            clicked = st.button("🚪 Rejoindre", width='stretch')
+            # Code reçu dans l'URL (lien de renvoi), retiré en quittant la salle
+            code = st.query_params.get("room") or (code if clicked else "")
+            if code:
+                room = CompetitionRoom.get(db, quiz_mgr, code)
+                if room is None:
+                    _room_redirect(db, code, username)
+                    return
+        
+        if room is None:
+            return
+        if not room.join(username):
+            st.error("Salle complète ou terminée")
+            return
+        st.session_state.comp_room = room
+        st.session_state.comp_room_q = 0
+        st.rerun()
+    
+    phase = room.phase()
+    if phase == "attente":
+        _room_lobby(room)
+    elif phase == "en cours":
+        _room_timer(room, username)
+        _room_question(room, username)
+    else:
+        _room_results(room, username)
+    
+    with st.sidebar:
+        _room_scoreboard(room, username)
+
+
+@st.fragment(run_every=1)
+def _room_lobby(room):
+    """Salle d'attente : compte à rebours jusqu'au départ commun fixé par le serveur"""
+    if room.phase() != "attente":
+        st.rerun()
+    
+    st.info(f"Code de la salle : **{room.room_id}** — à partager avec les autres joueurs")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("⏳ Départ dans", f"{int(room.seconds_to_start()) + 1} s")
+    with col2:
+        st.metric("👥 Joueurs", len(room.scoreboard()))
+    if st.button("🚪 Quitter la salle"):
+        _leave_room()
+        st.rerun()
+
+
+@st.fragment(run_every=1)
+def _room_timer(room, username):
+    """Temps restant jusqu'à l'échéance commune de la salle"""
+    if room.closed:
+        st.rerun()
+    
+    remaining_time = room.remaining()
+    player = room.player(username) or {'score': 0, 'answered': set()}
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("⏱️ Temps restant", f"{int(remaining_time // 60):02d}:{int(remaining_time % 60):02d}")
+    with col2:
+        st.metric("🎯 Score actuel", player['score'])
+    with col3:
+        st.metric("📊 Répondues", f"{len(player['answered'])}/{len(room.questions)}")
+    st.progress(min(1.0, len(player['answered']) / max(1, len(room.questions))))
+
+
+@st.fragment
+def _room_question(room, username):
+    """Question courante de la salle : la réponse est comptée en mémoire, sans écriture en base"""
+    player = room.player(username) or {'answered': set()}
+    pending = [k for k in range(len(room.questions)) if k not in player['answered']]
+    if not pending:
+        st.success("✅ Toutes les questions sont répondues : résultats à l'échéance de la salle")
+        return
+    
+    # Prochaine question non répondue à partir de la position courante (les questions passées reviennent ensuite)
+    current_index = next((k for k in pending if k >= st.session_state.comp_room_q), pending[0])
+    question = room.questions[current_index]
+    
+    st.markdown(f'<div class="quiz-question"><h3>Question {current_index + 1}</h3><p>{question["question"]}</p></div>', unsafe_allow_html=True)
+    options = [opt['text'] for opt in question['options']]
+    user_answer = st.radio("Votre réponse:", options, key=f"comp_room_answer_{current_index}")
+    
+    col_valid, col_skip = st.columns(2)
+    with col_valid:
+        if st.button("✅ Valider", width='stretch'):
+            # Réponse refusée après l'échéance serveur
+            if room.answer(username, current_index, user_answer) is None and room.closed:
+                st.rerun()
+            st.session_state.comp_room_q = current_index + 1
+            rerun_fragment()
+    with col_skip:
+        if st.button("⏭️ Passer", width='stretch'):
+            st.session_state.comp_room_q = current_index + 1
+            rerun_fragment()
+
+
+def _room_results(room, username):
+    st.markdown(f"## 🎉 Salle {room.room_id} terminée")
+    if room.results is None:
+        st.info("⏳ Enregistrement des scores de la salle...")
+    
+    board = room.results if room.results is not None else room.scoreboard()
+    rank = next((k + 1 for k, row in enumerate(board) if row['username'] == username), None)
+    player = next((row for row in board if row['username'] == username), None)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("🏆 Score Final", player['score'] if player else 0)
+    with col2:
+        st.metric("🥇 Rang", f"{rank}/{len(board)}" if rank else "-")
+    with col3:
+        st.metric("✅ Questions répondues", f"{player['answered'] if player else 0}/{len(room.questions)}")
+    
+    if st.button("🔄 Quitter la salle", width='stretch'):
+        _leave_room()
+        st.rerun()
+
+
+@st.fragment(run_every=2)
+def _room_scoreboard(room, username):
+    """Classement de la salle lu dans le tableau de scores en mémoire"""
+    st.markdown(f"### 👥 Salle {room.room_id}")
+    board = room.scoreboard()
+    if not board:
+        st.caption("Aucun joueur")
+        return
+    
+    for i, row in enumerate(board[:10]):
+        medal = ["🥇", "🥈", "🥉"][i] if i < 3 else f"#{i + 1}"
+        name = f"**{row['username']}**" if row['username'] == username else row['username']
+        st.markdown(f"{medal} {name} — {row['score']:.1f} pts ({row['answered']} rép.)")
+    st.caption(f"{len(board)} joueurs")
@@ -0,0 +1,538 @@
+"""Simulations ECN complètes"""
+import streamlit as st
+from utils.deadlines import start_timed_run
+from utils.quantile_sketch import ecn_sketch
+from views.common import complete_ecn_simulation, init_item_bank, init_managers, rerun_fragment
+
+
+def render():
+    db, quiz_mgr, _ = init_managers()
+
+    st.markdown("## 🏆 Simulations ECN Complètes")
+    
+    if not st.session_state.username:
+        st.warning("Veuillez entrer votre nom d'utilisateur dans la page d'accueil")
+        st.stop()
+    
+    # Initialiser le simulateur
+    if 'ecn_simulator' not in st.session_state or st.session_state.ecn_simulator is None:
+        from utils.ecn_simulator import ECNSimulator
+        st.session_state.ecn_simulator = ECNSimulator(quiz_mgr)
+    
+    simulator = st.session_state.ecn_simulator
+    
+    tab1, tab2, tab3, tab4 = st.tabs(["🚀 Nouvelle Simulation", "📊 Mes Résultats", "🏅 Classement ECN", "ℹ️ Informations"])
+    
+    with tab1:
+        st.markdown("""
+        ### Simulation ECN Complète
+        
+        **Caractéristiques de la simulation:**
+        - ⏱️ **Durée :** 60 minutes
+        - 📝 **120 questions** réparties en 4 sections
+        - 🏥 **Toutes spécialités** selon la distribution réelle
+        - 📊 **Barème ECN** avec pénalités pour mauvaises réponses
+        - 🎯 **Score de réussite :** 70%
+        
+        **Déroulement:**
+        1. 4 sections de 30 questions (15 minutes par section)
+        2. Pause de 10 minutes à mi-parcours
+        3. Timer visible en permanence
+        4. Navigation libre entre les questions
+        5. Validation finale avec résultats détaillés
+        """)
+        
+        # Bouton pour démarrer une nouvelle simulation
+        if st.button("🎯 Démarrer une Simulation ECN", type="primary", use_container_width=True, key="start_ecn_btn"):
+            # Générer une nouvelle session
+            session = simulator.generate_simulation_session()
+            if session and session['questions']:
+                _start_simulation(simulator, session)
+                st.rerun()
+            else:
+                st.error("❌ Impossible de générer la simulation. Vérifiez les données disponibles.")
+        
+        with st.expander("👥 Examen blanc de cohorte"):
+            st.markdown("Tous les étudiants d'une même cohorte composent sur la même session, identifiée par un code.")
+            col_join, col_create = st.columns(2)
+            with col_join:
+                exam_code = st.text_input("Code de l'examen", key="cohort_exam_code")
+                if st.button("🚪 Rejoindre l'examen", use_container_width=True, key="join_cohort_btn") and exam_code:
+                    from utils.cohort_exam import CohortExam
+                    exam = CohortExam.get(db, simulator, exam_code)
+                    if exam and exam.session['questions']:
+                        _start_simulation(simulator, exam.session)
+                        st.rerun()
+                    else:
+                        st.error("❌ Examen introuvable")
+            with col_create:
+                if st.button("➕ Créer un examen blanc", use_container_width=True, key="create_cohort_btn"):
+                    from utils.cohort_exam import CohortExam
+                    exam = CohortExam.create(db, simulator)
+                    if exam:
+                        st.success(f"Examen créé : code **{exam.exam_id}** à communiquer à la cohorte")
+                    else:
+                        st.error("❌ Impossible de créer l'examen")
+        
+        st.markdown("""
+        **Simulation adaptative :** les questions s'ajustent à votre niveau et la session
+        s'arrête dès que votre score est estimé avec précision (souvent 20 à 40 questions).
+        """)
+        
+        if st.button("🧠 Démarrer une Simulation Adaptative", use_container_width=True, key="start_ecn_adaptive_btn"):
+            from utils.adaptive_simulator import AdaptiveSimulator
+            adaptive = AdaptiveSimulator(simulator, init_item_bank())
+            adaptive_session = adaptive.start_session()
+            if adaptive.next_question(adaptive_session):
+                st.session_state.ecn_adaptive_simulator = adaptive
+                st.session_state.ecn_adaptive_session = adaptive_session
+                st.session_state.ecn_run = start_timed_run(
+                    adaptive_session['duration'], lambda run, elapsed: adaptive.finalize(adaptive_session, elapsed)
+                )
+                st.session_state.ecn_simulation_active = False
+                st.session_state.ecn_simulation_finished = False
+                st.session_state.ecn_results = None
+                st.rerun()
+            else:
+                st.error("❌ Impossible de générer la simulation. Vérifiez les données disponibles.")
+        
+        # SIMULATION ADAPTATIVE ACTIVE
+        if st.session_state.get('ecn_adaptive_session') and not st.session_state.get('ecn_simulation_finished'):
+            adaptive = st.session_state.ecn_adaptive_simulator
+            session = st.session_state.ecn_adaptive_session
+            run = st.session_state.ecn_run
+            
+            if run.finished:
+                _show_ecn_results(run)
+            
+            _adaptive_timer(run, adaptive, session)
+            _adaptive_question(run, adaptive, session)
+            
+            if st.button("⏹️ Abandonner", type="secondary", use_container_width=True, key="adaptive_abandon_btn"):
+                run.cancel()
+                for key in ['ecn_adaptive_session', 'ecn_adaptive_simulator']:
+                    del st.session_state[key]
+                st.info("Simulation abandonnée")
+                st.rerun()
+        
+        # SIMULATION ACTIVE - GESTION CORRIGÉE
+        elif st.session_state.get('ecn_simulation_active') and not st.session_state.get('ecn_simulation_finished'):
+            session = st.session_state.ecn_session
+            run = st.session_state.ecn_run
+            
+            # Vérifications de sécurité
+            if not session or not session.get('questions') or run is None:
+                st.error("❌ Session de simulation invalide")
+                st.session_state.ecn_simulation_active = False
+                st.rerun()
+            
+            # Fin du temps : la correction a déjà été faite côté serveur à l'échéance
+            if run.finished:
+                _show_ecn_results(run)
+            
+            _ecn_timer(run, session)
+            _ecn_question_area(run, session)
+            
+            # Bouton d'abandon
+            if st.button("⏹️ Abandonner", type="secondary", use_container_width=True, key="abandon_btn"):
+                run.cancel()
+                st.session_state.ecn_simulation_active = False
+                st.info("Simulation abandonnée")
+                st.rerun()
+        
+        # AFFICHAGE DES RÉSULTATS
+        elif st.session_state.get('ecn_simulation_finished') and st.session_state.get('ecn_results'):
+            results_data = st.session_state.ecn_results
+            session = results_data['session']
+            results = results_data['results']
+            time_taken = results_data['time_taken']
+            
+            st.markdown("## 📊 Résultats de la Simulation ECN")
+            
+            # Métriques principales
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.metric("🎯 Score final", f"{results['percentage']:.1f}%")
+            with col2:
+                st.metric("📈 Note", results['grade'])
+            with col3:
+                status_color = "🟢" if results['passed'] else "🔴"
+                st.metric("✅ Statut", f"{status_color} {'Réussi' if results['passed'] else 'Échec'}")
+            with col4:
+                st.metric("⏱️ Temps", f"{int(time_taken//60)}min {int(time_taken%60)}s")
+            
+            percentile = db.get_percentile(ecn_sketch(session.get('mode', 'fixed')), results['percentage'])
+            if percentile is not None:
+                st.info(f"📊 Vous êtes dans le top {max(1, 100 - percentile):.0f}% des simulations de ce type")
+            
+            if 'theta' in results:
+                st.info(f"🧠 Simulation adaptative : {session['total_questions']} questions, "
+                        f"niveau estimé {results['theta']:+.2f} (erreur standard {results['standard_error']:.2f})")
+            
+            # Sauvegarde des résultats
+            if results_data.get('cohort_exam_id'):
+                st.success(f"✅ Copie enregistrée pour l'examen blanc {results_data['cohort_exam_id']}")
+                if results_data.get('new_badges'):
+                    st.success("🎖️ Nouveaux badges débloqués!")
+                    for badge in results_data['new_badges']:
+                        st.markdown(f'<span class="badge badge-gold">{badge}</span>', unsafe_allow_html=True)
+            elif st.button("💾 Sauvegarder les résultats", key="save_results_btn"):
+                new_badges = []
+                if db.save_ecn_simulation(st.session_state.username, results_data, awarded_badges=new_badges):
+                    st.success("✅ Résultats sauvegardés!")
+                    
+                    if new_badges:
+                        st.balloons()
+                        st.success("🎖️ Nouveaux badges débloqués!")
+                        for badge in new_badges:
+                            st.markdown(f'<span class="badge badge-gold">{badge}</span>', unsafe_allow_html=True)
+                else:
+                    st.error("❌ Erreur lors de la sauvegarde")
+            
+            # Boutons d'action
+            col_new, col_details, col_home = st.columns(3)
+            with col_new:
+                if st.button("🔄 Nouvelle simulation", use_container_width=True, key="new_sim_btn"):
+                    # Réinitialiser seulement les variables ECN
+                    for key in [k for k in st.session_state.keys() if k.startswith('ecn_')]:
+                        del st.session_state[key]
+                    st.rerun()
+            
+            with col_details:
+                if st.button("📊 Détail des réponses", use_container_width=True, key="details_btn"):
+                    st.session_state.show_ecn_details = True
+                    st.rerun()
+            
+            with col_home:
+                if st.button("🏠 Accueil", use_container_width=True, key="home_btn"):
+                    for key in [k for k in st.session_state.keys() if k.startswith('ecn_')]:
+                        del st.session_state[key]
+                    st.rerun()
+    
+    # GESTION DES AUTRES ONGLETS
+    with tab2:
+        st.markdown("### 📈 Mes Statistiques ECN")
+        stats = db.get_user_ecn_stats(st.session_state.username)
+        
+        if stats and stats.get('total_simulations', 0) > 0:
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Simulations", stats['total_simulations'])
+            with col2:
+                st.metric("Score moyen", f"{stats.get('average_score', 0):.1f}%")
+            with col3:
+                st.metric("Meilleur score", f"{stats.get('best_score', 0):.1f}%")
+            with col4:
+                success_rate = (stats.get('passed_count', 0) / stats['total_simulations'] * 100) if stats['total_simulations'] > 0 else 0
+                st.metric("Taux réussite", f"{success_rate:.1f}%")
+        else:
+            st.info("Aucune simulation ECN complétée")
+    
+    with tab3:
+        st.markdown("### 🏅 Classement ECN")
+        leaderboard = db.get_ecn_leaderboard(limit=10)
+        
+        if leaderboard:
+            for i, student in enumerate(leaderboard):
+                cols = st.columns([1, 3, 2, 2])
+                with cols[0]:
+                    if i == 0: st.markdown("🥇")
+                    elif i == 1: st.markdown("🥈") 
+                    elif i == 2: st.markdown("🥉")
+                    else: st.markdown(f"**#{i+1}**")
+                with cols[1]:
+                    st.write(student['username'])
+                with cols[2]:
+                    st.write(f"**{student['best_score']:.1f}%**")
+                with cols[3]:
+                    st.write(f"{student['simulations_count']} simus")
+        else:
+            st.info("Aucun classement disponible")
+    
+    with tab4:
+        st.markdown("### ℹ️ Guide des Simulations ECN")
+        st.markdown("""
+        **Déroulement:**
+        - 4 sections de 30 questions
+        - Navigation libre entre les questions
+        - Timer de 60 minutes
+        - Score avec pénalités pour mauvaises réponses
+        
+        **Conseils:**
+        - Gérez votre temps (30s/question)
+        - Passez les questions difficiles
+        - Revenez à la fin si possible
+        """)
+
+
+def _show_ecn_results(run):
+    """Passe à l'écran des résultats une fois l'épreuve close (par l'utilisateur ou à l'échéance)"""
+    st.session_state.ecn_simulation_finished = True
+    st.session_state.ecn_results = run.result
+    if run.result is None:
+        st.session_state.ecn_simulation_active = False
+        st.error("❌ Impossible de corriger la simulation")
+        st.stop()
+    st.rerun()
+
+
+@st.fragment(run_every=1)
+def _ecn_timer(run, session):
+    """Temps restant et progression, rafraîchis chaque seconde sans relancer le reste de la page"""
+    if run.finished:
+        st.rerun()
+    
+    current_section = st.session_state.ecn_current_section
+    current_question_global = st.session_state.ecn_current_question
+    remaining_time = run.remaining()
+    
+    col_time, col_progress, col_section = st.columns([2, 3, 2])
+    
+    with col_time:
+        minutes = int(remaining_time // 60)
+        seconds = int(remaining_time % 60)
+        st.metric("⏱️ Temps restant", f"{minutes:02d}:{seconds:02d}")
+    
+    with col_progress:
+        progress = (current_question_global + 1) / len(session['questions'])
+        progress_value = min(1.0, max(0.0, progress))
+        st.progress(progress_value)
+        st.write(f"Question {current_question_global + 1}/{len(session['questions'])}")
+    
+    with col_section:
+        st.metric("📂 Section", f"{current_section + 1}/4")
+
+
+@st.fragment
+def _ecn_question_area(run, session):
+    """Question courante et navigation : changer de question ne relance que ce fragment"""
+    current_section = st.session_state.ecn_current_section
+    current_question_global = st.session_state.ecn_current_question
+    
+    # Navigation entre sections
+    st.markdown("### Navigation entre Sections")
+    section_cols = st.columns(4)
+    
+    for i in range(4):
+        with section_cols[i]:
+            section_progress = len([ans for j, ans in enumerate(st.session_state.ecn_answers) 
+                                if j // 30 == i and ans.get('selected')]) / 30
+            status = "✅" if section_progress == 1 else "🟡" if section_progress > 0 else "⚪"
+            is_current = "🔵" if i == current_section else ""
+            
+            # Utiliser un formulaire pour éviter le rechargement
+            if st.button(f"{status}{is_current}Section {i+1}", 
+                    key=f"section_btn_{i}",
+                    use_container_width=True,
+                    type="primary" if i == current_section else "secondary"):
+                st.session_state.ecn_current_section = i
+                st.session_state.ecn_current_question = i * 30
+                rerun_fragment()
+    
+    # Question actuelle
+    st.markdown("---")
+    question = session['questions'][current_question_global]
+    section_offset = current_question_global % 30
+    
+    st.markdown(f"### Section {current_section + 1} - Question {section_offset + 1}")
+    st.markdown(f'<div class="quiz-question"><h4>{question["question"]}</h4></div>', unsafe_allow_html=True)
+    
+    # Gestion des réponses avec état préservé
+    current_answer_key = f"ecn_answer_{current_question_global}"
+    
+    # Réponses
+    if question['type'] == 'single':
+        options = [opt['text'] for opt in question['options']]
+        current_answer = st.session_state.ecn_answers[current_question_global].get('selected', '')
+        
+        # Utiliser un index pour préserver la sélection
+        default_index = options.index(current_answer) if current_answer in options else 0
+        selected = st.radio("Choisissez votre réponse:", 
+                        options, 
+                        index=default_index,
+                        key=current_answer_key)
+        
+        # Sauvegarder immédiatement la réponse
+        st.session_state.ecn_answers[current_question_global]['selected'] = selected
+        
+    elif question['type'] == 'multiple':
+        options = [opt['text'] for opt in question['options']]
+        current_answers = st.session_state.ecn_answers[current_question_global].get('selected', [])
+        
+        selected = st.multiselect("Choisissez une ou plusieurs réponses:", 
+                                options,
+                                default=current_answers,
+                                key=current_answer_key)
+        
+        st.session_state.ecn_answers[current_question_global]['selected'] = selected
+    
+    # ✅ Navigation entre questions - VERSION STABLE
+    # ✅ Navigation entre questions - VERSION GRILLE COMPACTE
+    st.markdown("---")
+    nav_col1, nav_col3 = st.columns([1, 1])
+
+    # ⬅️ Question précédente
+    with nav_col1:
+        if current_question_global > 0:
+            if st.button("⬅️ Précédente", use_container_width=True, key=f"prev_btn_{current_question_global}"):
+                st.session_state.ecn_current_question -= 1
+                new_section = st.session_state.ecn_current_question // 30
+                if new_section != current_section:
+                    st.session_state.ecn_current_section = new_section
+                rerun_fragment()
+
+    # ➡️ Question suivante ou Terminer
+    with nav_col3:
+        if current_question_global < len(session['questions']) - 1:
+            if st.button("Suivante ➡️", use_container_width=True, key=f"next_btn_{current_question_global}"):
+                st.session_state.ecn_current_question += 1
+                new_section = st.session_state.ecn_current_question // 30
+                if new_section != current_section:
+                    st.session_state.ecn_current_section = new_section
+                rerun_fragment()
+        else:
+            if st.button("✅ Terminer", type="primary", use_container_width=True, key="finish_btn"):
+                run.finish()
+                _show_ecn_results(run)
+    # 🟢 BARRE DE PROGRESSION PAR SECTION
+    st.markdown("---")
+    st.markdown("### 📂 Progression par section")
+
+    section_titles = [
+        "Médecine Interne",
+        "Urgences",
+        "Diagnostic & Thérapeutique",
+        "Situations Complexes"
+    ]
+
+    section_cols = st.columns(4)
+    questions_per_section = 30
+
+    for i, col in enumerate(section_cols):
+        with col:
+            start = i * questions_per_section
+            end = min(start + questions_per_section, len(st.session_state.ecn_answers))
+            answered = sum(1 for ans in st.session_state.ecn_answers[start:end] if ans.get('selected'))
+            progress = answered / (end - start) if end - start > 0 else 0
+
+            # Couleur selon progression
+            if progress == 1:
+                color = "#198754"  # vert complet
+            elif progress > 0:
+                color = "#ffc107"  # jaune partiel
+            else:
+                color = "#6c757d"  # gris vide
+
+            progress_pct = int(progress * 100)
+            section_label = f"Section {i+1} ({progress_pct}%)"
+
+            if st.button(section_label, key=f"section_progress_{i}", use_container_width=True):
+                st.session_state.ecn_current_section = i
+                st.session_state.ecn_current_question = start
+                rerun_fragment()
+
+            st.markdown(
+                f"<style>div[data-testid='stButton'][key='section_progress_{i}'] button{{background-color:{color};color:white;border-radius:8px;font-weight:bold;}}</style>",
+                unsafe_allow_html=True
+            )
+
+
+    # 🧭 NAVIGATION RAPIDE PAR GRILLE
+    st.markdown("---")
+    st.markdown("### 🧭 Navigation rapide")
+
+    total_questions = len(session['questions'])
+    cols_per_row = 10  # 10 boutons par ligne
+    rows = (total_questions // cols_per_row) + (1 if total_questions % cols_per_row != 0 else 0)
+
+    for row in range(rows):
+        cols = st.columns(cols_per_row)
+        for col_idx, col in enumerate(cols):
+            q_index = row * cols_per_row + col_idx
+            if q_index >= total_questions:
+                break
+
+            # Statut visuel : déjà répondu / actuelle / vide
+            answer_data = st.session_state.ecn_answers[q_index]
+            if answer_data.get('selected'):
+                style = "background-color:#198754;color:white;"  # vert = répondu
+            elif q_index == current_question_global:
+                style = "background-color:#0d6efd;color:white;"  # bleu = actuelle
+            else:
+                style = "background-color:#f8f9fa;color:black;"  # neutre
+
+            with col:
+                if st.button(f"{q_index+1}", key=f"nav_q_{q_index}", use_container_width=True):
+                    st.session_state.ecn_current_question = q_index
+                    st.session_state.ecn_current_section = q_index // 30
+                    rerun_fragment()
+                st.markdown(
+                    f"<style>div[data-testid='stButton'][key='nav_q_{q_index}'] button{{{style}border-radius:6px;font-weight:bold;}}</style>",
+                    unsafe_allow_html=True
+                )
+
+
+@st.fragment(run_every=1)
+def _adaptive_timer(run, adaptive, session):
+    """Temps restant et précision de l'estimation, rafraîchis chaque seconde"""
+    if run.finished:
+        st.rerun()
+    
+    answered = len(session['responses'])
+    remaining_time = run.remaining()
+    
+    col_time, col_progress, col_precision = st.columns([2, 3, 2])
+    with col_time:
+        minutes = int(remaining_time // 60)
+        seconds = int(remaining_time % 60)
+        st.metric("⏱️ Temps restant", f"{minutes:02d}:{seconds:02d}")
+    with col_progress:
+        st.progress(min(1.0, answered / adaptive.config.max_questions))
+        st.write(f"Question {answered + 1} (maximum {adaptive.config.max_questions})")
+    with col_precision:
+        st.metric("🎯 Erreur standard", f"{session['standard_error']:.2f}")
+
+
+@st.fragment
+def _adaptive_question(run, adaptive, session):
+    """Question adaptative courante : valider une réponse ne relance que ce fragment"""
+    question = session['questions'][-1]
+    answered = len(session['responses'])
+    
+    st.markdown("---")
+    st.markdown(f'<div class="quiz-question"><h4>{question["question"]}</h4></div>', unsafe_allow_html=True)
+    
+    options = [opt['text'] for opt in question['options']]
+    if question['type'] == 'single':
+        selected = st.radio("Choisissez votre réponse:", options, key=f"ecn_adaptive_answer_{answered}")
+    else:
+        selected = st.multiselect("Choisissez une ou plusieurs réponses:", options, key=f"ecn_adaptive_answer_{answered}")
+    
+    if st.button("✅ Valider", type="primary", use_container_width=True, key=f"adaptive_next_{answered}"):
+        def record(state):
+            adaptive.record_answer(session, {'selected': selected})
+            state['done'] = adaptive.is_finished(session) or adaptive.next_question(session) is None
+        
+        # Réponse refusée après l'échéance : la correction a lieu côté serveur
+        if not run.apply(record) or run.state.get('done'):
+            run.finish("completed")
+            _show_ecn_results(run)
+        rerun_fragment()
+
+
+def _start_simulation(simulator, session):
+    """Initialise une simulation à 4 sections et programme sa correction automatique à l'échéance"""
+    answers = [{} for _ in range(session['total_questions'])]
+    username = st.session_state.username
+    
+    st.session_state.ecn_session = session
+    st.session_state.ecn_current_section = 0
+    st.session_state.ecn_current_question = 0
+    st.session_state.ecn_answers = answers
+    st.session_state.ecn_run = start_timed_run(
+        session['duration'], lambda run, elapsed: complete_ecn_simulation(simulator, session, answers, username, elapsed)
+    )
+    st.session_state.ecn_simulation_active = True
+    st.session_state.ecn_simulation_finished = False
+    st.session_state.ecn_results = None
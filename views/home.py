@@ -0,0 +1,59 @@
+"""Page d'accueil : présentation et saisie du nom d'utilisateur"""
+import streamlit as st
+from views.common import init_managers
+
+
+def render():
+    _, quiz_mgr, badge_mgr = init_managers()
+
+    st.markdown('<div class="main-header">🏥 ECN Prep - Plateforme de Préparation</div>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.markdown("""
+        ### Bienvenue sur la plateforme de préparation aux ECN
+        
+        Cette application vous permet de:
+        
+        📚 **Réviser par spécialités médicales**
+        - Cardiologie, Pneumologie, Neurologie, etc.
+        - Questions à choix multiples
+        - Dossiers cliniques progressifs
+        
+        🏆 **Vous mesurer aux autres**
+        - Mode compétition chronométré
+        - Classement en temps réel
+        - Système de badges et récompenses
+        
+        💼 **Travailler les dossiers cliniques**
+        - Cas progressifs avec révélations successives
+        - Approche par compétences
+        - Feedback immédiat
+        
+        ### Commencez par:
+        1. Créer votre profil étudiant
+        2. Choisir une spécialité
+        3. Démarrer un quiz ou un dossier clinique
+        """)
+    
+    with col2:
+        st.session_state.username = st.text_input("👤 Votre nom d'utilisateur", placeholder="ex: etudiant_123")
+        
+        if st.session_state.username:
+            st.success(f"Connecté en tant que: {st.session_state.username}")
+            
+            # Afficher les badges de l'utilisateur
+            user_badges = badge_mgr.get_user_badges(st.session_state.username)
+            if user_badges:
+                st.markdown("### Vos badges")
+                for badge in user_badges:
+                    st.markdown(f'<span class="badge badge-gold">{badge}</span>', unsafe_allow_html=True)
+        
+        st.markdown("### Statistiques rapides")
+        specialties = quiz_mgr.get_specialties()
+        if specialties:
+            st.info(f"**{len(specialties)}** spécialités disponibles")
+            st.info(f"**{sum(len(quiz_mgr.quizzes.get(spec, [])) for spec in specialties)}** questions au total")
+        else:
+            st.warning("Aucune donnée chargée. Placez vos fichiers JSON dans le dossier 'data/'")
@@ -0,0 +1,48 @@
+"""Classement général par spécialité"""
+import streamlit as st
+from views.common import init_managers
+
+
+def render():
+    db, quiz_mgr, _ = init_managers()
+
+    st.markdown("## 📊 Classement")
+    
+    col1, col2 = st.columns([1, 3])
+    
+    with col1:
+        specialty_filter = st.selectbox("Filtrer par spécialité", ["Toutes"] + quiz_mgr.get_specialties())
+        limit = st.slider("Nombre de résultats", 5, 50, 10)
+    
+    with col2:
+        if specialty_filter == "Toutes":
+            leaderboard = db.get_leaderboard(limit=limit)
+        else:
+            leaderboard = db.get_leaderboard(specialty=specialty_filter, limit=limit)
+        
+        if leaderboard:
+            st.markdown("### Top Étudiants")
+            
+            for i, student in enumerate(leaderboard):
+                col_rank, col_name, col_score, col_quizzes = st.columns([1, 3, 2, 2])
+                
+                with col_rank:
+                    if i == 0:
+                        st.markdown("🥇")
+                    elif i == 1:
+                        st.markdown("🥈")
+                    elif i == 2:
+                        st.markdown("🥉")
+                    else:
+                        st.markdown(f"**#{i+1}**")
+                
+                with col_name:
+                    st.write(student['username'])
+                
+                with col_score:
+                    st.write(f"**{student['total_score']}** pts")
+                
+                with col_quizzes:
+                    st.write(f"{student['quizzes_taken']} quiz")
+        else:
+            st.info("Aucun score enregistré pour le moment")
@@ -0,0 +1,127 @@
+"""Profil, statistiques et badges"""
+import streamlit as st
+from views.common import init_analytics, init_managers
+
+
+def render():
+    db, _, badge_mgr = init_managers()
+
+    st.markdown("## 👤 Profil et Badges")
+    
+    if not st.session_state.username:
+        st.warning("Veuillez entrer votre nom d'utilisateur dans la page d'accueil")
+        st.stop()
+    
+    # Initialiser analytics
+    analytics = init_analytics()
+    
+    tab1, tab2, tab3 = st.tabs(["📊 Statistiques", "🎖️ Badges", "📈 Progression"])
+    
+    with tab1:
+        col1, col2 = st.columns([1, 2])
+        
+        with col1:
+            st.markdown("### Vos informations")
+            st.info(f"**Utilisateur:** {st.session_state.username}")
+            
+            # Récupération des statistiques globales (cache par utilisateur)
+            global_stats = db.get_user_global_stats(st.session_state.username)
+                
+            if global_stats:
+                st.metric("📚 Quiz complétés", global_stats[0])
+                st.metric("🏆 Score total", f"{global_stats[1]} pts")
+                st.metric("📈 Moyenne générale", f"{global_stats[2]:.1f}%")
+                    
+                if global_stats[3]:
+                    st.metric("🎯 Début", global_stats[3].strftime("%d/%m/%Y"))
+        
+        with col2:
+            st.markdown("### Performances par spécialité")
+            
+            # Graphique radar
+            radar_chart = analytics.create_specialty_radar_chart(st.session_state.username)
+            if radar_chart:
+                st.plotly_chart(radar_chart, width='stretch')
+                
+                # Position dans la cohorte par spécialité
+                percentiles = analytics.get_specialty_percentiles(st.session_state.username)
+                ranked = sorted(((p, s) for s, p in percentiles.items() if p is not None), reverse=True)
+                if ranked:
+                    st.caption("🏅 Votre position : " + ", ".join(
+                        f"top {max(1, 100 - p):.0f}% en {s}" for p, s in ranked
+                    ))
+            else:
+                st.info("Complétez des quiz pour voir vos statistiques")
+    
+    with tab2:
+        st.markdown("### 🎖️ Vos badges")
+        
+        badges = badge_mgr.get_user_badges(st.session_state.username)
+        badge_info = badge_mgr.badge_system.BADGES
+        
+        if badges:
+            cols = st.columns(3)
+            for i, badge in enumerate(badges):
+                with cols[i % 3]:
+                    for badge_id, info in badge_info.items():
+                        if info['name'] == badge:
+                            st.markdown(f"""
+                            <div style='text-align: center; padding: 1rem; border: 2px solid gold; border-radius: 10px; margin: 0.5rem;'>
+                                <h4>🏅</h4>
+                                <h5>{badge}</h5>
+                                <p>Seuil: {info['threshold']} pts</p>
+                            </div>
+                            """, unsafe_allow_html=True)
+            
+            # Badges manquants
+            st.markdown("### 🔮 Prochains badges à débloquer")
+            earned_badges = badges
+
+            missing_badges = {k: v for k, v in badge_mgr.badge_system.BADGES.items() 
+                            if v['name'] not in earned_badges}
+            
+            if missing_badges:
+                for badge_id, info in list(missing_badges.items())[:3]:
+                    st.write(f"**{info['name']}** - {info['threshold']} points nécessaires")
+            else:
+                st.success("🎉 Félicitations ! Vous avez débloqué tous les badges !")
+        else:
+            st.info("Vous n'avez pas encore de badges. Complétez des quiz pour en gagner!")
+    
+    with tab3:
+        st.markdown("### 📈 Votre progression")
+        
+        timeline_chart = analytics.create_progress_timeline(st.session_state.username)
+        if timeline_chart:
+            st.plotly_chart(timeline_chart, width='stretch')
+            
+            # Recommandations basées sur les données
+            st.markdown("### 💡 Recommandations personnalisées")
+            
+            recommendations = db.get_user_recommendations(st.session_state.username)
+            data = analytics.get_user_progress_data(st.session_state.username)
+            if recommendations:
+                for item in recommendations[:3]:
+                    st.warning(f"**À travailler : {item['specialty'].capitalize()}** — {item['reason']}")
+                strongest = recommendations[-1]
+                st.success(f"**Points forts : {strongest['specialty'].capitalize()}**"
+                           + (f" (précision récente {strongest['accuracy']:.0%})" if strongest['accuracy'] is not None else ""))
+            elif data and data['by_specialty']:
+                weakest_specialty = min(data['by_specialty'], key=lambda x: x[1])
+                strongest_specialty = max(data['by_specialty'], key=lambda x: x[1])
+                
+                st.warning(f"**À travailler : {weakest_specialty[0].capitalize()}** (score moyen: {weakest_specialty[1]:.1f}%)")
+                st.success(f"**Points forts : {strongest_specialty[0].capitalize()}** (score moyen: {strongest_specialty[1]:.1f}%)")
+        else:
+            st.info("Complétez plus de quiz pour voir votre progression détaillée")
+        
+        st.markdown("### ⏱️ Vitesse de réponse")
+        speed = analytics.get_speed_statistics(st.session_state.username)
+        if speed and speed['median_by_specialty']:
+            medians = sorted(speed['median_by_specialty'].items(), key=lambda item: item[1])
+            st.caption("Temps médian par question : " + ", ".join(f"{s} {t:.0f} s" for s, t in medians))
+            speed_chart = analytics.create_speed_accuracy_chart(st.session_state.username)
+            if speed_chart:
+                st.plotly_chart(speed_chart, width='stretch')
+        else:
+            st.info("Les temps de réponse apparaîtront après vos prochains quiz et compétitions")
@@ -0,0 +1,165 @@
+"""Mode Quiz : questions aléatoires ou révision espacée"""
+import time
+import streamlit as st
+from utils.answer_timing import AnswerClock
+from views.common import init_managers
+
+
+def render():
+    db, quiz_mgr, _ = init_managers()
+
+    st.markdown("## 📝 Mode Quiz")
+    
+    if not st.session_state.username:
+        st.warning("Veuillez entrer votre nom d'utilisateur dans la page d'accueil")
+        st.stop()
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        specialty = st.selectbox("Choisir une spécialité", quiz_mgr.get_specialties())
+        num_questions = st.slider("Nombre de questions", 5, 20, 10)
+        quiz_mode = st.radio("Mode", ["🎲 Aléatoire", "🔁 Révision espacée"], horizontal=True,
+                             help="La révision espacée propose d'abord les questions à revoir aujourd'hui")
+        
+        if st.button("🚀 Démarrer le Quiz", key= "ecn_start_quiz") and not st.session_state.quiz_started:
+            if quiz_mode == "🔁 Révision espacée":
+                questions = quiz_mgr.get_due_questions(db, st.session_state.username, specialty, num_questions)
+            else:
+                questions = quiz_mgr.get_quiz_questions(specialty, num_questions)
+            if questions:
+                st.session_state.questions = questions
+                st.session_state.user_answers = [{} for _ in range(len(questions))]
+                st.session_state.current_question = 0
+                st.session_state.quiz_started = True
+                st.session_state.quiz_finished = False
+                st.session_state.quiz_saved = False
+                st.session_state.start_time = time.time()
+                st.session_state.end_time = 0
+                st.session_state.quiz_clock = AnswerClock(st.session_state.start_time)  # Temps par question, en mémoire
+                st.rerun()
+            else:
+                st.error("Aucune question disponible pour cette spécialité")
+    
+    with col2:
+        if st.session_state.quiz_started and not st.session_state.quiz_finished:
+            current_q = st.session_state.current_question
+            total_q = len(st.session_state.questions)
+            st.info(f"Question {current_q + 1}/{total_q}")
+            progress = (current_q) / total_q
+            st.progress(progress)
+            
+            if st.button("⏹️ Arrêter le quiz"):
+                _lap(current_q)
+                st.session_state.quiz_finished = True
+                st.session_state.end_time = time.time()
+                st.rerun()
+    
+    # Affichage des questions - AVEC VÉRIFICATIONS
+    if (st.session_state.quiz_started and 
+        not st.session_state.quiz_finished and 
+        st.session_state.questions):
+        
+        current_idx = st.session_state.current_question
+        questions = st.session_state.questions
+        
+        # Vérification de sécurité de l'index
+        if current_idx < len(questions):
+            question = questions[current_idx]
+            
+            st.markdown(f'<div class="quiz-question"><h3>Question {current_idx + 1}</h3><p>{question["question"]}</p></div>', unsafe_allow_html=True)
+            
+            if question['type'] == 'single':
+                options = [opt['text'] for opt in question['options']]
+                selected = st.radio("Choisissez votre réponse:", options, key=f"q{current_idx}")
+                st.session_state.user_answers[current_idx] = {'selected': selected}
+                
+            elif question['type'] == 'multiple':
+                options = [opt['text'] for opt in question['options']]
+                selected = st.multiselect("Choisissez une ou plusieurs réponses:", options, key=f"q{current_idx}")
+                st.session_state.user_answers[current_idx] = {'selected': selected}
+            
+            col_prev, col_next = st.columns([1, 1])
+            with col_prev:
+                if current_idx > 0:
+                    if st.button("⬅️ Question précédente"):
+                        _lap(current_idx)
+                        st.session_state.current_question -= 1
+                        st.rerun()
+            
+            with col_next:
+                if current_idx < len(questions) - 1:
+                    if st.button("Question suivante ➡️"):
+                        _lap(current_idx)
+                        st.session_state.current_question += 1
+                        st.rerun()
+                else:
+                    if st.button("✅ Terminer le quiz"):
+                        _lap(current_idx)
+                        st.session_state.quiz_finished = True
+                        st.session_state.end_time = time.time()  # INITIALISATION
+                        st.rerun()
+        else:
+            st.error("Erreur: index de question invalide")
+            st.session_state.quiz_finished = True
+            st.rerun()
+    
+    # RÉSULTATS DU QUIZ - VERSION ROBUSTE
+    elif st.session_state.quiz_finished:
+        # Calcul du temps avec valeurs par défaut
+        start_time = getattr(st.session_state, 'start_time', time.time())
+        end_time = getattr(st.session_state, 'end_time', time.time())
+        time_taken = int(end_time - start_time)
+        
+        # Calcul du score avec vérifications
+        if (hasattr(st.session_state, 'questions') and 
+            hasattr(st.session_state, 'user_answers') and 
+            st.session_state.questions):
+            
+            score = quiz_mgr.calculate_score(st.session_state.user_answers, st.session_state.questions)
+            total_questions = len(st.session_state.questions)
+            
+            st.success(f"🎉 Quiz terminé! Score: {score}/{total_questions}")
+            st.info(f"⏱️ Temps: {time_taken} secondes")
+            
+            # Sauvegarde du score, une seule fois par quiz (les reruns de la page de résultats,
+            # dont celui du bouton « Nouveau quiz », ne réenregistrent ni réponses ni révisions)
+            new_badges = []
+            if st.session_state.get('quiz_saved', False):
+                st.success("Score sauvegardé!")
+            elif db.save_score(st.session_state.username, specialty, score, total_questions, time_taken,
+                               awarded_badges=new_badges, questions=st.session_state.questions,
+                               user_answers=st.session_state.user_answers,
+                               answer_clock=st.session_state.get('quiz_clock')):
+                st.session_state.quiz_saved = True
+                st.success("Score sauvegardé!")
+                
+                if new_badges:
+                    st.balloons()
+                    st.success("🎖️ Nouveaux badges débloqués!")
+                    for badge in new_badges:
+                        st.markdown(f'<span class="badge badge-gold">{badge}</span>', unsafe_allow_html=True)
+        else:
+            st.error("Erreur: impossible de calculer le score")
+            score = 0
+            total_questions = 0
+        
+        # Réinitialisation
+        if st.button("🔄 Nouveau quiz"):
+            # Réinitialiser uniquement les variables du quiz
+            st.session_state.quiz_started = False
+            st.session_state.quiz_finished = False
+            st.session_state.quiz_saved = False
+            st.session_state.current_question = 0
+            st.session_state.user_answers = []
+            st.session_state.questions = []
+            st.session_state.start_time = 0
+            st.session_state.end_time = 0
+            st.rerun()
+
+
+def _lap(index):
+    """Fin du temps passé sur la question affichée"""
+    clock = st.session_state.get('quiz_clock')
+    if clock is not None:
+        clock.lap(index)
@@ -0,0 +1,41 @@
+"""Bibliothèque de ressources"""
+import streamlit as st
+from views.common import init_managers
+
+
+def render():
+    _, quiz_mgr, _ = init_managers()
+
+    st.markdown("## 📚 Bibliothèque de Ressources")
+    
+    st.markdown("""
+    ### Ressources par Spécialité
+    
+    Cette section rassemble les ressources essentielles pour votre préparation aux ECN.
+    """)
+    
+    specialties = quiz_mgr.get_specialties()
+    
+    for specialty in specialties:
+        with st.expander(f"📖 {specialty.capitalize()}"):
+            st.markdown(f"""
+            **Ressources recommandées pour la {specialty}:**
+            
+            📕 **Ouvrages de référence:**
+            - Traité de {specialty} - Édition ECN
+            - Guide pratique du clinicien
+            - Cas cliniques commentés
+            
+            🌐 **Sites internet:**
+            - Collège des Enseignants de {specialty.capitalize()}
+            - Revues spécialisées
+            - Banques de données médicales
+            
+            📱 **Applications utiles:**
+            - Quiz {specialty} ECN
+            - Dictionnaire Vidal
+            - Calculatrices médicales
+            
+            **Nombre de questions disponibles:** {len(quiz_mgr.quizzes.get(specialty, []))}
+            **Dossiers cliniques:** {len(quiz_mgr.clinical_cases.get(specialty, []))}
+            """)